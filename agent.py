@@ -8,108 +8,225 @@ Usage:
     python agent.py --step escalate       # Escalate to Matan
     python agent.py --step draft          # Generate the update draft
     python agent.py --step deliver        # Send draft to Matan
+    python agent.py --step revise         # Apply Matan's replies to the draft, section by section
     python agent.py --test                # Test mode (sends only to Matan)
+    python agent.py --listen              # Capture replies live from Slack events
+    python agent.py --serve               # Run every step on schedule from one long-lived process
+
+Options:
+    --workers N    Max concurrent per-person pipelines (default: config.MAX_WORKERS)
+    --no-cache     Bypass the generation cache (always call Claude)
+    --batch        Outreach only: generate all messages in one Message Batches job
+    --poll-interval S  Seconds between batch status polls (default: config.BATCH_POLL_INTERVAL)
+    --progress     Draft only: echo the draft to the terminal as it streams in
+    --draft-mode M Draft only: "sections" (parallel, default) or "single" (one stream)
+    --deliver-mode M  Deliver only: "thread" (message + threaded parts, default) or "file" (markdown upload)
+    --companies P  Run the step for every company config in P (file or directory)
+    --processes N  With --companies: max companies run in parallel (default: CPU count)
+    --trace-out F  Export this cycle's trace (data/traces/) to F, after the step if one is given
+    --trace-format jsonl|otlp  Format for --trace-out (default: jsonl; otlp = OpenTelemetry JSON)
+    --profile-startup  Report cold-start import time for --step (or every step) against STARTUP_BUDGET_MS
 """
 
 import argparse
 import os
 import sys
-from dotenv import load_dotenv
+import time
 
-load_dotenv()
+# python-dotenv is only needed (and imported) when there's a .env to load;
+# scheduled runs get their secrets from the environment
+if os.path.exists(".env") or os.path.exists(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")):
+    from dotenv import load_dotenv
 
-from config import TEAM, DRAFT_RECIPIENT
+    load_dotenv()
+
+# Every step talks to Slack, but not every step calls Claude: the Anthropic
+# SDK (most of a second to import) loads when a step first builds a Claude
+# client (clients.py). --listen and --companies import their modules when
+# used. See startup.py.
+import config
 import slack_client
 import claude_client
+import delivery
+import drafting
+import extraction
+import fanout
+import gen_cache
+import kpis
+import past_updates
+import rate_limit
+import resilience
+import revision
+import sections
 import state
+import team
+import tracing
+
+# Every step --step can run (the Actions workflow's manual-run options list the same)
+STEPS = ["outreach", "check", "nudge", "escalate", "draft", "deliver", "revise"]
 
 
 def load_last_update() -> str:
     """Load the most recent investor update for context."""
-    updates_dir = os.path.join(os.path.dirname(__file__), "data", "past_updates")
-    if not os.path.exists(updates_dir):
-        return "(No previous update available)"
-
-    # Find the most recent update file
-    files = sorted(os.listdir(updates_dir), reverse=True)
-    if not files:
-        return "(No previous update available)"
-
-    with open(os.path.join(updates_dir, files[0]), "r") as f:
-        return f.read()
+    return past_updates.latest()
 
 
 def load_voice_profile() -> str:
     """Load the voice profile document."""
-    profile_path = os.path.join(os.path.dirname(__file__), "voice_profile.md")
+    profile_path = config.VOICE_PROFILE_PATH
     if os.path.exists(profile_path):
         with open(profile_path, "r") as f:
             return f.read()
     return "(Voice profile not found — using defaults)"
 
 
-def step_outreach(test_mode=False):
-    """Step 1: Send tailored outreach messages to each team member."""
+def step_outreach(test_mode=False, batch=False, poll_interval=None):
+    """
+    Step 1: Send tailored outreach messages to each team member.
+
+    With batch=True, all messages are generated in one Message Batches job
+    (half the token cost, but minutes instead of seconds) before sending.
+    A batch that was submitted but never dispatched is resumed rather than
+    resubmitted.
+    """
     print("\n📤 Starting outreach...\n")
 
-    current_state = state.start_new_cycle()
-    last_update = load_last_update()
+    current_state = state.load_state()
+    pending = current_state.get("outreach_batch")
+    if batch and pending and pending["status"] == "submitted":
+        print(f"  Resuming outreach batch {pending['id']}...\n")
+    else:
+        current_state = state.start_new_cycle()
+        pending = None
 
-    targets = TEAM if not test_mode else [p for p in TEAM if p["name"] == "Matan"]
+    targets = team.members() if not test_mode else [
+        p for p in [team.by_name(config.DRAFT_RECIPIENT_NAME)] if p
+    ]
 
-    for person in targets:
-        print(f"  Generating message for {person['name']}...")
+    # Everyone shares the recent TLDRs and asks (a cached prefix); each person
+    # also gets the sections of recent updates that cover their area
+    shared = past_updates.shared_context()
+    contexts = {person["name"]: past_updates.context_for(person, shared=bool(shared)) for person in targets}
 
-        # Use Claude to tailor the message based on last month's update
-        message = claude_client.tailor_outreach(person, last_update)
+    if batch:
+        _outreach_batch(current_state, targets, contexts, shared, pending, poll_interval)
+    else:
+        def send_outreach(person):
+            # Use Claude to tailor the message based on recent updates
+            message = claude_client.tailor_outreach(person, contexts[person["name"]], shared)
+            return slack_client.send_dm(person["slack_id"], message)
+
+        print(f"  Generating and sending {len(targets)} message(s)...\n")
+        # The first request writes the prompt cache that every other tailored
+        # message then reads, so send it on its own (if the prefix can be cached)
+        warm_up = 1 if claude_client.outreach_caches(shared) else 0
+        for person, result in fanout.run(send_outreach, targets, warm_up=warm_up):
+            _record_outreach_result(current_state, person, result)
+
+    print()
+    state.set_step(current_state, "outreach")
+    print("📤 Outreach complete!\n")
 
-        print(f"  Sending to {person['name']} ({person['slack_id']})...")
-        result = slack_client.send_dm(person["slack_id"], message)
 
-        if result["ok"]:
-            state.record_outreach(
-                current_state,
-                person["name"],
-                result["channel"],
-                result["ts"],
-            )
-            print(f"  ✓ {person['name']} messaged successfully\n")
-        else:
-            print(f"  ✗ Failed to message {person['name']}: {result['error']}\n")
+def _outreach_batch(current_state, targets, contexts, shared, pending, poll_interval):
+    """Generate outreach via Message Batches, then fan out the Slack sends."""
+    if pending:
+        targets = [p for p in targets if p["name"] in pending["targets"]]
+        batch_id, messages = pending["id"], {}
+    else:
+        print(f"  Submitting {len(targets)} prompt(s) as one batch...\n")
+        batch_id, messages = claude_client.submit_outreach_batch(targets, contexts, shared)
+        if batch_id:
+            state.record_outreach_batch(current_state, batch_id, [p["name"] for p in targets])
 
-    state.set_step(current_state, "outreach")
-    print("📤 Outreach complete!\n")
+    if batch_id:
+        claude_client.wait_for_batch(batch_id, poll_interval or config.BATCH_POLL_INTERVAL)
+        messages.update(claude_client.outreach_batch_results(batch_id, targets, contexts, shared))
+
+    # Anyone already messaged before a restart is skipped
+    to_send = [p for p in targets if p["name"] not in current_state["contacts"]]
+
+    def send_outreach(person):
+        # Cached messages and failed batch requests fall back to a direct call
+        message = messages.get(person["name"]) or claude_client.tailor_outreach(person, contexts[person["name"]], shared)
+        return slack_client.send_dm(person["slack_id"], message)
+
+    print(f"\n  Sending {len(to_send)} message(s)...\n")
+    for person, result in fanout.run(send_outreach, to_send):
+        _record_outreach_result(current_state, person, result)
+
+    state.finish_outreach_batch(current_state)
+
+
+def _record_outreach_result(current_state, person, result):
+    if result["ok"]:
+        state.record_outreach(
+            current_state,
+            person["name"],
+            result["channel"],
+            result["ts"],
+        )
+        print(f"  ✓ {person['name']} messaged successfully")
+    else:
+        print(f"  ✗ Failed to message {person['name']}: {result['error']}")
 
 
 def step_check_responses():
-    """Check for new responses from team members."""
+    """
+    Check for new responses from team members.
+
+    Each contact's DM is read from where the last check stopped (their
+    last_seen_ts), including thread replies, and all contacts are checked
+    concurrently. People who already responded are still checked, so
+    follow-up messages get picked up too.
+    """
     print("\n🔍 Checking for responses...\n")
 
     current_state = state.load_state()
 
-    for name, info in current_state["contacts"].items():
-        if info["responded"]:
-            print(f"  ✓ {name} already responded")
-            continue
-
-        if not info.get("message_ts"):
-            continue
+    contacts = [
+        (name, info) for name, info in current_state["contacts"].items()
+        if info.get("message_ts")
+    ]
 
+    def check(contact):
+        name, info = contact
         # Check for new messages from this person
-        messages = slack_client.get_dm_responses(
-            # Find the person's slack_id from TEAM config
-            next(p["slack_id"] for p in TEAM if p["name"] == name),
-            info["message_ts"],
+        return slack_client.sync_dm_responses(
+            team.by_name(name)["slack_id"],
+            info.get("last_seen_ts") or info["message_ts"],
+            channel_id=info.get("channel"),
+            # Replies in the outreach thread count too
+            threads=info.get("threads") or [info["message_ts"]],
         )
 
-        if messages:
-            # Combine all their messages into one response
-            response_text = "\n".join(msg.get("text", "") for msg in messages)
-            state.record_response(current_state, name, response_text)
-            print(f"  ✓ {name} responded! ({len(messages)} message(s))")
+    for (name, info), result in fanout.run(check, contacts):
+        if "messages" not in result:
+            print(f"  ✗ Failed to check {name}: {result['error']}")
+            continue
+
+        # One commit per contact, however many messages came in
+        with state.transaction():
+            # record_message skips anything the listener (--listen) already captured
+            new_messages = [m for m in result["messages"] if state.record_message(current_state, name, m)]
+            # If the DM had to be reopened, later checks go straight to the new channel
+            state.advance_sync_cursor(current_state, name, result["latest_ts"], result["threads"], result.get("channel"))
+
+        if new_messages:
+            print(f"  ✓ {name} responded! ({len(new_messages)} new message(s))")
+        elif info["responded"]:
+            print(f"  ✓ {name} already responded")
         else:
             print(f"  ○ {name} hasn't responded yet")
 
+    # New replies queued background extractions (and maybe pre-drafts); let them land
+    extracted = extraction.wait()
+    if extracted:
+        print(f"\n  🗂️  {extracted} response(s) extracted")
+    predrafted = drafting.wait_for_predrafts()
+    if predrafted:
+        print(f"\n  ✍️  {predrafted} section(s) pre-drafted")
+
     print("\n🔍 Response check complete!\n")
 
 
@@ -124,8 +241,9 @@ def step_nudge():
         print("  Everyone has responded! No nudges needed.\n")
         return
 
+    targets = []
     for name in non_responders:
-        person = next((p for p in TEAM if p["name"] == name), None)
+        person = team.by_name(name)
         if not person:
             continue
 
@@ -134,14 +252,18 @@ def step_nudge():
             print(f"  ○ {name} already nudged, skipping")
             continue
 
+        targets.append(person)
+
+    def send_nudge(person):
         message = claude_client.generate_nudge(person)
-        result = slack_client.send_dm(person["slack_id"], message)
+        return slack_client.send_dm(person["slack_id"], message)
 
+    for person, result in fanout.run(send_nudge, targets):
         if result["ok"]:
-            state.record_nudge(current_state, name)
-            print(f"  ✓ Nudged {name}")
+            state.record_nudge(current_state, person["name"])
+            print(f"  ✓ Nudged {person['name']}")
         else:
-            print(f"  ✗ Failed to nudge {name}")
+            print(f"  ✗ Failed to nudge {person['name']}")
 
     state.set_step(current_state, "nudge")
     print("\n🔔 Nudges complete!\n")
@@ -155,30 +277,41 @@ def step_escalate():
     non_responders = state.get_non_responders(current_state)
 
     # Don't escalate Matan to himself
-    non_responders = [n for n in non_responders if n != "Matan"]
+    non_responders = [n for n in non_responders if n != config.DRAFT_RECIPIENT_NAME]
 
     if not non_responders:
         print("  No escalations needed.\n")
         return
 
-    for name in non_responders:
-        info = current_state["contacts"][name]
-        if info.get("escalated"):
-            continue
+    targets = [
+        name for name in non_responders
+        if not current_state["contacts"][name].get("escalated")
+    ]
 
+    def send_escalation(name):
         message = claude_client.generate_escalation(name)
-        result = slack_client.send_dm(DRAFT_RECIPIENT, message)
+        return slack_client.send_dm(config.DRAFT_RECIPIENT, message)
 
+    for name, result in fanout.run(send_escalation, targets):
         if result["ok"]:
             state.record_escalation(current_state, name)
-            print(f"  ✓ Escalated {name} to Matan")
+            print(f"  ✓ Escalated {name} to {config.DRAFT_RECIPIENT_NAME}")
 
     state.set_step(current_state, "escalate")
     print("\n⚠️  Escalations complete!\n")
 
 
-def step_draft():
-    """Generate the investor update draft."""
+def step_draft(progress=False, mode=None):
+    """
+    Generate the investor update draft.
+
+    In "sections" mode (config.DRAFT_MODE) each section is drafted
+    concurrently and a short pass adds the TLDR and sign-off; a section that
+    fails is retried alone on the next run. In "single" mode the draft is
+    streamed into data/latest_draft.md as it's written (and echoed to the
+    terminal with progress=True). If the stream fails for good, the partial
+    draft is checkpointed in state and the next run continues from it.
+    """
     print("\n📝 Generating draft...\n")
 
     # First, do a final check for any new responses
@@ -186,7 +319,6 @@ def step_draft():
 
     current_state = state.load_state()
     inputs = state.get_all_inputs(current_state)
-    last_update = load_last_update()
     voice_profile = load_voice_profile()
 
     # Log what we have
@@ -196,25 +328,71 @@ def step_draft():
 
     print("\n  Generating draft with Claude...\n")
 
-    draft = claude_client.generate_draft(inputs, last_update, voice_profile)
+    draft_path = os.path.join(state.STATE_DIR, "latest_draft.md")
+    os.makedirs(os.path.dirname(draft_path), exist_ok=True)
 
-    # Save the draft
-    current_state["draft"] = draft
-    state.save_state(current_state)
+    if (mode or config.DRAFT_MODE) == "sections":
+        draft = drafting.generate(current_state, inputs, voice_profile, progress=progress)
+        if draft is None:
+            print("\n  ✗ Some sections failed — rerun --step draft to retry just those.\n")
+            return
+    else:
+        draft = _stream_draft(current_state, inputs, voice_profile, draft_path, progress)
+        if draft is None:
+            return
 
-    # Also save to a file for easy access
-    draft_path = os.path.join(os.path.dirname(__file__), "data", "latest_draft.md")
-    os.makedirs(os.path.dirname(draft_path), exist_ok=True)
+    # Rewrite the file in one go: stream retries can leave stray whitespace
     with open(draft_path, "w") as f:
         f.write(draft)
 
+    # Save the draft
+    state.update(current_state, draft=draft, draft_checkpoint=None)
+
     state.set_step(current_state, "draft")
     print(f"  ✓ Draft saved to {draft_path}")
     print("\n📝 Draft generation complete!\n")
 
 
-def step_deliver():
-    """Send the draft to Matan for review."""
+def _stream_draft(current_state, inputs, voice_profile, draft_path, progress):
+    """Single-generation draft, streamed to draft_path. Returns None if it was checkpointed."""
+    with open(draft_path, "w") as f:
+        def on_text(chunk):
+            f.write(chunk)
+            f.flush()
+            if progress:
+                print(chunk, end="", flush=True)
+
+        try:
+            draft = claude_client.generate_draft(
+                # Structured records rather than raw Slack text, where extraction worked
+                extraction.compact(inputs) if config.EXTRACT_RESPONSES else inputs,
+                load_last_update(),
+                voice_profile,
+                on_text=on_text,
+                checkpoint=current_state.get("draft_checkpoint"),
+                kpi_table=kpis.table(
+                    kpis.cycle_month(current_state), drafting.section_inputs(inputs)[sections.KPIS]
+                ),
+            )
+        except claude_client.StreamInterrupted as e:
+            state.save_draft_checkpoint(current_state, e.checkpoint)
+            print(f"\n  ✗ {e}")
+            print("  Partial draft checkpointed — rerun --step draft to continue it.\n")
+            return None
+
+    if progress:
+        print("\n")
+    return draft
+
+
+def step_deliver(mode=None):
+    """
+    Send the draft to Matan for review.
+
+    In "thread" mode (config.DELIVERY_MODE) the draft is one message plus
+    threaded replies, split on section and paragraph boundaries; in "file"
+    mode it's uploaded as a single markdown file. See delivery.py.
+    """
     print("\n📬 Delivering draft...\n")
 
     current_state = state.load_state()
@@ -224,38 +402,117 @@ def step_deliver():
         print("  ✗ No draft found! Run --step draft first.\n")
         return
 
-    # Send the draft to Matan
-    header = (
-        "📋 *Your investor update draft is ready!*\n\n"
-        "Here's what I put together based on the team's inputs. "
-        "Please review, edit as needed, and let me know if you'd like any changes.\n\n"
-        "---\n\n"
-    )
+    # Replies to the draft can only come after this, even if Slack never reports the file share's ts
+    sent_at = f"{time.time():.6f}"
+    result = delivery.deliver(draft, mode, month=f"{current_state['month']} {current_state['year']}")
+    if not result["ok"]:
+        print(f"  ✗ Delivery failed: {result['error']} — rerun --step deliver to send it again.\n")
+        return
 
-    # Slack has a 4000 char limit per message, so split if needed
-    full_message = header + draft
-    if len(full_message) <= 4000:
-        slack_client.send_dm(DRAFT_RECIPIENT, full_message)
-    else:
-        # Send in chunks
-        slack_client.send_dm(DRAFT_RECIPIENT, header + "_(Draft is long, sending in parts...)_")
-        chunks = [draft[i:i + 3500] for i in range(0, len(draft), 3500)]
-        for i, chunk in enumerate(chunks):
-            slack_client.send_dm(DRAFT_RECIPIENT, f"*Part {i + 1}:*\n\n{chunk}")
-
-    current_state["draft_sent"] = True
-    state.save_state(current_state)
+    # Where the draft went, so replies to it can be found later
+    draft_message = {"channel": result["channel"], "ts": result["ts"], "file": result.get("file"), "sent_at": sent_at}
+    state.update(current_state, draft_sent=True, draft_message=draft_message)
     state.set_step(current_state, "deliver")
 
-    print("  ✓ Draft sent to Matan!")
+    print(f"  ✓ Draft sent to {config.DRAFT_RECIPIENT_NAME}!")
     print("\n📬 Delivery complete!\n")
 
 
+def step_revise():
+    """
+    Apply Matan's feedback on the delivered draft.
+
+    Only the sections his replies are about are rewritten, with the rest of
+    the draft as context, and a diff is posted in the draft's thread. Each
+    round is versioned in state. See revision.py.
+    """
+    print("\n✏️  Checking for feedback on the draft...\n")
+
+    current_state = state.load_state()
+    entry = revision.revise(current_state, load_voice_profile())
+    if entry:
+        print(f"\n  ✓ Revision {entry['version']} posted ({', '.join(entry['changes'])})")
+    print("\n✏️  Revision check complete!\n")
+
+
+def enable_predraft(draft_mode=None):
+    """
+    Extract replies in the background as they come in, and pre-draft sections
+    from them (sections draft mode only).
+    """
+    extraction.enable()
+    if config.PREDRAFT and (draft_mode or config.DRAFT_MODE) == "sections":
+        drafting.enable_predraft(load_voice_profile())
+
+
+def run_step(step, batch=False, poll_interval=None, progress=False, draft_mode=None, deliver_mode=None):
+    """Run one step by name, passing along the options that apply to it."""
+    enable_predraft(draft_mode)
+    step_map = {
+        "outreach": lambda: step_outreach(batch=batch, poll_interval=poll_interval),
+        "check": step_check_responses,
+        "nudge": step_nudge,
+        "escalate": step_escalate,
+        "draft": lambda: step_draft(progress=progress, mode=draft_mode),
+        "deliver": lambda: step_deliver(mode=deliver_mode),
+        "revise": step_revise,
+    }
+
+    with tracing.step(step):
+        step_map[step]()
+
+
+def print_step_stats():
+    """Print the step's trace totals, then generation cache, Claude resilience and Slack rate-limit counters if it used them."""
+    trace = tracing.summary()
+    if trace:
+        print(
+            f"📈 Trace: {trace['seconds']}s, {trace['slack_calls']} Slack / {trace['claude_calls']} Claude call(s), "
+            f"{trace['input_tokens']:,} in / {trace['output_tokens']:,} out tokens (${trace['cost_usd']:.4f}), "
+            f"{trace['retries']} retried"
+        )
+        if trace["slowest"]:
+            print("   Slowest p95: " + ", ".join(f"{method} {ms:,.0f}ms" for method, ms in trace["slowest"]))
+        if trace["file"]:
+            print(f"   Saved to {trace['file']}")
+        print()
+
+    stats = gen_cache.stats()
+    if stats["hits"] or stats["misses"]:
+        print(
+            f"💾 Generation cache: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+            f"{stats['evictions']} eviction(s)\n"
+        )
+
+    claude = resilience.stats()
+    if any(claude.values()):
+        print(
+            f"🛟 Claude resilience: {claude['retries']} retried, {claude['hedges']} hedged, "
+            f"{claude['fallbacks']} fell back, {claude['circuit_opens']} circuit open(s)\n"
+        )
+
+    limits = rate_limit.stats()
+    if limits["queued"] or limits["throttled"]:
+        print(
+            f"🚦 Slack rate limits: {limits['queued']} call(s) queued ({limits['wait_seconds']}s), "
+            f"{limits['throttled']} throttled, {limits['retried']} retried\n"
+        )
+
+
+def export_trace(path, fmt):
+    """Write the current cycle's trace to path."""
+    count = tracing.export(path, fmt)
+    if count:
+        print(f"📈 Exported {count} trace record(s) to {path} ({fmt})\n")
+    else:
+        print("📈 No trace recorded yet for this data directory.\n")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Carefam Investor Update Agent")
     parser.add_argument(
         "--step",
-        choices=["outreach", "check", "nudge", "escalate", "draft", "deliver"],
+        choices=STEPS,
         help="Which step to run",
     )
     parser.add_argument(
@@ -263,28 +520,154 @@ def main():
         action="store_true",
         help="Test mode — only sends to Matan",
     )
+    parser.add_argument(
+        "--listen",
+        action="store_true",
+        help="Run a long-lived listener that records replies as Slack delivers them",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a daemon: scheduled steps from config.SCHEDULE plus hourly response checks",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Max concurrent per-person pipelines (1 = serial)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the generation cache and always call Claude",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Outreach only — generate messages via the Message Batches API",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        help="Seconds between batch status polls",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Draft only — print the draft as it streams in",
+    )
+    parser.add_argument(
+        "--draft-mode",
+        choices=["sections", "single"],
+        help="Draft only — draft sections in parallel, or the whole update in one stream (default: config.DRAFT_MODE)",
+    )
+    parser.add_argument(
+        "--deliver-mode",
+        choices=["thread", "file"],
+        help="Deliver only — post the draft as a message with threaded parts, or upload it as one markdown file (default: config.DELIVERY_MODE)",
+    )
+    parser.add_argument(
+        "--companies",
+        help="Multi-company mode: a company JSON file or a directory of them (see tenants.py)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help="Multi-company mode: max companies run in parallel (default: CPU count)",
+    )
+    parser.add_argument(
+        "--trace-out",
+        help="Export this cycle's trace to a file (after the step, if one is given)",
+    )
+    parser.add_argument(
+        "--trace-format",
+        choices=["jsonl", "otlp"],
+        default="jsonl",
+        help="Format for --trace-out: JSON lines as stored, or OpenTelemetry OTLP/JSON",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report import time of a cold start for --step (default: every step); exits 1 if over budget",
+    )
 
     args = parser.parse_args()
 
+    if args.profile_startup:
+        import startup
+
+        ok = startup.report([args.step] if args.step else list(startup.STEP_MODULES))
+        sys.exit(0 if ok else 1)
+
+    if args.workers:
+        fanout.set_workers(args.workers)
+    if args.no_cache:
+        gen_cache.set_enabled(False)
+
+    if args.listen:
+        enable_predraft(args.draft_mode)
+        import listener
+
+        listener.serve()
+        return
+
+    if args.serve:
+        import daemon
+
+        daemon.serve(
+            batch=args.batch,
+            poll_interval=args.poll_interval,
+            draft_mode=args.draft_mode,
+            deliver_mode=args.deliver_mode,
+        )
+        return
+
+    if args.trace_out and not args.step and not args.test:
+        export_trace(args.trace_out, args.trace_format)
+        return
+
     if not args.step and not args.test:
         parser.print_help()
         sys.exit(1)
 
+    if args.companies:
+        if not args.step:
+            parser.error("--companies needs --step")
+        import tenants
+
+        results = tenants.run_all(
+            tenants.load_tenants(args.companies),
+            args.step,
+            processes=args.processes,
+            workers=args.workers,
+            cache=not args.no_cache,
+            batch=args.batch,
+            poll_interval=args.poll_interval,
+            progress=args.progress,
+            draft_mode=args.draft_mode,
+            deliver_mode=args.deliver_mode,
+        )
+        sys.exit(0 if all(r["ok"] for r in results) else 1)
+
     if args.test:
         print("\n🧪 TEST MODE — only sending to Matan\n")
-        step_outreach(test_mode=True)
+        with tracing.step("outreach"):
+            step_outreach(test_mode=True, batch=args.batch, poll_interval=args.poll_interval)
+        print_step_stats()
+        if args.trace_out:
+            export_trace(args.trace_out, args.trace_format)
         return
 
-    step_map = {
-        "outreach": step_outreach,
-        "check": step_check_responses,
-        "nudge": step_nudge,
-        "escalate": step_escalate,
-        "draft": step_draft,
-        "deliver": step_deliver,
-    }
-
-    step_map[args.step]()
+    run_step(
+        args.step,
+        batch=args.batch,
+        poll_interval=args.poll_interval,
+        progress=args.progress,
+        draft_mode=args.draft_mode,
+        deliver_mode=args.deliver_mode,
+    )
+    print_step_stats()
+    if args.trace_out:
+        export_trace(args.trace_out, args.trace_format)
 
 
 if __name__ == "__main__":
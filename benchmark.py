@@ -0,0 +1,259 @@
+"""
+Benchmark — runs agent steps end to end against the local fake APIs.
+
+Usage:
+    python benchmark.py                                  # rosters of 5, 50, 500; every step
+    python benchmark.py --sizes 5 50 --steps outreach check --out before.json
+    python benchmark.py --claude-latency 1.5 --claude-error-rate 0.05 --slack-latency 0.1
+
+For every roster size a synthetic team (and one past update) is generated in
+a temporary data directory, the fake Slack and Anthropic servers
+(fakes/slack_server.py, fakes/anthropic_server.py) are started as separate
+processes, and each step is run in order through agent.run_step. For every
+step the result records:
+
+  - wall time
+  - API calls per method, and bytes sent/received, as counted by the fakes
+  - peak Python memory the step allocated on top of what was already
+    allocated before it (tracemalloc)
+  - client-side Slack pacing and Claude retry counters
+
+Results go to a JSON file (--out) meant to be diffed between versions.
+Slack's per-tier pacing is lifted by default so the numbers measure the
+agent rather than the sleep schedule; --real-slack-limits keeps it.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime, timezone
+
+import config
+import sections
+
+STEPS = ["outreach", "check", "nudge", "escalate", "draft", "deliver"]
+SIZES = [5, 50, 500]
+
+# Section labels and questions synthetic people are given, round robin
+_ROLES = [
+    ("Engineer", ["R&D, Product, Design"], ["What shipped this month?"]),
+    ("Marketplace", ["Supply side", "Ops efficiency", "KPIs"], ["This month's KPIs?", "Supply headline?"]),
+    ("AE", ["Demand side (new deals, pipeline)"], ["New customers signed?"]),
+    ("CS", ["Demand side (customer wins, expansions)"], ["Customer wins?"]),
+    ("Ops", ["Hires", "Other Things Happening", "Asks"], ["New hires?", "Any asks?"]),
+]
+
+
+def roster(size: int) -> list[dict]:
+    """A synthetic team of `size` people covering every section."""
+    team = []
+    for i in range(size):
+        role, labels, asks = _ROLES[i % len(_ROLES)]
+        team.append({
+            "name": f"Person {i:03d}",
+            "role": role,
+            "slack_id": f"UB{i:07d}",
+            "sections": labels,
+            "asks": asks,
+        })
+    return team
+
+
+def _past_update() -> str:
+    """A small past update with every section, so prompts get realistic context."""
+    lines = ["# April '25 Update", "", "Dear Investors,", "", "**TLDR**", "Best month yet; two new hospitals; shipped the candidate app.", ""]
+    for section in sections.DRAFTED:
+        if section in sections.MARKETPLACE_LABELS:
+            lines.append(f"- **{sections.MARKETPLACE_LABELS[section]}.** Steady progress on {section.lower()} this month.")
+        else:
+            lines += [f"**{sections.HEADINGS[section]}**", f"Notes on {section} from last month.", ""]
+    lines += ["", "As always, happy to chat further regarding any of the above.", "", "Best,", "Matan"]
+    return "\n".join(lines)
+
+
+def _start(module: str, *args: str) -> tuple[subprocess.Popen, str]:
+    """Start a fake server in its own process; returns (process, base URL)."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", module, "--port", "0", *args],
+        stdout=subprocess.PIPE,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    url = process.stdout.readline().strip().rsplit(" ", 1)[-1]
+    if not url.startswith("http"):
+        process.kill()
+        raise RuntimeError(f"{module} didn't start")
+    return process, url
+
+
+def _server_stats(base_url: str, reset: bool = False) -> dict:
+    root = base_url.split("/api/")[0]
+    request = urllib.request.Request(f"{root}/_stats", method="POST" if reset else "GET")
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def _delta(before: dict, after: dict) -> dict:
+    return {key: round(after[key] - before[key], 3) for key in after}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(size: int, steps: list[str], slack_url: str, claude_url: str, options: dict) -> list[dict]:
+    """Run every step for one roster size; returns one result per step."""
+    import agent
+    import gen_cache
+    import rate_limit
+    import resilience
+    import tenants
+
+    data_dir = tempfile.mkdtemp(prefix=f"bench-{size}-")
+    updates_dir = os.path.join(data_dir, "past_updates")
+    os.makedirs(updates_dir)
+    with open(os.path.join(updates_dir, "2025-04.md"), "w") as f:
+        f.write(_past_update())
+
+    team = roster(size)
+    tenants.apply({
+        "name": "Benchmark Co",
+        "slug": f"bench-{size}",
+        "team": team,
+        "draft_recipient": team[0]["slack_id"],
+        "data_dir": data_dir,
+        "voice_profile": config.VOICE_PROFILE_PATH,
+    })
+    gen_cache.set_enabled(options["cache"])
+    if not options["real_slack_limits"]:
+        rate_limit.TIER_PER_MINUTE = {tier: 1_000_000 for tier in rate_limit.TIER_PER_MINUTE}
+        rate_limit.POST_MESSAGE_PER_MINUTE = 1_000_000
+
+    results = []
+    for step in steps:
+        _server_stats(slack_url, reset=True)
+        _server_stats(claude_url, reset=True)
+        limits, claude = rate_limit.stats(), resilience.stats()
+        error = None
+
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                agent.run_step(step, batch=options["batch"])
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        wall = time.perf_counter() - started
+        # Memory the step itself needed on top of what was already allocated
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+
+        results.append({
+            "roster": size,
+            "step": step,
+            "ok": error is None,
+            "error": error,
+            "wall_seconds": round(wall, 3),
+            "peak_memory_bytes": peak,
+            "slack": _server_stats(slack_url),
+            "claude": _server_stats(claude_url),
+            "slack_pacing": _delta(limits, rate_limit.stats()),
+            "claude_resilience": _delta(claude, resilience.stats()),
+        })
+        print(f"  {size:>4} people  {step:<9} {wall:7.2f}s  {peak / 1e6:7.1f} MB" + (f"  ✗ {error}" if error else ""))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark agent steps against local fake APIs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Roster sizes to run")
+    parser.add_argument("--steps", nargs="+", choices=STEPS, default=STEPS, help="Steps to run, in order")
+    parser.add_argument("--out", default="benchmark_results.json", help="Where to write the results")
+    parser.add_argument("--workers", type=int, help="Max concurrent per-person pipelines")
+    parser.add_argument("--batch", action="store_true", help="Run outreach with --batch")
+    parser.add_argument("--cache", action="store_true", help="Keep the generation cache on (off by default)")
+    parser.add_argument("--real-slack-limits", action="store_true", help="Keep Slack's per-tier pacing")
+    parser.add_argument("--slack-latency", type=float, default=0.02)
+    parser.add_argument("--slack-error-rate", type=float, default=0.0, help="Fraction of Slack calls answered `ratelimited`")
+    parser.add_argument("--reply-rate", type=float, default=0.7, help="Fraction of people who reply to outreach")
+    parser.add_argument("--claude-latency", type=float, default=0.5)
+    parser.add_argument("--claude-error-rate", type=float, default=0.0)
+    parser.add_argument("--claude-output-tokens", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    slack, slack_url = _start(
+        "fakes.slack_server",
+        "--latency", str(args.slack_latency),
+        "--error-rate", str(args.slack_error_rate),
+        "--reply-rate", str(args.reply_rate),
+        "--seed", str(args.seed),
+    )
+    claude, claude_url = _start(
+        "fakes.anthropic_server",
+        "--latency", str(args.claude_latency),
+        "--error-rate", str(args.claude_error_rate),
+        "--output-tokens", str(args.claude_output_tokens),
+        "--batch-delay", "1",
+        "--seed", str(args.seed),
+    )
+    os.environ.update({
+        "SLACK_API_URL": slack_url,
+        "SLACK_BOT_TOKEN": "xoxb-fake",
+        "ANTHROPIC_BASE_URL": claude_url,
+        "ANTHROPIC_API_KEY": "fake",
+    })
+
+    import fanout
+
+    if args.workers:
+        fanout.set_workers(args.workers)
+
+    # The SDK is otherwise imported by the first step that calls Claude, and
+    # importing under tracemalloc is several times slower. Cold-start cost is
+    # measured by `agent.py --profile-startup` instead.
+    import anthropic  # noqa: F401
+
+    options = {"cache": args.cache, "batch": args.batch, "real_slack_limits": args.real_slack_limits}
+    tracemalloc.start()
+    print("\n⏱️  Benchmarking against local fakes...\n")
+    results = []
+    try:
+        for size in args.sizes:
+            results += run_size(size, args.steps, slack_url, claude_url, options)
+    finally:
+        tracemalloc.stop()
+        slack.terminate()
+        claude.terminate()
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "settings": {key: value for key, value in vars(args).items() if key != "out"},
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Results written to {args.out}\n")
+    sys.exit(0 if all(result["ok"] for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,97 +2,381 @@
 Claude client — handles tailoring outreach questions and drafting the investor update.
 """
 
-import os
-import anthropic
-from config import CLAUDE_MODEL, CLAUDE_MAX_TOKENS
+import json
+import re
+import time
+
+import clients
+import gen_cache
+import resilience
+import sections
+import tracing
+import config
+from config import (
+    CLAUDE_MODEL,
+    CLAUDE_MAX_TOKENS,
+    DRAFT_SECTION_MAX_TOKENS,
+    EXTRACTION_MAX_TOKENS,
+    EXTRACTION_MODEL,
+    PROMPT_CACHE_MIN_TOKENS,
+    STREAM_RESUME_ATTEMPTS,
+)
+
+# Placeholder the update frame (title, TLDR, sign-off) leaves for the sections
+SECTIONS_MARKER = "[[SECTIONS]]"
+
+# What each separately drafted section covers (from voice_profile.md)
+_SECTION_GUIDES = {
+    sections.KPIS: "the Monthly KPIs block: one KPI per line as \"Name: number (+X%)\", "
+    "in the same order and wording as previous months. Use (-) when there's no prior number to compare to",
+    sections.SUPPLY: "the Supply side (candidates) paragraph of the Marketplace section: "
+    "candidate acquisition volume, new channels tested, quality improvements",
+    sections.DEMAND: "the Demand side (facilities) paragraph of the Marketplace section: "
+    "new customers signed, expansion within existing customers, pipeline deals, state expansion",
+    sections.OPS: "the Operational efficiency paragraph of the Marketplace section: "
+    "process improvements, SOP work, seasonal effects, funnel optimization",
+    sections.PRODUCT: "the R&D, Product, Design section: features described by their impact "
+    "on the hiring funnel and why they matter, progress on longer-term projects, AI/agent work",
+    sections.OTHER: "the Other Things Happening section: new team members (name, title, 1-2 "
+    "sentence background), conferences (name, location, ask if investors are attending), travel",
+    sections.ASKS: "the Asks section: specific intros or help wanted, with why it matters, framed warmly",
+}
 
 
 def get_client():
-    """Initialize Anthropic client."""
-    return anthropic.Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"])
+    """Get the shared Anthropic client."""
+    return clients.anthropic()
 
 
-def tailor_outreach(person: dict, last_update: str) -> str:
+def _cached(text: str) -> dict:
+    """A system text block marked as a prompt-cache breakpoint."""
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+def cacheable(text: str) -> bool:
+    """Whether a prompt prefix is long enough to be cached (at roughly 4 characters per token)."""
+    return len(text) // 4 >= PROMPT_CACHE_MIN_TOKENS
+
+
+def _log_usage(label: str, message, batch: bool = False):
+    """Print token usage, including prompt-cache reads/writes, and add it to the step's trace."""
+    usage = message.usage
+    tracing.record_usage(message.model, usage, batch=batch)
+    cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+    print(
+        f"  [claude] {label}: {usage.input_tokens} in / {usage.output_tokens} out "
+        f"(cache read {cache_read}, cache write {cache_write})"
+    )
+
+
+def _create(label: str, **params) -> str:
     """
-    Generate a tailored Slack DM for a team member, based on last month's update.
+    Call messages.create through the generation cache and return the text.
 
-    Args:
-        person: dict with name, role, sections, asks
-        last_update: the full text of last month's investor update
-    
-    Returns:
-        The message string to send via Slack
+    The cache key covers every request parameter, so any change to the model,
+    prompt or limits is a miss. Cache misses go through resilience.create
+    (retries, deadline, hedging, circuit breaker).
     """
-    client = get_client()
+    with tracing.span("claude messages.create", kind="claude", label=label, model=params["model"]) as span:
+        key = gen_cache.make_key(params)
+        cached = gen_cache.get(key)
+        span["cache_hit"] = cached is not None
+        if cached is not None:
+            print(f"  [claude] {label}: generation cache hit")
+            return cached
 
-    prompt = f"""You are a helpful assistant that drafts Slack DMs to collect inputs for a monthly investor update.
+        message, model = resilience.create(get_client(), label, **params)
+        _log_usage(label, message)
 
-You need to write a casual Slack DM to {person['name']} ({person['role']}) asking for their input for this month's investor update.
+    text = message.content[0].text
+    if model == params["model"]:
+        # A fallback model's answer isn't what this key asked for
+        gen_cache.put(key, text)
+    return text
 
-Their areas of responsibility: {', '.join(person['sections'])}
 
-Standard questions to ask them:
-{chr(10).join(f'- {q}' for q in person['asks'])}
+class StreamInterrupted(Exception):
+    """A streamed generation dropped partway; .checkpoint lets a later run continue it."""
 
-Here is last month's investor update for context. Use it to add 1-2 specific follow-up questions about things mentioned last month that are relevant to this person's area:
+    def __init__(self, key: str, partial: str, cause: Exception):
+        super().__init__(f"stream interrupted after {len(partial)} chars: {cause}")
+        self.checkpoint = {"key": key, "text": partial}
 
----
-{last_update}
----
+
+def _resumable(error: Exception) -> bool:
+    """Whether a failed stream is worth reopening: anything resilience retries, or a connection dropped mid-stream."""
+    # Mid-stream transport errors surface as the SDK's raw HTTP client exceptions
+    # (httpx.TransportError) rather than anthropic.APIConnectionError
+    dropped = any(cls.__name__ == "TransportError" for cls in type(error).__mro__)
+    return dropped or isinstance(error, _StreamTruncated) or resilience.is_retryable(error)
+
+
+class _StreamTruncated(Exception):
+    """The event stream closed cleanly but the message never finished."""
+
+
+def _stream(label: str, on_text=None, checkpoint: dict | None = None, **params) -> str:
+    """
+    Stream messages.create through the generation cache and return the text.
+
+    If the stream drops, it's reopened with the text so far as an assistant
+    prefill, so the model continues where it stopped instead of starting
+    over. After STREAM_RESUME_ATTEMPTS reopen attempts, StreamInterrupted is
+    raised with a checkpoint that can be passed back in by a later run.
+    """
+    on_text = on_text or (lambda text: None)
+    with tracing.span("claude messages.stream", kind="claude", label=label, model=params["model"]) as span:
+        key = gen_cache.make_key(params)
+        cached = gen_cache.get(key)
+        span["cache_hit"] = cached is not None
+        if cached is not None:
+            print(f"  [claude] {label}: generation cache hit")
+            on_text(cached)
+            return cached
+
+        text = ""
+        if checkpoint and checkpoint["key"] == key:
+            # The API rejects a prefill that ends in whitespace
+            text = checkpoint["text"].rstrip()
+            span["resumed_chars"] = len(text)
+            print(f"  [claude] {label}: resuming from checkpoint ({len(text)} chars)")
+            on_text(text)
+
+        for attempt in range(STREAM_RESUME_ATTEMPTS + 1):
+            request = dict(params)
+            if text:
+                request["messages"] = params["messages"] + [{"role": "assistant", "content": text}]
+            try:
+                model = resilience.pick_model(params["model"])
+            except resilience.CircuitOpenError as e:
+                raise StreamInterrupted(key, text, e) from e
+            request["model"] = model
+            try:
+                with tracing.timed("claude messages.stream"):
+                    with get_client().messages.stream(**request) as stream:
+                        for chunk in stream.text_stream:
+                            text += chunk
+                            on_text(chunk)
+                        message = stream.get_final_message()
+                    if message.stop_reason is None:
+                        raise _StreamTruncated("stream ended before message_stop")
+                resilience.record_success(model)
+                break
+            except Exception as e:
+                resilience.record_failure(model, e)
+                if not _resumable(e):
+                    # A bad request or auth error fails the same way however often it's retried
+                    raise
+                # Keep the partial text rather than throw it away
+                if attempt == STREAM_RESUME_ATTEMPTS:
+                    raise StreamInterrupted(key, text, e) from e
+                delay = resilience.backoff_delay(attempt, e)
+                tracing.record_retry("claude messages.stream")
+                print(f"  [claude] {label}: stream dropped ({e}), continuing from {len(text)} chars in {delay:.1f}s")
+                text = text.rstrip()
+                time.sleep(delay)
+
+        _log_usage(label, message)
+    if model == params["model"]:
+        gen_cache.put(key, text)
+    return text
+
+
+def _outreach_system(shared: str | None = None) -> str:
+    """The outreach instructions plus the recent updates' TLDR and asks: the prefix every DM prompt shares."""
+    system = """You are a helpful assistant that drafts Slack DMs to collect inputs for a monthly investor update.
+
+You'll be asked to write a casual Slack DM to one team member asking for their input for this month's investor update, along with the parts of recent investor updates that cover their area. Use those to add 1-2 specific follow-up questions about things mentioned recently (especially last month) that are relevant to this person's area.
 
 Rules:
 - Keep it casual — like a quick Slack DM between teammates
-- Start with "Hey {person['name']}!" 
+- Start with "Hey <their name>!"
 - Keep it short — no more than 8-10 lines total
-- Include the standard questions PLUS 1-2 tailored follow-ups from last month
+- Include the standard questions PLUS 1-2 tailored follow-ups from recent updates
 - End with something like "A few bullets is totally fine — I'll handle the writing"
 - Don't be overly formal or robotic
 - Use an occasional emoji but don't overdo it"""
+    if shared:
+        system += f"""
 
-    message = client.messages.create(
-        model=CLAUDE_MODEL,
-        max_tokens=1024,
-        messages=[{"role": "user", "content": prompt}],
-    )
+The big picture from recent investor updates (TLDR and asks), for every team member:
+
+---
+{shared}
+---"""
+    return system
+
+
+def _outreach_params(person: dict, context: str, shared: str | None = None) -> dict:
+    """messages.create parameters for one tailored outreach DM."""
+    system = _outreach_system(shared)
+    prompt = f"""Recent investor updates (the sections relevant to this person):
+
+---
+{context}
+---
+
+Write the Slack DM to {person['name']} ({person['role']}).
+
+Their areas of responsibility: {', '.join(person['sections'])}
+
+Standard questions to ask them:
+{chr(10).join(f'- {q}' for q in person['asks'])}"""
 
-    return message.content[0].text
+    return {
+        "model": CLAUDE_MODEL,
+        "max_tokens": 1024,
+        # A prefix under the cacheable minimum would be written to the cache for nothing
+        "system": [_cached(system) if cacheable(system) else {"type": "text", "text": system}],
+        "messages": [{"role": "user", "content": prompt}],
+    }
 
 
-def generate_draft(inputs: dict, last_update: str, voice_profile: str) -> str:
+def outreach_caches(shared: str | None = None) -> bool:
+    """Whether outreach prompts share a prefix long enough to cache (worth a warm-up request)."""
+    return cacheable(_outreach_system(shared))
+
+
+def tailor_outreach(person: dict, context: str, shared: str | None = None) -> str:
+    """
+    Generate a tailored Slack DM for a team member, based on recent updates.
+
+    The instructions and the recent updates' TLDR and asks are a cached
+    system prefix shared by every team member; the person's details and
+    their slice of past updates are the user message.
+
+    Args:
+        person: dict with name, role, sections, asks
+        context: the sections of recent updates relevant to this person
+            (see past_updates.context_for)
+        shared: the TLDR and asks of recent updates (see past_updates.shared_context)
+    
+    Returns:
+        The message string to send via Slack
+    """
+    return _create(f"outreach for {person['name']}", **_outreach_params(person, context, shared))
+
+
+def submit_outreach_batch(people: list[dict], contexts: dict, shared: str | None = None) -> tuple[str | None, dict]:
+    """
+    Submit tailored outreach prompts for many people as one Message Batches job.
+
+    contexts maps each person's name to their past-update context; shared is
+    the context every prompt gets (see tailor_outreach).
+
+    People whose message is already in the generation cache are left out of
+    the batch.
+
+    Returns:
+        (batch_id or None if nothing needed generating, {name: cached message})
+    """
+    requests = []
+    cached = {}
+    for person in people:
+        params = _outreach_params(person, contexts[person["name"]], shared)
+        text = gen_cache.get(gen_cache.make_key(params))
+        if text is not None:
+            cached[person["name"]] = text
+        else:
+            # custom_id must be [a-zA-Z0-9_-]; Slack IDs already are
+            requests.append({"custom_id": person["slack_id"], "params": params})
+
+    if not requests:
+        return None, cached
+
+    with tracing.span("claude messages.batches.create", kind="claude", requests=len(requests)):
+        with tracing.timed("claude messages.batches.create"):
+            batch = get_client().messages.batches.create(requests=requests)
+    print(f"  [claude] submitted batch {batch.id} ({len(requests)} request(s))")
+    return batch.id, cached
+
+
+def wait_for_batch(batch_id: str, poll_interval: float):
+    """Poll a Message Batches job until it has ended."""
+    client = get_client()
+    while True:
+        with tracing.span("claude messages.batches.retrieve", kind="claude", batch_id=batch_id):
+            with tracing.timed("claude messages.batches.retrieve"):
+                batch = client.messages.batches.retrieve(batch_id)
+        if batch.processing_status == "ended":
+            return batch
+
+        counts = batch.request_counts
+        print(f"  [claude] batch {batch_id}: {counts.processing} still processing...")
+        time.sleep(poll_interval)
+
+
+def outreach_batch_results(batch_id: str, people: list[dict], contexts: dict, shared: str | None = None) -> dict:
+    """
+    Collect a finished outreach batch as {name: message}.
+
+    Successful results are written to the generation cache, so a re-run
+    doesn't need the batch again. Failed requests are left out of the result.
+    """
+    by_slack_id = {person["slack_id"]: person for person in people}
+    messages = {}
+    with tracing.span("claude messages.batches.results", kind="claude", batch_id=batch_id) as span:
+        with tracing.timed("claude messages.batches.results"):
+            entries = list(get_client().messages.batches.results(batch_id))
+        span["results"] = len(entries)
+
+        for entry in entries:
+            person = by_slack_id.get(entry.custom_id)
+            if not person:
+                continue
+            if entry.result.type != "succeeded":
+                print(f"  [claude] batch request for {person['name']} {entry.result.type}")
+                continue
+
+            message = entry.result.message
+            _log_usage(f"outreach for {person['name']} (batch)", message, batch=True)
+            text = message.content[0].text
+            gen_cache.put(gen_cache.make_key(_outreach_params(person, contexts[person["name"]], shared)), text)
+            messages[person["name"]] = text
+    return messages
+
+
+def generate_draft(
+    inputs: dict,
+    last_update: str,
+    voice_profile: str,
+    on_text=None,
+    checkpoint: dict | None = None,
+    kpi_table: str | None = None,
+) -> str:
     """
     Generate the investor update draft based on collected inputs.
 
+    The voice profile + instructions and last month's update are sent as two
+    cached system blocks; this month's raw inputs come last. The response is
+    streamed, so on_text sees the draft as it's written.
+
     Args:
         inputs: dict mapping person names to their responses
         last_update: full text of last month's update (for continuity)
         voice_profile: the voice profile document
-    
+        on_text: optional callback called with each chunk of text as it arrives
+        checkpoint: a StreamInterrupted.checkpoint from an earlier failed run;
+            if the prompt is unchanged, generation continues from it
+        kpi_table: KPI numbers by month with this month's MoM/QoQ already
+            computed (see kpis.py), used as is for the KPIs block
+
     Returns:
         The full draft text of the investor update
-    """
-    client = get_client()
 
-    # Format the inputs
-    inputs_text = ""
-    for name, response in inputs.items():
-        if response:
-            inputs_text += f"\n### {name}:\n{response}\n"
-        else:
-            inputs_text += f"\n### {name}:\n[NO RESPONSE — flag this section]\n"
+    Raises:
+        StreamInterrupted: the stream dropped and couldn't be resumed
+    """
+    inputs_text = _format_inputs(inputs)
 
-    prompt = f"""You are an AI assistant that drafts monthly investor updates for Carefam, a healthcare hiring marketplace.
+    system = f"""You are an AI assistant that drafts monthly investor updates for {config.COMPANY_NAME}, {config.COMPANY_DESCRIPTION}.
 
 Your job is to write this month's investor update based on the raw inputs provided by the team, following the exact voice and structure described in the voice profile.
 
 ## Voice Profile:
 {voice_profile}
 
-## Last Month's Update (for continuity and reference):
-{last_update}
-
-## Raw Inputs Collected This Month:
-{inputs_text}
-
 ## Instructions:
 
 1. Follow the EXACT structure from the voice profile:
@@ -107,7 +391,7 @@ Your job is to write this month's investor update based on the raw inputs provid
    - Asks (if provided)
    - Closing and sign-off
 
-2. Write in Matan's voice — direct, transparent, conversational, optimistic but grounded. Use contractions. Occasional emoji is fine (sparingly).
+2. Write in {config.DRAFT_RECIPIENT_NAME}'s voice — direct, transparent, conversational, optimistic but grounded. Use contractions. Occasional emoji is fine (sparingly).
 
 3. The TLDR should be a standalone summary — an investor should be able to read only this and know the state of the business.
 
@@ -117,17 +401,288 @@ Your job is to write this month's investor update based on the raw inputs provid
 
 6. Do NOT fabricate any numbers, names, or facts. Only use information provided in the inputs.
 
-7. Keep the total length to 2-4 minutes of reading time (roughly 500-800 words).
+7. Keep the total length to 2-4 minutes of reading time (roughly 500-800 words)."""
+
+    context = f"""## Last Month's Update (for continuity and reference):
+{last_update}"""
+
+    kpi_text = ""
+    if kpi_table:
+        kpi_text = f"""
+## KPI Numbers by Month (this month's changes are already computed — use these exact numbers and percentages):
+{kpi_table}
+"""
 
+    prompt = f"""## Raw Inputs Collected This Month:
+{inputs_text}
+{kpi_text}
 Write the complete investor update now:"""
 
-    message = client.messages.create(
+    return _stream(
+        "draft",
+        on_text=on_text,
+        checkpoint=checkpoint,
         model=CLAUDE_MODEL,
         max_tokens=CLAUDE_MAX_TOKENS,
+        system=[_cached(system), _cached(context)],
         messages=[{"role": "user", "content": prompt}],
     )
 
-    return message.content[0].text
+
+def _format_inputs(inputs: dict) -> str:
+    """Raw inputs as one "### Name:" block per person."""
+    inputs_text = ""
+    for name, response in inputs.items():
+        if response:
+            inputs_text += f"\n### {name}:\n{response}\n"
+        else:
+            inputs_text += f"\n### {name}:\n[NO RESPONSE — flag this section]\n"
+    return inputs_text
+
+
+def _extraction_params(person: dict, text: str) -> dict:
+    """messages.create parameters for turning one raw response into a structured record."""
+    system = f"""You turn a team member's Slack reply into structured notes for {config.COMPANY_NAME}'s monthly investor update.
+
+Respond with JSON only, no prose or code fences, in this shape:
+{{"items": [{{"section": "...", "bullets": ["..."], "numbers": [{{"label": "...", "value": "..."}}], "entities": ["..."]}}]}}
+
+Rules:
+- One item per section the reply covers. "section" is exactly one of: {", ".join(sections.DRAFTED)}
+- Bullets are short, factual and self-contained. Keep every fact, name, number and date; drop greetings, thanks, chatter and repeats.
+- "numbers" lists every metric given, with its label as written and its value exactly as written (e.g. "1,120" or "+9%").
+- "entities" lists customers, partners, people, places and events named.
+- Don't add anything that isn't in the reply."""
+
+    prompt = f"""Reply from {person['name']} ({person.get('role', 'team member')}), who usually covers: {', '.join(person.get('sections', [])) or 'anything'}
+
+---
+{text}
+---"""
+
+    return {
+        "model": EXTRACTION_MODEL,
+        "max_tokens": EXTRACTION_MAX_TOKENS,
+        "system": [_cached(system)],
+        "messages": [{"role": "user", "content": prompt}],
+    }
+
+
+def extract_response(person: dict, text: str) -> dict:
+    """
+    Turn one team member's raw reply into a structured record.
+
+    Returns {"items": [{section, bullets, numbers, entities}]}, with every
+    section mapped onto sections.DRAFTED.
+
+    Raises:
+        ValueError: the reply wasn't the JSON asked for
+    """
+    raw = _create(f"extract {person['name']}", **_extraction_params(person, text))
+    # Tolerate a code fence or a stray sentence around the object
+    match = re.search(r"\{.*\}", raw, re.DOTALL)
+    if not match:
+        raise ValueError("no JSON object in the extraction")
+    items = json.loads(match.group(0)).get("items")
+    if not isinstance(items, list):
+        raise ValueError("extraction has no items list")
+
+    record = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        section = item.get("section")
+        if section not in sections.DRAFTED:
+            section = sections.canonical(str(section or ""))
+            section = section if section in sections.DRAFTED else sections.OTHER
+        record.append({
+            "section": section,
+            "bullets": [str(bullet) for bullet in item.get("bullets") or []],
+            "numbers": [
+                {"label": str(number.get("label", "")), "value": str(number.get("value", ""))}
+                for number in item.get("numbers") or [] if isinstance(number, dict)
+            ],
+            "entities": [str(entity) for entity in item.get("entities") or []],
+        })
+    return {"items": record}
+
+
+def _writer_system(voice_profile: str) -> str:
+    """Shared system prompt for the section and frame calls (one cache entry for all of them)."""
+    return f"""You are an AI assistant that drafts monthly investor updates for {config.COMPANY_NAME}, {config.COMPANY_DESCRIPTION}.
+
+You write one part of this month's update at a time, based on the raw inputs provided by the team, following the exact voice and structure described in the voice profile.
+
+## Voice Profile:
+{voice_profile}
+
+## Rules:
+- Write in {config.DRAFT_RECIPIENT_NAME}'s voice — direct, transparent, conversational, optimistic but grounded. Use contractions. Occasional emoji is fine (sparingly).
+- Do NOT fabricate any numbers, names, or facts. Only use information provided in the inputs.
+- Output only the text asked for, with no preamble."""
+
+
+def _section_params(section: str, inputs: dict, context: str, voice_profile: str) -> dict:
+    """messages.create parameters for one separately drafted section."""
+    prompt = f"""Write {_SECTION_GUIDES[section]}.
+
+Write only this part: no heading or label (it's added for you), no TLDR, greeting or sign-off. Keep it to a short paragraph or a few lines, like the previous months' versions. If the inputs don't cover it, write: [NEEDS INPUT: description of what's missing]
+
+## {section} in recent updates (for continuity — follow up on anything mentioned):
+{context}
+
+## Raw inputs collected this month:
+{_format_inputs(inputs)}"""
+
+    return {
+        "model": CLAUDE_MODEL,
+        "max_tokens": DRAFT_SECTION_MAX_TOKENS,
+        "system": [_cached(_writer_system(voice_profile))],
+        "messages": [{"role": "user", "content": prompt}],
+    }
+
+
+def draft_section_key(section: str, inputs: dict, context: str, voice_profile: str) -> str:
+    """Hash of everything a section's draft depends on (changes when it needs redrafting)."""
+    return gen_cache.make_key(_section_params(section, inputs, context, voice_profile))
+
+
+def draft_section(section: str, inputs: dict, context: str, voice_profile: str) -> str:
+    """
+    Draft a single section of the update (see sections.DRAFTED).
+
+    Args:
+        section: canonical section name
+        inputs: name -> response for the people who cover this section
+        context: the same section from recent updates
+        voice_profile: the voice profile document
+
+    Returns:
+        The section body, without its heading
+    """
+    return _create(f"draft {section}", **_section_params(section, inputs, context, voice_profile)).strip()
+
+
+def generate_draft_frame(body: str, month: str, voice_profile: str) -> str:
+    """
+    Write the parts of the update around the drafted sections.
+
+    That's the title, greeting, welcome line with reading time, the TLDR
+    (which summarises the sections) and the closing and sign-off. The result
+    contains SECTIONS_MARKER where the sections go.
+
+    Args:
+        body: the drafted sections, assembled with their headings
+        month: the month the update covers, e.g. "May 2025"
+        voice_profile: the voice profile document
+    """
+    prompt = f"""Here are the sections of the {month} update, already written:
+
+{body}
+
+Now write the rest of the update around them, in this order:
+1. Title ({month} Update, in the title format the voice profile describes)
+2. "Dear Investors,"
+3. Welcome line with reading time (estimate it from the full length, including the sections above)
+4. TLDR paragraph (semicolon-separated highlights) — a standalone summary of the sections above
+5. A line containing exactly {SECTIONS_MARKER}
+6. Closing and sign-off
+
+Don't repeat the sections themselves."""
+
+    return _create(
+        "draft frame",
+        model=CLAUDE_MODEL,
+        max_tokens=DRAFT_SECTION_MAX_TOKENS,
+        system=[_cached(_writer_system(voice_profile))],
+        messages=[{"role": "user", "content": prompt}],
+    ).strip()
+
+
+def map_feedback(feedback: list[str], draft: str, names: list[str]) -> list[dict]:
+    """
+    Work out which sections of the draft each piece of review feedback is about.
+
+    Args:
+        feedback: lines of the reviewer's reply that don't name a section themselves
+        draft: the current draft
+        names: the sections the draft has (sections.py names)
+
+    Returns:
+        [{"section", "instruction"}] — one per requested change and section it
+        touches; chatter ("looks great!") maps to nothing
+
+    Raises:
+        ValueError: the reply wasn't the JSON asked for
+    """
+    system = f"""You route a reviewer's feedback on an investor update draft to the sections it's about.
+
+Respond with JSON only, no prose or code fences, in this shape:
+{{"changes": [{{"section": "...", "instruction": "..."}}]}}
+
+Rules:
+- "section" is exactly one of: {", ".join(names)}
+- One entry per requested change and section it touches; a change that touches two sections gets two entries.
+- "instruction" restates the change for that section, self-contained and specific.
+- Praise, thanks and other chatter are not changes: leave them out."""
+
+    prompt = f"""## Draft
+{draft}
+
+## Feedback
+{chr(10).join(feedback)}"""
+
+    raw = _create(
+        "map feedback",
+        model=EXTRACTION_MODEL,
+        max_tokens=EXTRACTION_MAX_TOKENS,
+        system=[_cached(system)],
+        messages=[{"role": "user", "content": prompt}],
+    )
+    match = re.search(r"\{.*\}", raw, re.DOTALL)
+    if not match:
+        raise ValueError("no JSON object in the feedback mapping")
+    changes = json.loads(match.group(0)).get("changes") or []
+    return [
+        {"section": change["section"], "instruction": str(change.get("instruction", ""))}
+        for change in changes if isinstance(change, dict) and change.get("section") in names
+    ]
+
+
+def revise_section(section: str, part: str, instructions: list[str], draft: str, voice_profile: str) -> str:
+    """
+    Rewrite one section of the draft to apply review feedback.
+
+    Args:
+        section: canonical section name
+        part: the section's current text, heading included
+        instructions: the changes asked for in it
+        draft: the whole current draft (fixed context, not rewritten)
+        voice_profile: the voice profile document
+
+    Returns:
+        The section's new text, in the same format and with the same heading
+    """
+    prompt = f"""Here is the current draft of this month's update:
+
+{draft}
+
+Rewrite only its {section} part, shown here exactly as it is now:
+
+{part}
+
+Changes asked for by {config.DRAFT_RECIPIENT_NAME}:
+{chr(10).join(f"- {instruction}" for instruction in instructions)}
+
+Apply these changes and nothing else. Keep the same heading or label line, format and length unless a change says otherwise, and keep it consistent with the rest of the draft. Output only the rewritten part."""
+
+    return _create(
+        f"revise {section}",
+        model=CLAUDE_MODEL,
+        max_tokens=DRAFT_SECTION_MAX_TOKENS,
+        system=[_cached(_writer_system(voice_profile))],
+        messages=[{"role": "user", "content": prompt}],
+    ).strip()
 
 
 def generate_nudge(person: dict) -> str:
@@ -142,7 +697,7 @@ def generate_nudge(person: dict) -> str:
 def generate_escalation(person_name: str) -> str:
     """Generate an escalation message to Matan about a non-responder."""
     return (
-        f"Hey Matan — heads up, I haven't heard back from {person_name} yet "
+        f"Hey {config.DRAFT_RECIPIENT_NAME} — heads up, I haven't heard back from {person_name} yet "
         f"for the investor update. Want me to draft their section based on "
         f"what I know, or do you want to ping them?"
     )
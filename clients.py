@@ -0,0 +1,62 @@
+"""
+Client registry — one long-lived Slack and Anthropic client per process.
+
+Building a fresh client per call throws away the HTTP connection pool (and,
+for Slack, the SSL context) every time. Everything in slack_client.py and
+claude_client.py gets its client from here instead.
+"""
+
+import atexit
+import os
+import ssl
+import threading
+
+from config import SLACK_TIMEOUT, CLAUDE_TIMEOUT, CLAUDE_MAX_RETRIES
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def slack():
+    """Shared Slack WebClient (paced per method tier, see rate_limit.py)."""
+    with _lock:
+        if "slack" not in _clients:
+            from rate_limit import RateLimitedWebClient
+
+            _clients["slack"] = RateLimitedWebClient(
+                token=os.environ["SLACK_BOT_TOKEN"],
+                # SLACK_API_URL points at a stand-in such as fakes/slack_server.py
+                base_url=os.environ.get("SLACK_API_URL", RateLimitedWebClient.BASE_URL),
+                timeout=SLACK_TIMEOUT,
+                # slack_sdk's sync client goes through urllib, which would
+                # otherwise load the CA bundle into a new context per request.
+                ssl=ssl.create_default_context(),
+            )
+        return _clients["slack"]
+
+
+def anthropic():
+    """Shared Anthropic client (keeps its httpx connection pool alive)."""
+    with _lock:
+        if "anthropic" not in _clients:
+            import anthropic as anthropic_sdk
+
+            _clients["anthropic"] = anthropic_sdk.Anthropic(
+                api_key=os.environ["ANTHROPIC_API_KEY"],
+                timeout=CLAUDE_TIMEOUT,
+                max_retries=CLAUDE_MAX_RETRIES,
+            )
+        return _clients["anthropic"]
+
+
+def close_all():
+    """Close pooled connections and forget every client (safe to call twice)."""
+    with _lock:
+        for client in _clients.values():
+            close = getattr(client, "close", None)
+            if close:
+                close()
+        _clients.clear()
+
+
+atexit.register(close_all)
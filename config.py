@@ -3,9 +3,20 @@ Carefam Investor Update Agent — Configuration
 
 To find Slack user IDs:
   Click on a person's profile in Slack → "..." menu → "Copy member ID"
+
+Everything company-specific here (team, recipient, company name, data paths)
+can be overridden per company in multi-company mode — see tenants.py.
 """
 
-# Team contacts: each person the agent reaches out to
+import os
+
+# Company the updates are written for
+COMPANY_NAME = "Carefam"
+COMPANY_DESCRIPTION = "a healthcare hiring marketplace"
+
+# Team contacts: each person the agent reaches out to. A person needs a
+# "slack_id" or an "email"; an email is resolved to a Slack ID through the
+# team directory (see team.py, needs the users:read.email scope).
 TEAM = [
     {
         "name": "Eyal",
@@ -69,8 +80,36 @@ TEAM = [
 
 # The person who receives the final draft for review
 DRAFT_RECIPIENT = "U05EJJMUP44"
+DRAFT_RECIPIENT_NAME = "Matan"
+
+# How long the team directory's snapshot of Slack users (data/team_directory.json)
+# is used before the next lookup re-syncs it with users.list
+TEAM_DIRECTORY_TTL_HOURS = 24
+
+# Where state, caches and drafts live, and where the inputs are read from
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+PAST_UPDATES_DIR = os.path.join(DATA_DIR, "past_updates")
+VOICE_PROFILE_PATH = os.path.join(os.path.dirname(__file__), "voice_profile.md")
+
+# KPI names a number in this month's replies may count towards, on top of
+# the KPIs in past updates and data/kpis.csv (see kpis.py). Add a new KPI
+# here for its first month; until then a reply's "Label: number" line that
+# matches no known KPI is left to the model rather than put in the block.
+KPI_NAMES = []
+
+# How many past updates outreach prompts draw on. Each person gets only the
+# sections matching their `sections` (see past_updates.py), from this many months.
+# Every prompt shares the TLDR and Asks of those months, as a cached system block.
+PAST_UPDATES_MONTHS = 3
+
+# Anthropic doesn't cache a prompt prefix shorter than this many tokens
+# (1024 for Sonnet/Opus, 2048 for Haiku). Outreach only marks its shared
+# prefix for caching, and sends a warm-up request first, once it's this long.
+PROMPT_CACHE_MIN_TOKENS = 1024
 
-# Schedule (day of month)
+# Schedule (day of month). The single source of truth for when steps run:
+# schedule_helper.py derives each month's days from it for both the GitHub
+# Actions workflow and `--serve`.
 SCHEDULE = {
     "outreach": 25,   # Send initial messages
     "nudge": 27,      # Remind non-responders
@@ -79,8 +118,119 @@ SCHEDULE = {
     "deliver": 30,    # Send draft to Matan
 }
 
+# Time of day scheduled steps run, in UTC. The workflow's cron line in
+# .github/workflows/monthly-update.yml has to match it. `--serve` reads the
+# host clock, which is UTC on GitHub Actions and Railway.
+SCHEDULE_TIME = "14:00"
+
+# With `--serve`, check for responses this often while a cycle is collecting
+# inputs (between outreach and the draft)
+SERVE_CHECK_INTERVAL_HOURS = 1
+
 # Claude model for drafting (Sonnet is cost-effective and high quality)
 CLAUDE_MODEL = "claude-sonnet-4-20250514"
 
 # Max tokens for draft generation
 CLAUDE_MAX_TOKENS = 4096
+
+# How the draft is written: "sections" drafts each section concurrently and
+# then writes the TLDR/title/sign-off around them (see drafting.py); "single"
+# streams the whole update in one generation. Override with --draft-mode.
+DRAFT_MODE = "sections"
+DRAFT_SECTION_MAX_TOKENS = 1024  # per section, and for the TLDR/frame pass
+
+# In sections mode, draft a person's sections in the background as soon as
+# their reply comes in (during --step check or --listen), so the draft step
+# only has to redo sections whose inputs changed since
+PREDRAFT = True
+PREDRAFT_DEBOUNCE = 2  # seconds a section's inputs must be quiet before it's pre-drafted
+
+# Turn each reply into a compact structured record (section, bullets, numbers,
+# names) as it's captured, and draft from those instead of the raw Slack text
+# (see extraction.py). Records are cached by a hash of the reply.
+EXTRACT_RESPONSES = True
+EXTRACTION_MODEL = "claude-3-5-haiku-latest"
+EXTRACTION_MAX_TOKENS = 1024
+EXTRACTION_DEBOUNCE = 2  # seconds a person's reply must be quiet before it's extracted
+
+# Max concurrent per-person pipelines (Claude + Slack calls) per step.
+# Override per run with `python agent.py --workers N`; 1 runs serially.
+MAX_WORKERS = 8
+
+# API client settings (clients are shared per process, see clients.py)
+SLACK_TIMEOUT = 30         # seconds per Slack Web API request
+CLAUDE_TIMEOUT = 120       # seconds per Claude request
+CLAUDE_MAX_RETRIES = 0     # SDK-level retries — off, resilience.py owns the retry policy
+
+# Generation cache for Claude outputs (data/gen_cache/, see gen_cache.py)
+GEN_CACHE_MAX_AGE_DAYS = 45             # entries unused for longer than this are ignored and evicted
+GEN_CACHE_MAX_BYTES = 50 * 1024 * 1024  # least recently used entries are evicted past this
+
+# Seconds between status polls for `--step outreach --batch` (Message Batches)
+BATCH_POLL_INTERVAL = 30
+
+# How many times a dropped draft stream is reopened (continuing from the text
+# so far) before giving up and checkpointing the partial draft to state
+STREAM_RESUME_ATTEMPTS = 2
+
+# How the draft is delivered (see delivery.py): "thread" posts it as one
+# message with the rest as threaded replies, split on section and paragraph
+# boundaries; "file" uploads it as a single markdown file (two API calls
+# however long it is). Override with --deliver-mode.
+DELIVERY_MODE = "thread"
+DELIVERY_CHUNK_CHARS = 3900  # max characters per message; Slack splits or truncates longer ones
+
+# In "file" mode the share's message ts (where replies thread) only appears
+# once Slack has processed the upload, so files.info is polled for it
+FILE_SHARE_POLLS = 3
+FILE_SHARE_POLL_SECONDS = 1.0
+
+# Port for `python agent.py --listen` when receiving Slack events over HTTP
+# (ignored when SLACK_APP_TOKEN is set and Socket Mode is used instead)
+LISTEN_PORT = 3000
+
+# Where monthly state is stored: "sqlite" (data/monthly_state.db, row-level
+# writes, safe for concurrent processes) or "json" (data/monthly_state.json).
+# Switching to sqlite imports an existing monthly_state.json automatically.
+STATE_BACKEND = "sqlite"
+
+# How many times a Slack call that comes back `ratelimited` is requeued
+# (after waiting out Retry-After) before it's reported as failed
+SLACK_MAX_RATELIMIT_RETRIES = 5
+
+# Claude resilience policy (see resilience.py)
+CLAUDE_RETRIES = 4                 # retries on 429 / 5xx / 529 / connection errors
+CLAUDE_CALL_DEADLINE = 300         # seconds for a call including all its retries
+CLAUDE_HEDGE = False               # send a duplicate request once a call runs past p95 latency
+CLAUDE_BREAKER_THRESHOLD = 5       # consecutive failures before a model's circuit opens
+CLAUDE_BREAKER_COOLDOWN = 60       # seconds a circuit stays open
+CLAUDE_FALLBACK_MODEL = None       # e.g. "claude-3-5-haiku-latest"; None = fail fast when open
+
+# Tracing (see tracing.py): each step's spans, per-method latency histograms,
+# token usage and cost are appended to data/traces/<cycle>.jsonl
+TRACING = True
+TRACE_LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000]
+
+# Claude prices in USD per million tokens, by model ID prefix (the longest
+# matching prefix wins). Models not listed are traced without a cost.
+CLAUDE_PRICES = {
+    "claude-opus-4": {"input": 15.00, "output": 75.00, "cache_write": 18.75, "cache_read": 1.50},
+    "claude-sonnet-4": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30},
+    "claude-3-7-sonnet": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30},
+    "claude-3-5-sonnet": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30},
+    "claude-3-5-haiku": {"input": 0.80, "output": 4.00, "cache_write": 1.00, "cache_read": 0.08},
+}
+CLAUDE_BATCH_DISCOUNT = 0.5  # Message Batches are billed at half price
+
+# Cold-start import budget per step, in ms (see startup.py). CI runs
+# `python agent.py --profile-startup` on every push and fails past these.
+# Steps that never call Claude mustn't pull in the Anthropic SDK.
+STARTUP_BUDGET_MS = {
+    "outreach": 3000,
+    "check": 500,
+    "nudge": 500,
+    "escalate": 500,
+    "draft": 3000,
+    "deliver": 500,
+    "revise": 500,
+}
@@ -0,0 +1,139 @@
+"""
+Daemon — runs the monthly cycle from one long-lived process (`python agent.py --serve`).
+
+The usual setup starts a cold process for every step, from cron or GitHub
+Actions. The daemon instead keeps the Slack and Anthropic clients, the state
+backend and the past updates index warm in one process, and uses `schedule`
+to run:
+
+  - every day at config.SCHEDULE_TIME, the step schedule_helper picks for
+    today from config.SCHEDULE, unless state shows it already ran this cycle
+  - every SERVE_CHECK_INTERVAL_HOURS, a response check while a cycle is
+    collecting inputs (after outreach, until the draft is written), and a
+    check for feedback on the draft once it's delivered (--step revise)
+
+On startup, a step that was due earlier today runs right away, so a
+restart doesn't skip it.
+
+SIGTERM or Ctrl+C stops the daemon after the current step finishes. Queued
+pre-drafts are waited for and clients and state are closed first. A second
+signal exits immediately.
+"""
+
+import signal
+import threading
+import traceback
+from datetime import datetime
+
+import schedule
+
+import clients
+import config
+import drafting
+import extraction
+import past_updates
+import schedule_helper
+import state
+
+# Scheduled steps in cycle order
+STEPS = sorted(config.SCHEDULE, key=config.SCHEDULE.get)
+
+# Steps during which the cycle is still waiting on replies
+COLLECTING = ["outreach", "nudge", "escalate"]
+
+# Longest sleep between schedule checks, so clock jumps (suspend, NTP) are noticed
+MAX_IDLE_SECONDS = 60
+
+
+def _this_cycle(current_state: dict) -> bool:
+    """Whether state holds a cycle started this month (not last month's, or none yet)."""
+    if current_state["step"] == "not_started" and not current_state["contacts"]:
+        return False
+    return current_state["cycle_started"][:7] == datetime.now().strftime("%Y-%m")
+
+
+def is_due(step: str, current_state: dict) -> bool:
+    """Whether a scheduled step still has to run this cycle."""
+    if step == "outreach":
+        # Never restart a cycle that's already begun, even if outreach stopped partway
+        return not _this_cycle(current_state)
+    done = STEPS.index(current_state["step"]) if current_state["step"] in STEPS else -1
+    return _this_cycle(current_state) and done < STEPS.index(step)
+
+
+def _run(step: str, options: dict):
+    """Run one step, keeping the daemon alive if it fails."""
+    import agent
+
+    print(f"\n🕐 {datetime.now():%Y-%m-%d %H:%M} — {step}")
+    try:
+        agent.run_step(step, **options)
+        agent.print_step_stats()
+    except Exception:
+        traceback.print_exc()
+        print(f"  ✗ {step} failed — will try again at its next scheduled run")
+
+
+def serve(**options):
+    """
+    Run scheduled steps until stopped.
+
+    options are passed to agent.run_step (batch, poll_interval, draft_mode, deliver_mode).
+    """
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        if stop.is_set():
+            raise SystemExit(1)
+        print("\n🛑 Stopping after the current step (send again to stop now)...")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    def milestone():
+        # New files may have landed in past_updates since yesterday
+        past_updates.refresh()
+        step = schedule_helper.get_step_for_today()
+        if step in STEPS and is_due(step, state.load_state()):
+            _run(step, options)
+
+    def check():
+        current_state = state.load_state()
+        if not _this_cycle(current_state):
+            return
+        if current_state["step"] in COLLECTING:
+            _run("check", options)
+        elif current_state["step"] == "deliver":
+            _run("revise", options)
+
+    # Warm everything a step needs up front, once
+    clients.slack()
+    clients.anthropic()
+    past_updates.refresh()
+
+    scheduler = schedule.Scheduler()
+    scheduler.every().day.at(config.SCHEDULE_TIME).do(milestone)
+    scheduler.every(config.SERVE_CHECK_INTERVAL_HOURS).hours.do(check)
+
+    print(
+        f"\n🗓️  Serving: scheduled steps daily at {config.SCHEDULE_TIME}, response checks every "
+        f"{config.SERVE_CHECK_INTERVAL_HOURS}h while collecting, feedback checks once delivered (Ctrl+C to stop)"
+    )
+    today = datetime.now()
+    days = schedule_helper.days_for(today.year, today.month)
+    print(f"   {today:%B}: " + ", ".join(f"{step} on day {day}" for step, day in days.items()) + "\n")
+
+    if datetime.now().strftime("%H:%M") >= config.SCHEDULE_TIME:
+        milestone()
+
+    while not stop.is_set():
+        scheduler.run_pending()
+        idle = scheduler.idle_seconds
+        stop.wait(timeout=max(1, min(idle if idle is not None else MAX_IDLE_SECONDS, MAX_IDLE_SECONDS)))
+
+    extraction.wait()
+    drafting.wait_for_predrafts()
+    clients.close_all()
+    state.close()
+    print("🗓️  Daemon stopped.\n")
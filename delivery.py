@@ -0,0 +1,153 @@
+"""
+Delivery — sends the finished draft to the draft recipient in as few Slack calls as possible.
+
+Two modes (config.DELIVERY_MODE, or --deliver-mode):
+
+  - "thread": the draft is split on section and paragraph boundaries into
+    parts that fit in a Slack message. The first part goes out as one
+    message and the rest as replies in its thread. Most drafts take one
+    or two calls.
+  - "file": the whole draft is uploaded as a single markdown file with
+    files_upload_v2, with the header as its comment. That's two Web API
+    calls (files.getUploadURLExternal and files.completeUploadExternal),
+    however long the draft.
+
+split() never cuts through a word, a bullet or a **bold** span unless a
+single paragraph is longer than a whole message. In that case it falls back
+to lines, then sentences, then words, and re-opens any bold span it had to
+break.
+"""
+
+import re
+
+import config
+import slack_client
+
+HEADER = (
+    "📋 *Your investor update draft is ready!*\n\n"
+    "Here's what I put together based on the team's inputs. "
+    "Please review, edit as needed, and let me know if you'd like any changes."
+)
+CONTINUED = "_(continued in the thread)_"
+
+# Characters kept free in every part for re-opening/closing a split **bold** span
+_BOLD_SLACK = 4
+
+
+def _is_heading(block: str) -> bool:
+    """Whether a paragraph starts a section: a markdown heading or a bold title line."""
+    first = block.split("\n", 1)[0].strip()
+    return first.startswith("#") or bool(re.fullmatch(r"(\*\*|__)[^*_]{1,80}\1:?", first))
+
+
+def _pack(units: list[str], limit: int, joiner: str) -> list[str]:
+    """Greedily join units into parts of at most limit chars, breaking up any unit that's too long."""
+    parts = []
+    current = ""
+    for unit in units:
+        if len(unit) > limit:
+            # A short lead-in (a heading line) starts the first piece rather than standing alone
+            lead = f"{current}{joiner}" if current and len(current) <= limit // 4 else ""
+            if current and not lead:
+                parts.append(current)
+            pieces = _pieces(unit, limit - len(lead))
+            pieces[0] = lead + pieces[0]
+            # The last piece can still share a part with what follows
+            *full, current = pieces
+            parts.extend(full)
+            continue
+        candidate = f"{current}{joiner}{unit}" if current else unit
+        if len(candidate) <= limit:
+            current = candidate
+        else:
+            parts.append(current)
+            current = unit
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _pieces(block: str, limit: int) -> list[str]:
+    """Break one oversized paragraph into pieces that fit: by line, then sentence, then word."""
+    for pattern, joiner in ((r"\n", "\n"), (r"(?<=[.!?])\s+", " "), (r"\s+", " ")):
+        units = [unit for unit in re.split(pattern, block) if unit]
+        if len(units) > 1:
+            return _pack(units, limit, joiner)
+    # One unbreakable run (a long URL): slice it
+    return [block[i:i + limit] for i in range(0, len(block), limit)]
+
+
+def _balance_bold(parts: list[str]) -> list[str]:
+    """Close a **bold** span left open at the end of a part and re-open it in the next."""
+    balanced = []
+    carry = ""
+    for part in parts:
+        part = carry + part
+        carry = ""
+        if part.count("**") % 2:
+            part += "**"
+            carry = "**"
+        balanced.append(part)
+    return balanced
+
+
+def split(text: str, limit: int | None = None) -> list[str]:
+    """
+    Split markdown into parts of at most limit characters on natural boundaries.
+
+    Paragraphs are kept whole and packed together. A section heading starts
+    a new part rather than ending one, and a part that's already more than
+    half full ends before the next section.
+    """
+    limit = (limit or config.DELIVERY_CHUNK_CHARS) - _BOLD_SLACK
+    blocks = [block.strip("\n") for block in re.split(r"\n\s*\n", text.strip()) if block.strip()]
+
+    # A heading on its own line belongs with the paragraph after it
+    units = []
+    for block in blocks:
+        if units and _is_heading(units[-1]) and "\n" not in units[-1]:
+            units[-1] = f"{units[-1]}\n\n{block}"
+        else:
+            units.append(block)
+
+    parts = []
+    current = ""
+    for unit in units:
+        candidate = f"{current}\n\n{unit}" if current else unit
+        new_section = _is_heading(unit) and len(current) > limit // 2
+        if len(candidate) <= limit and not new_section:
+            current = candidate
+            continue
+
+        if current:
+            parts.append(current)
+        *full, current = _pack([unit], limit, "\n\n")
+        parts.extend(full)
+    if current:
+        parts.append(current)
+    return _balance_bold(parts)
+
+
+def deliver(draft: str, mode: str | None = None, month: str = "") -> dict:
+    """
+    Send the draft to config.DRAFT_RECIPIENT.
+
+    Returns {"ok": True, "channel", "ts"} (ts of the parent message, or of
+    the file's share in "file" mode), or {"ok": False, "error"}.
+    """
+    mode = mode or config.DELIVERY_MODE
+    if mode == "file":
+        name = f"{month or 'draft'} investor update".strip()
+        return slack_client.upload_file(
+            config.DRAFT_RECIPIENT,
+            draft,
+            filename=re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-").lower() + ".md",
+            title=name[0].upper() + name[1:],
+            comment=f"{HEADER}\n\nThe full draft is attached as a markdown file.",
+        )
+
+    limit = config.DELIVERY_CHUNK_CHARS
+    parts = split(f"{HEADER}\n\n---\n\n{draft}", limit - len(CONTINUED) - 2)
+    if len(parts) > 1:
+        parts[0] = f"{parts[0]}\n\n{CONTINUED}"
+    return slack_client.send_thread(config.DRAFT_RECIPIENT, parts[0], parts[1:])
@@ -0,0 +1,301 @@
+"""
+Section drafting — writes the update one section at a time, concurrently.
+
+Each section in sections.DRAFTED is drafted from just the inputs of the
+people who cover it (or, with config.EXTRACT_RESPONSES, just what their
+extracted records say about it — see extraction.py) and the same section of
+recent updates. All sections run
+in parallel, then one short pass writes the title, TLDR and sign-off around
+them, and the pieces are assembled in the voice profile's order.
+
+Every section's result is stored in state (draft_sections) along with a hash
+of everything it was written from. A re-run only drafts the sections that
+failed or whose inputs changed, and reuses the rest.
+
+The KPIs section is rendered straight from kpis.py when this month's
+numbers are all in, with exact MoM changes and no Claude call. Otherwise
+it's drafted with the computed KPI table in its prompt.
+
+With pre-drafting on (config.PREDRAFT), a person's sections are also drafted
+in the background as soon as their response comes in or changes, so by
+draft day most sections are already up to date.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+import claude_client
+import config
+import extraction
+import fanout
+import kpis
+import past_updates
+import sections
+import state
+
+_coverage_cache = None
+
+_predraft_pool = None
+_predraft_futures = []
+_predraft_inputs = {}       # newest snapshot of everyone's inputs
+_predraft_changed = {}      # section -> when its inputs last changed, while a redraft is due
+_predraft_running = set()   # sections with a pre-draft loop going
+_predraft_done = {}         # section -> key of its last stored pre-draft
+_predraft_voice_profile = None
+_predraft_month = None      # the cycle's YYYY-MM, for KPI changes
+_predraft_lock = threading.Lock()
+
+
+def _coverage() -> dict:
+    """{section: names of the people who cover it}, cached until config.TEAM changes."""
+    global _coverage_cache
+    team_key = tuple((person["name"], tuple(person["sections"])) for person in config.TEAM)
+    if _coverage_cache is None or _coverage_cache[0] != team_key:
+        coverage = {section: set() for section in sections.DRAFTED}
+        for person in config.TEAM:
+            for section in sections.for_person(person):
+                if section in coverage:
+                    coverage[section].add(person["name"])
+        _coverage_cache = (team_key, coverage)
+    return _coverage_cache[1]
+
+
+def _covers(name: str, section: str) -> bool:
+    # A section nobody on the team is mapped to takes everyone's input
+    covering = _coverage()[section]
+    return name in covering or not covering
+
+
+def section_inputs(inputs: dict) -> dict:
+    """
+    Split collected inputs by section: {section: {name: response}}.
+
+    A section nobody on the team is mapped to gets everyone's inputs. With
+    extraction on, a response is cut down to the part of its record filed
+    under the section, and anyone whose record has something for a section
+    is included in it, whether or not they usually cover it.
+    """
+    if not config.EXTRACT_RESPONSES:
+        return {
+            section: {name: response for name, response in inputs.items() if _covers(name, section)}
+            for section in sections.DRAFTED
+        }
+
+    records = extraction.records(inputs)
+    split = {}
+    for section in sections.DRAFTED:
+        split[section] = {}
+        for name, response in inputs.items():
+            record = records.get(name)
+            if record is not None and section in extraction.sections_of(record):
+                split[section][name] = extraction.render(record, section)
+            elif _covers(name, section):
+                # Extraction failed (or no reply yet): the raw response; replied without covering it: nothing
+                split[section][name] = response if record is None else ""
+    return split
+
+
+def _plan(inputs: dict, voice_profile: str, month: str, only: list[str] | None = None) -> dict:
+    """{section: (inputs, context, key)} for every drafted section (or just `only`)."""
+    plan = {}
+    for section, section_input in section_inputs(inputs).items():
+        if only is not None and section not in only:
+            continue
+        context = past_updates.excerpts({section}) or past_updates.NO_UPDATE
+        if section == sections.KPIS:
+            table = kpis.table(month, section_input)
+            if table:
+                context = (
+                    "### KPI numbers by month, with this month's changes already computed "
+                    f"(use these exact numbers and percentages)\n\n{table}\n\n### Previous updates\n\n{context}"
+                )
+        key = claude_client.draft_section_key(section, section_input, context, voice_profile)
+        plan[section] = (section_input, context, key)
+    return plan
+
+
+def _placeholder(section: str, section_input: dict, month: str) -> str | None:
+    """
+    Text for a section that doesn't need Claude.
+
+    That's the KPIs block when every KPI has this month's number, and any
+    section nobody gave input for: Asks are left out entirely (not every
+    update has them), anything else is flagged. Returns None if the section
+    needs drafting.
+    """
+    if section == sections.KPIS and any(section_input.values()):
+        return kpis.block(month, section_input)
+    if any(section_input.values()):
+        return None
+    if section == sections.ASKS:
+        return ""
+    names = ", ".join(section_input) or "anyone"
+    return f"[NEEDS INPUT: {section} — nothing from {names}]"
+
+
+def draft_sections(current_state: dict, inputs: dict, voice_profile: str, progress: bool = False) -> dict | None:
+    """
+    Draft every section that's missing, failed or out of date, concurrently.
+
+    Results are saved to state as they come in. Returns {section: text}, or
+    None if any section failed (the rest are kept for the next run).
+    """
+    month = kpis.cycle_month(current_state)
+    plan = _plan(inputs, voice_profile, month)
+    saved = current_state.get("draft_sections") or {}
+    texts = {}
+    stale = []
+
+    for section, (section_input, context, key) in plan.items():
+        entry = saved.get(section)
+        if entry and entry["key"] == key and entry.get("text") is not None:
+            texts[section] = entry["text"]
+            continue
+
+        placeholder = _placeholder(section, section_input, month)
+        if placeholder is not None:
+            texts[section] = placeholder
+            state.save_draft_section(current_state, section, {"key": key, "text": placeholder})
+        else:
+            stale.append(section)
+
+    reused = len(plan) - len(stale)
+    print(f"  Drafting {len(stale)} section(s) ({reused} up to date or without input)...\n")
+
+    def draft(section):
+        section_input, context, _ = plan[section]
+        return claude_client.draft_section(section, section_input, context, voice_profile)
+
+    failed = []
+    for section, result in fanout.run(draft, stale):
+        key = plan[section][2]
+        if isinstance(result, dict):
+            failed.append(section)
+            state.save_draft_section(current_state, section, {"key": key, "error": result["error"]})
+            print(f"  ✗ {section} failed: {result['error']}")
+            continue
+
+        texts[section] = result
+        state.save_draft_section(current_state, section, {"key": key, "text": result})
+        print(f"  ✓ {section} drafted")
+        if progress:
+            print(f"\n{result}\n")
+
+    return None if failed else texts
+
+
+def assemble(texts: dict) -> str:
+    """Put drafted sections together under their headings, in update order."""
+    blocks = []
+    if texts.get(sections.KPIS):
+        blocks.append(f"**{sections.HEADINGS[sections.KPIS]}**\n{texts[sections.KPIS]}")
+
+    marketplace = [
+        f"- **{label}.** {texts[section]}"
+        for section, label in sections.MARKETPLACE_LABELS.items()
+        if texts.get(section)
+    ]
+    if marketplace:
+        blocks.append(f"**{sections.HEADINGS[sections.MARKETPLACE]}**\n" + "\n".join(marketplace))
+
+    for section in (sections.PRODUCT, sections.OTHER, sections.ASKS):
+        if texts.get(section):
+            blocks.append(f"**{sections.HEADINGS[section]}**\n{texts[section]}")
+    return "\n\n".join(blocks)
+
+
+def generate(current_state: dict, inputs: dict, voice_profile: str, progress: bool = False) -> str | None:
+    """
+    Write the full draft: all sections in parallel, then the frame around them.
+
+    Returns None if a section failed; re-running retries only that section.
+    """
+    texts = draft_sections(current_state, inputs, voice_profile, progress=progress)
+    if texts is None:
+        return None
+
+    body = assemble(texts)
+    print("\n  Writing TLDR and sign-off...\n")
+    frame = claude_client.generate_draft_frame(
+        body, f"{current_state['month']} {current_state['year']}", voice_profile
+    )
+    if claude_client.SECTIONS_MARKER not in frame:
+        # The frame came back without a slot for the sections; put them last
+        return f"{frame}\n\n{body}"
+    return frame.replace(claude_client.SECTIONS_MARKER, body, 1)
+
+
+def enable_predraft(voice_profile: str):
+    """Start drafting a person's sections in the background whenever their input changes."""
+    global _predraft_voice_profile
+    _predraft_voice_profile = voice_profile
+    state.on_input(_on_input)
+
+
+def _on_input(current_state: dict, name: str):
+    """
+    state.on_input hook: mark the sections this person covers for redrafting.
+
+    Runs on the thread recording the reply (often inside a state
+    transaction), so it only takes a snapshot of the inputs and leaves the
+    drafting to a background loop per section. That loop waits until the
+    section's inputs have been quiet for PREDRAFT_DEBOUNCE seconds, so a
+    burst of replies (a check step, a flurry of follow-ups) costs about one
+    draft per section rather than one per reply.
+    """
+    global _predraft_pool, _predraft_inputs, _predraft_month
+    inputs = state.get_all_inputs(current_state)
+    covered = [section for section in sections.DRAFTED if _covers(name, section)]
+
+    with _predraft_lock:
+        _predraft_inputs = inputs
+        _predraft_month = kpis.cycle_month(current_state)
+        if _predraft_pool is None:
+            _predraft_pool = ThreadPoolExecutor(max_workers=config.MAX_WORKERS, thread_name_prefix="predraft")
+        for section in covered:
+            _predraft_changed[section] = time.monotonic()
+            if section not in _predraft_running:
+                _predraft_running.add(section)
+                _predraft_futures.append(_predraft_pool.submit(_predraft_loop, section))
+
+
+def _predraft_loop(section: str) -> int:
+    """Redraft one section until its inputs stop changing. Returns how many drafts were stored."""
+    stored = 0
+    while True:
+        with _predraft_lock:
+            if section not in _predraft_changed:
+                _predraft_running.discard(section)
+                return stored
+            quiet_for = time.monotonic() - _predraft_changed[section]
+            if quiet_for >= config.PREDRAFT_DEBOUNCE:
+                del _predraft_changed[section]
+                inputs, month = _predraft_inputs, _predraft_month
+        if quiet_for < config.PREDRAFT_DEBOUNCE:
+            time.sleep(config.PREDRAFT_DEBOUNCE - quiet_for)
+            continue
+
+        try:
+            (section_input, context, key), = _plan(inputs, _predraft_voice_profile, month, only=[section]).values()
+            if _placeholder(section, section_input, month) is not None or _predraft_done.get(section) == key:
+                continue
+            text = claude_client.draft_section(section, section_input, context, _predraft_voice_profile)
+            state.store_draft_section(section, {"key": key, "text": text})
+        except Exception as e:
+            # Pre-drafting is an optimisation; the draft step redoes whatever is missing
+            print(f"  ✗ Pre-drafting {section} failed: {type(e).__name__}: {e}")
+            continue
+
+        _predraft_done[section] = key
+        stored += 1
+        print(f"  ✍️  Pre-drafted {section}")
+
+
+def wait_for_predrafts() -> int:
+    """Block until queued pre-drafts finish. Returns how many section drafts were stored."""
+    with _predraft_lock:
+        futures = list(_predraft_futures)
+        _predraft_futures.clear()
+    done, _ = wait_futures(futures)
+    return sum(future.result() for future in done)
@@ -0,0 +1,228 @@
+"""
+Response extraction — turns each team member's reply into a compact structured record.
+
+Replies are raw Slack text, with greetings, chatter, corrections and
+repeats. As a reply is captured (--step check or --listen), it's sent once,
+in the background, to a small model (config.EXTRACTION_MODEL). The model
+returns the reply's facts as {"items": [{section, bullets, numbers,
+entities}]}. A person's reply is extracted once it has been quiet for
+EXTRACTION_DEBOUNCE seconds, so a burst of DMs costs one call, not one per
+message.
+
+Records are cached in data/extractions.json by a hash of the reply text.
+An unchanged reply is never extracted twice, and a re-draft reads the
+records instead of the raw text. Drafting gets, per section, only what the
+records file under that section. A reply whose extraction failed is used
+raw.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+
+import claude_client
+import config
+import fanout
+import state
+import team
+
+CACHE_FILE = "extractions.json"
+
+# Beyond this, the oldest records from earlier cycles are dropped (the
+# current cycle's are always kept, however large the team)
+CACHE_MAX_ENTRIES = 500
+
+_cache = None     # {"path": ..., "records": {text hash: record}}
+_futures = {}     # text hash -> Future, for extractions running in the background
+_pending = {}     # name -> (text, cycle, when it last changed), while an extraction is due
+_running = set()  # names with an extraction loop going
+_loops = []       # Futures of the extraction loops, for wait()
+_pool = None
+_lock = threading.Lock()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _cache_path() -> str:
+    return os.path.join(state.STATE_DIR, CACHE_FILE)
+
+
+def _records() -> dict:
+    """{text hash: record} for the current data directory (call with the lock held)."""
+    global _cache
+    path = _cache_path()
+    if _cache is None or _cache["path"] != path:
+        records = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                records = json.load(f)
+        _cache = {"path": path, "records": records}
+    return _cache["records"]
+
+
+def _current_cycle() -> str:
+    return state.load_state()["cycle_started"]
+
+
+def _store(key: str, record: dict, cycle: str):
+    """Cache a record from a cycle and write the cache out (call with the lock held)."""
+    records = _records()
+    records[key] = {**record, "cycle": cycle}
+    excess = len(records) - CACHE_MAX_ENTRIES
+    if excess > 0:
+        earlier = [old for old, stored in records.items() if stored.get("cycle") != cycle]
+        for old in earlier[:excess]:
+            del records[old]
+
+    os.makedirs(state.STATE_DIR, exist_ok=True)
+    tmp_path = f"{_cache_path()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(records, f)
+    os.replace(tmp_path, _cache_path())
+
+
+def _extract(key: str, name: str, text: str, cycle: str) -> dict | None:
+    try:
+        record = claude_client.extract_response(team.by_name(name) or {"name": name}, text)
+    except Exception as e:
+        # Extraction is an optimisation; drafting uses the raw reply instead
+        print(f"  ✗ Extracting {name}'s reply failed: {type(e).__name__}: {e}")
+        return None
+    with _lock:
+        _store(key, record, cycle)
+    return record
+
+
+def extract(name: str, text: str, cycle: str | None = None) -> dict | None:
+    """The record for one reply: cached, already being extracted, or extracted now. None if it fails."""
+    key = text_hash(text)
+    with _lock:
+        record = _records().get(key)
+        future = _futures.get(key)
+    if record is not None:
+        return record
+    if future is not None:
+        return future.result()
+    return _extract(key, name, text, cycle or _current_cycle())
+
+
+def enable():
+    """Extract replies in the background as they're captured."""
+    if config.EXTRACT_RESPONSES:
+        state.on_input(_on_input)
+
+
+def _on_input(current_state: dict, name: str):
+    """
+    state.on_input hook: mark the person's reply for extraction.
+
+    Each message a person sends replaces their reply text, so only the
+    newest text is kept, and a loop per person extracts it once it has been
+    quiet for EXTRACTION_DEBOUNCE seconds.
+    """
+    global _pool
+    text = (current_state["contacts"].get(name) or {}).get("response_text")
+    if not text:
+        return
+    with _lock:
+        _pending[name] = (text, current_state["cycle_started"], time.monotonic())
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=config.MAX_WORKERS, thread_name_prefix="extract")
+        if name not in _running:
+            _running.add(name)
+            _loops.append(_pool.submit(_extract_loop, name))
+
+
+def _extract_loop(name: str) -> int:
+    """Extract a person's newest reply text until it stops changing. Returns how many records were stored."""
+    stored = 0
+    while True:
+        with _lock:
+            if name not in _pending:
+                _running.discard(name)
+                return stored
+            text, cycle, changed = _pending[name]
+            quiet_for = time.monotonic() - changed
+            if quiet_for >= config.EXTRACTION_DEBOUNCE:
+                del _pending[name]
+                key = text_hash(text)
+                if key in _futures or key in _records():
+                    continue
+                future = _futures[key] = Future()
+        if quiet_for < config.EXTRACTION_DEBOUNCE:
+            time.sleep(config.EXTRACTION_DEBOUNCE - quiet_for)
+            continue
+
+        record = None
+        try:
+            record = _extract(key, name, text, cycle)
+        finally:
+            # Anyone waiting on this text in extract() gets the result, or None
+            with _lock:
+                del _futures[key]
+            future.set_result(record)
+        stored += record is not None
+
+
+def wait() -> int:
+    """Block until background extractions finish. Returns how many records were stored."""
+    with _lock:
+        loops = list(_loops)
+        _loops.clear()
+    done, _ = wait_futures(loops)
+    return sum(future.result() for future in done)
+
+
+def records(inputs: dict) -> dict:
+    """{name: record | None} for everyone with a response, extracting any that aren't cached yet in parallel."""
+    found = {}
+    missing = []
+    cycle = _current_cycle()
+    with _lock:
+        cached = _records()
+        for name, text in inputs.items():
+            if text:
+                found[name] = cached.get(text_hash(text))
+                if found[name] is None:
+                    missing.append((name, text))
+    for (name, _), record in fanout.run(lambda item: extract(*item, cycle), missing):
+        found[name] = record
+    return found
+
+
+def sections_of(record: dict) -> set[str]:
+    return {item["section"] for item in record["items"]}
+
+
+def render(record: dict, section: str | None = None) -> str:
+    """
+    A record as compact text: bullets, then "Label: value" lines for its numbers.
+
+    With a section, only that section's items; otherwise every item under a
+    "Section:" line.
+    """
+    lines = []
+    for item in record["items"]:
+        if section is not None and item["section"] != section:
+            continue
+        if section is None:
+            lines.append(f"{item['section']}:")
+        lines += [f"- {bullet}" for bullet in item["bullets"]]
+        lines += [f"{number['label']}: {number['value']}" for number in item["numbers"]]
+        if item["entities"]:
+            lines.append(f"(Named: {', '.join(item['entities'])})")
+    return "\n".join(lines)
+
+
+def compact(inputs: dict) -> dict:
+    """inputs with every response replaced by its rendered record (or left raw if extraction failed)."""
+    found = records(inputs)
+    return {
+        name: render(found[name]) if found.get(name) is not None else text
+        for name, text in inputs.items()
+    }
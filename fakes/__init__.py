@@ -0,0 +1,6 @@
+"""
+Local stand-ins for the external APIs the agent talks to.
+
+Point the SDKs at them with ANTHROPIC_BASE_URL and SLACK_API_URL to exercise
+the agent end to end without live credentials (benchmark.py does this).
+"""
@@ -0,0 +1,303 @@
+"""
+Fake Anthropic Messages API — messages.create and Message Batches.
+
+Usage:
+    python -m fakes.anthropic_server --port 8081 --batch-delay 5
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8081 ANTHROPIC_API_KEY=fake \\
+        python agent.py --step outreach --batch --poll-interval 1
+
+Replies are short canned texts (JSON for response extraction, echoing the
+reply, and for feedback mapping, with no changes). Batches report "in_progress" until
+--batch-delay seconds after they were created. Streaming requests get
+server-sent events; --drop-streams N cuts the first N streams off halfway
+through to exercise resume.
+
+Replies are padded to about --output-tokens tokens (default: one short line).
+
+Fault injection for messages requests:
+    --latency S        base response latency
+    --slow-rate P      fraction of requests that take --slow-latency instead (tail latency)
+    --error-rate P     fraction of requests answered with --error-status (default 529 overloaded)
+    --seed N           make the injected faults reproducible
+
+The server counts calls per endpoint and bytes in/out: see .stats(), or
+GET /_stats (POST /_stats to reset) when it runs as a separate process.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+_FILLER = " Lorem ipsum dolor sit amet, consectetur adipiscing elit."
+
+
+def _message(params: dict, output_tokens: int = 0) -> dict:
+    """A canned Messages API response for a request (about output_tokens long, if given)."""
+    prompt = json.dumps(params.get("system", "")) + json.dumps(params["messages"])
+    text = f"Hey! This is a fake reply to a {len(prompt)}-character prompt."
+    if "Respond with JSON only" in prompt and "## Feedback" in prompt:
+        # Feedback mapping (claude_client.map_feedback): every line is chatter
+        text = json.dumps({"changes": []})
+        output_tokens = 0
+    elif "Respond with JSON only" in prompt:
+        # Extraction (claude_client.extract_response): the reply's lines as one item's bullets
+        reply = params["messages"][-1]["content"].split("---")[1].strip()
+        text = json.dumps({"items": [{"section": "Other Things Happening", "bullets": reply.splitlines(), "numbers": [], "entities": []}]})
+        output_tokens = 0
+    if params["messages"][-1]["role"] == "assistant":
+        # Prefilled: pretend to finish the assistant's text
+        text = " ...and that's the rest of it."
+    # Roughly 4 characters per token, capped like the real API
+    length = min(output_tokens, params.get("max_tokens", output_tokens)) * 4
+    while len(text) < length:
+        text += _FILLER
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": params["model"],
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": len(prompt) // 4,
+            "output_tokens": len(text) // 4,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        },
+    }
+
+
+class FakeAnthropic(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        batch_delay: float = 0.0,
+        drop_streams: int = 0,
+        latency: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 5.0,
+        error_rate: float = 0.0,
+        error_status: int = 529,
+        output_tokens: int = 0,
+        seed: int | None = None,
+    ):
+        super().__init__(address, _Handler)
+        self.batch_delay = batch_delay
+        self.drop_streams = drop_streams
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.output_tokens = output_tokens
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.batches = {}
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.calls = Counter()
+            self.bytes_in = 0
+            self.bytes_out = 0
+
+    def stats(self) -> dict:
+        """Calls per endpoint and bytes received/sent since the last reset_stats()."""
+        with self.lock:
+            return {"calls": dict(self.calls), "bytes_in": self.bytes_in, "bytes_out": self.bytes_out}
+
+    def count(self, endpoint: str, bytes_in: int = 0, bytes_out: int = 0):
+        with self.lock:
+            if endpoint:
+                self.calls[endpoint] += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def batch_object(self, batch: dict) -> dict:
+        ended = time.time() >= batch["created"] + self.batch_delay
+        total = len(batch["requests"])
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else total,
+                "succeeded": total if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": _iso(batch["created"]),
+            "expires_at": _iso(batch["created"] + 86400),
+            "ended_at": _iso(time.time()) if ended else None,
+            "cancel_initiated_at": None,
+            "archived_at": None,
+            "results_url": f"{self.url}/v1/messages/batches/{batch['id']}/results" if ended else None,
+        }
+
+
+def _iso(ts: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body, content_type="application/json"):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.count("", bytes_out=len(data))
+
+    def _not_found(self):
+        self._send(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+    def do_POST(self):
+        if self.path == "/_stats":
+            self._send(200, self.server.stats())
+            return self.server.reset_stats()
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split("?")[0]
+        endpoint = "messages.batches.create" if path.endswith("/batches") else "messages.create"
+        self.server.count(endpoint + (".stream" if body.get("stream") else ""), bytes_in=length)
+
+        if path == "/v1/messages":
+            with self.server.lock:
+                self.server.requests += 1
+                slow = self.server.random.random() < self.server.slow_rate
+                fail = self.server.random.random() < self.server.error_rate
+            time.sleep(self.server.slow_latency if slow else self.server.latency)
+            if fail:
+                status = self.server.error_status
+                kind = {429: "rate_limit_error", 529: "overloaded_error"}.get(status, "api_error")
+                return self._send(status, {"type": "error", "error": {"type": kind, "message": "injected"}})
+
+        if path == "/v1/messages" and body.get("stream"):
+            self._stream(_message(body, self.server.output_tokens))
+        elif path == "/v1/messages":
+            self._send(200, _message(body, self.server.output_tokens))
+        elif path == "/v1/messages/batches":
+            batch = {"id": f"msgbatch_{uuid.uuid4().hex[:24]}", "created": time.time(), "requests": body["requests"]}
+            with self.server.lock:
+                self.server.batches[batch["id"]] = batch
+            self._send(200, self.server.batch_object(batch))
+        else:
+            self._not_found()
+
+    def _stream(self, message: dict):
+        """Send a message as Messages API server-sent events."""
+        with self.server.lock:
+            drop = self.server.drop_streams > 0
+            self.server.drop_streams -= drop
+
+        text = message["content"][0]["text"]
+        start = dict(message, content=[], stop_reason=None)
+        events = [
+            ("message_start", {"type": "message_start", "message": start}),
+            ("content_block_start", {"type": "content_block_start", "index": 0,
+                                     "content_block": {"type": "text", "text": ""}}),
+        ]
+        for i in range(0, len(text), 8):
+            events.append(("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                   "delta": {"type": "text_delta", "text": text[i:i + 8]}}))
+        if drop:
+            events = events[: 2 + len(events) // 2]
+        else:
+            events += [
+                ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+                ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                   "usage": {"output_tokens": message["usage"]["output_tokens"]}}),
+                ("message_stop", {"type": "message_stop"}),
+            ]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for name, data in events:
+            chunk = f"event: {name}\ndata: {json.dumps(data)}\n\n".encode()
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+            self.server.count("", bytes_out=len(chunk))
+        if drop:
+            # Drop the connection mid-stream: no message_stop, no final chunk
+            self.close_connection = True
+        else:
+            self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        if self.path == "/_stats":
+            return self._send(200, self.server.stats())
+
+        parts = self.path.split("?")[0].strip("/").split("/")
+        self.server.count("messages.batches.results" if parts[-1] == "results" else "messages.batches.retrieve")
+        # v1/messages/batches/<id>[/results]
+        if parts[:3] != ["v1", "messages", "batches"] or len(parts) < 4:
+            return self._not_found()
+
+        batch = self.server.batches.get(parts[3])
+        if not batch:
+            return self._not_found()
+
+        if len(parts) == 4:
+            self._send(200, self.server.batch_object(batch))
+        elif parts[4] == "results":
+            lines = [
+                json.dumps({
+                    "custom_id": request["custom_id"],
+                    "result": {"type": "succeeded", "message": _message(request["params"], self.server.output_tokens)},
+                })
+                for request in batch["requests"]
+            ]
+            self._send(200, "\n".join(lines).encode(), "application/x-jsonl")
+        else:
+            self._not_found()
+
+
+def start(port: int = 0, **options) -> FakeAnthropic:
+    """Start the fake server on a background thread and return it."""
+    server = FakeAnthropic(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Anthropic Messages API")
+    parser.add_argument("--port", type=int, default=8081, help="0 picks a free port")
+    parser.add_argument("--batch-delay", type=float, default=5.0, help="Seconds until a batch ends")
+    parser.add_argument("--drop-streams", type=int, default=0, help="Cut off the first N streams halfway")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=529)
+    parser.add_argument("--output-tokens", type=int, default=0, help="Pad replies to about this many tokens")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    options = dict(vars(args))
+    port = options.pop("port")
+    server = FakeAnthropic(("127.0.0.1", port), **options)
+    print(f"Fake Anthropic API listening on {server.url}", flush=True)
+    server.serve_forever()
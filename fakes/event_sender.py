@@ -0,0 +1,68 @@
+"""
+Fake Slack event sender — posts signed message.im events to the listener.
+
+Usage:
+    SLACK_SIGNING_SECRET=test python agent.py --listen &
+    python -m fakes.event_sender --secret test --user U05EUQK7XPT --text "Shipped SSO" --repeat 2
+
+--repeat resends the identical event, the way Slack retries delivery, to
+check deduplication.
+"""
+
+import argparse
+import json
+import time
+import urllib.request
+import uuid
+
+from slack_sdk.signature import SignatureVerifier
+
+
+def message_event(user: str, text: str, channel: str = "D000FAKE") -> dict:
+    """An Events API event_callback payload for a DM from user."""
+    return {
+        "type": "event_callback",
+        "event_id": f"Ev{uuid.uuid4().hex[:10].upper()}",
+        "event_time": int(time.time()),
+        "event": {
+            "type": "message",
+            "channel_type": "im",
+            "channel": channel,
+            "user": user,
+            "text": text,
+            "ts": f"{time.time():.6f}",
+            "client_msg_id": str(uuid.uuid4()),
+        },
+    }
+
+
+def send(url: str, payload: dict, secret: str) -> int:
+    """POST a payload with a valid Slack signature; returns the HTTP status."""
+    body = json.dumps(payload)
+    timestamp = str(int(time.time()))
+    signature = SignatureVerifier(secret).generate_signature(timestamp=timestamp, body=body)
+    request = urllib.request.Request(
+        url,
+        data=body.encode(),
+        headers={
+            "Content-Type": "application/json",
+            "X-Slack-Request-Timestamp": timestamp,
+            "X-Slack-Signature": signature,
+        },
+    )
+    with urllib.request.urlopen(request) as response:
+        return response.status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send fake Slack message.im events")
+    parser.add_argument("--url", default="http://127.0.0.1:3000/")
+    parser.add_argument("--secret", required=True, help="The listener's SLACK_SIGNING_SECRET")
+    parser.add_argument("--user", required=True, help="Slack user ID the message is from")
+    parser.add_argument("--text", default="Quick update: all good this month!")
+    parser.add_argument("--repeat", type=int, default=1, help="Deliver the same event N times")
+    args = parser.parse_args()
+
+    payload = message_event(args.user, args.text)
+    for _ in range(args.repeat):
+        print(f"→ {send(args.url, payload, args.secret)}")
@@ -0,0 +1,337 @@
+"""
+Fake Slack Web API — the DM, history, user and file upload methods the agent calls.
+
+Usage:
+    python -m fakes.slack_server --port 8082 --reply-rate 0.7
+    SLACK_API_URL=http://127.0.0.1:8082/api/ SLACK_BOT_TOKEN=xoxb-fake \\
+        python agent.py --step check
+
+The workspace has --users members, UB0000000 to UB<n>, named like
+benchmark.roster() ("Person 000", person000@example.com) for users.list,
+users.lookupByEmail and users.info. Every user gets a DM channel on conversations.open. When the bot first posts
+in someone's DM, they "reply" right away with probability --reply-rate (the
+same users every run for a given --seed), so check/nudge/escalate have
+something to find.
+
+Uploads (files.getUploadURLExternal, the upload URL, then
+files.completeUploadExternal) are shared in the DM. As with Slack, the
+completed file doesn't list its shares yet, and files.info does.
+
+Fault injection:
+    --latency S        response latency per call
+    --error-rate P     fraction of calls answered 429 `ratelimited`
+    --retry-after S    Retry-After sent with those (default 1)
+    --seed N           make replies and injected faults reproducible
+
+The server counts calls per method and bytes in/out: see .stats(), or
+GET /_stats (POST /_stats to reset) when it runs as a separate process.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+BOT_USER = "UBOTFAKE0"
+PAGE_SIZE = 100
+
+
+class FakeSlack(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 1.0,
+        reply_rate: float = 0.7,
+        seed: int | None = None,
+        users: int = 200,
+    ):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.reply_rate = reply_rate
+        self.seed = seed
+        self.users = users
+        self.random = random.Random(seed)
+        self.channels = {}  # channel id -> {"user": ..., "messages": [...]}
+        self.files = {}     # file id -> {"name": ..., "length": ..., "content": bytes | None}
+        self.clock = time.time()
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/"
+
+    def reset_stats(self):
+        with self.lock:
+            self.calls = Counter()
+            self.bytes_in = 0
+            self.bytes_out = 0
+
+    def stats(self) -> dict:
+        """Calls per method and bytes received/sent since the last reset_stats()."""
+        with self.lock:
+            return {"calls": dict(self.calls), "bytes_in": self.bytes_in, "bytes_out": self.bytes_out}
+
+    def next_ts(self) -> str:
+        """A unique, increasing message ts (call with the lock held)."""
+        self.clock = max(self.clock + 0.000001, time.time())
+        return f"{self.clock:.6f}"
+
+    def replies(self, user: str) -> bool:
+        """Whether this user answers outreach (fixed per user for a given seed)."""
+        return random.Random(f"{self.seed}:{user}").random() < self.reply_rate
+
+    def call(self, method: str, args: dict) -> dict:
+        handler = getattr(self, "api_" + method.replace(".", "_"), None)
+        if not handler:
+            return {"ok": False, "error": "unknown_method"}
+        with self.lock:
+            return handler(args)
+
+    def api_auth_test(self, args):
+        return {"ok": True, "user_id": BOT_USER, "team": "Fake"}
+
+    def api_conversations_open(self, args):
+        users = args.get("users")
+        user = users[0] if isinstance(users, list) else str(users).split(",")[0]
+        channel = f"D{user[1:]}"
+        self.channels.setdefault(channel, {"user": user, "messages": []})
+        return {"ok": True, "channel": {"id": channel}}
+
+    def api_chat_postMessage(self, args):
+        channel = self.channels.get(args.get("channel"))
+        if channel is None:
+            return {"ok": False, "error": "channel_not_found"}
+
+        message = {"type": "message", "user": BOT_USER, "bot_id": "BFAKE", "text": args.get("text", ""), "ts": self.next_ts()}
+        if args.get("thread_ts"):
+            message["thread_ts"] = args["thread_ts"]
+        first = not channel["messages"]
+        channel["messages"].append(message)
+
+        if first and self.replies(channel["user"]):
+            channel["messages"].append({
+                "type": "message",
+                "user": channel["user"],
+                "client_msg_id": f"fake-{channel['user']}-{message['ts']}",
+                "text": f"Here's my update from {channel['user']}: shipped things, signed customers, hit our numbers.",
+                "ts": self.next_ts(),
+            })
+        return {"ok": True, "channel": args["channel"], "ts": message["ts"], "message": message}
+
+    def _page(self, messages: list, args: dict, newest_first: bool) -> dict:
+        oldest = float(args.get("oldest") or 0)
+        found = [m for m in messages if float(m["ts"]) > oldest]
+        if newest_first:
+            found.reverse()
+        start = int(args.get("cursor") or 0)
+        limit = min(int(args.get("limit") or PAGE_SIZE), PAGE_SIZE)
+        page = found[start:start + limit]
+        more = start + limit < len(found)
+        return {
+            "ok": True,
+            "messages": page,
+            "has_more": more,
+            "response_metadata": {"next_cursor": str(start + limit) if more else ""},
+        }
+
+    def api_conversations_history(self, args):
+        channel = self.channels.get(args.get("channel"))
+        if channel is None:
+            return {"ok": False, "error": "channel_not_found"}
+        top_level = [m for m in channel["messages"] if m.get("thread_ts", m["ts"]) == m["ts"]]
+        return self._page(top_level, args, newest_first=True)
+
+    def api_conversations_replies(self, args):
+        channel = self.channels.get(args.get("channel"))
+        if channel is None:
+            return {"ok": False, "error": "channel_not_found"}
+        ts = args.get("ts")
+        thread = [m for m in channel["messages"] if m["ts"] == ts or m.get("thread_ts") == ts]
+        # Like Slack, the parent comes back too (oldest is ignored here)
+        return self._page(thread, {**args, "oldest": 0}, newest_first=False)
+
+    def api_files_getUploadURLExternal(self, args):
+        file_id = f"F{len(self.files) + 1:08d}"
+        self.files[file_id] = {"name": args.get("filename"), "length": int(args.get("length") or 0), "content": None}
+        return {"ok": True, "file_id": file_id, "upload_url": f"{self.url.rsplit('/api/', 1)[0]}/upload/{file_id}"}
+
+    def upload(self, file_id: str, content: bytes) -> bool:
+        """The step between the two files.* calls: a raw POST to the upload URL."""
+        with self.lock:
+            if file_id not in self.files:
+                return False
+            self.files[file_id]["content"] = content
+            return True
+
+    def api_files_completeUploadExternal(self, args):
+        files = args.get("files")
+        files = json.loads(files) if isinstance(files, str) else files or []
+        channel = self.channels.get(args.get("channel_id"))
+        if channel is None:
+            return {"ok": False, "error": "channel_not_found"}
+        if any(self.files.get(f["id"], {}).get("content") is None for f in files):
+            return {"ok": False, "error": "file_not_found"}
+
+        message = {
+            "type": "message",
+            "user": BOT_USER,
+            "bot_id": "BFAKE",
+            "text": args.get("initial_comment", ""),
+            "ts": self.next_ts(),
+            "files": [{"id": f["id"], "title": f.get("title")} for f in files],
+        }
+        channel["messages"].append(message)
+        # Like Slack, the share only shows up in files.info: the file is still being processed
+        for f in files:
+            self.files[f["id"]]["shares"] = {"private": {args["channel_id"]: [{"ts": message["ts"]}]}}
+        return {
+            "ok": True,
+            "files": [{"id": f["id"], "title": f.get("title"), "name": self.files[f["id"]]["name"]} for f in files],
+        }
+
+    def api_files_info(self, args):
+        file = self.files.get(args.get("file"))
+        if file is None:
+            return {"ok": False, "error": "file_not_found"}
+        return {"ok": True, "file": {"id": args["file"], "name": file["name"], "shares": file.get("shares", {})}}
+
+    def _user(self, i: int) -> dict:
+        name = f"Person {i:03d}"
+        return {
+            "id": f"UB{i:07d}",
+            "name": name.replace(" ", "").lower(),
+            "real_name": name,
+            "deleted": False,
+            "is_bot": False,
+            "profile": {"real_name": name, "display_name": name, "email": f"person{i:03d}@example.com"},
+        }
+
+    def api_users_list(self, args):
+        start = int(args.get("cursor") or 0)
+        limit = min(int(args.get("limit") or PAGE_SIZE), PAGE_SIZE)
+        end = min(start + limit, self.users)
+        return {
+            "ok": True,
+            "members": [self._user(i) for i in range(start, end)],
+            "response_metadata": {"next_cursor": str(end) if end < self.users else ""},
+        }
+
+    def api_users_lookupByEmail(self, args):
+        email = args.get("email", "")
+        local = email.split("@")[0]
+        if local.startswith("person") and local[6:].isdigit() and int(local[6:]) < self.users:
+            return {"ok": True, "user": self._user(int(local[6:]))}
+        return {"ok": False, "error": "users_not_found"}
+
+    def api_users_info(self, args):
+        user = args.get("user")
+        if user.startswith("UB") and user[2:].isdigit() and int(user[2:]) < self.users:
+            return {"ok": True, "user": self._user(int(user[2:]))}
+        return {"ok": True, "user": {"id": user, "profile": {"real_name": f"User {user}", "display_name": user}}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, result: dict, headers: dict | None = None) -> int:
+        data = json.dumps(result).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        return len(data)
+
+    def _handle(self, body: bytes):
+        url = urlsplit(self.path)
+        if url.path == "/_stats":
+            self._send_json(200, self.server.stats())
+            if self.command == "POST":
+                self.server.reset_stats()
+            return
+        if url.path.startswith("/upload/"):
+            ok = self.server.upload(url.path.rsplit("/", 1)[-1], body)
+            with self.server.lock:
+                self.server.calls["upload"] += 1
+                self.server.bytes_in += len(body)
+            self.send_response(200 if ok else 404)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"OK")
+            return
+
+        method = url.path.rsplit("/", 1)[-1]
+        args = dict(parse_qsl(url.query))
+        content_type = self.headers.get("Content-Type", "")
+        if body and "json" in content_type:
+            args.update(json.loads(body))
+        elif body:
+            args.update(parse_qsl(body.decode()))
+
+        server = self.server
+        with server.lock:
+            server.calls[method] += 1
+            server.bytes_in += len(body) + len(self.path)
+            throttled = server.random.random() < server.error_rate
+        time.sleep(server.latency)
+
+        if throttled:
+            status, result, headers = 429, {"ok": False, "error": "ratelimited"}, {"Retry-After": str(server.retry_after)}
+        else:
+            status, result, headers = 200, server.call(method, args), {}
+
+        sent = self._send_json(status, result, headers)
+        with server.lock:
+            server.bytes_out += sent
+
+    def do_POST(self):
+        self._handle(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+    def do_GET(self):
+        self._handle(b"")
+
+
+def start(port: int = 0, **options) -> FakeSlack:
+    """Start the fake server on a background thread and return it."""
+    server = FakeSlack(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Slack Web API")
+    parser.add_argument("--port", type=int, default=8082, help="0 picks a free port")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--reply-rate", type=float, default=0.7)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--users", type=int, default=200, help="workspace members for users.list")
+    args = parser.parse_args()
+
+    server = FakeSlack(
+        ("127.0.0.1", args.port),
+        latency=args.latency,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        reply_rate=args.reply_rate,
+        seed=args.seed,
+        users=args.users,
+    )
+    print(f"Fake Slack Web API listening on {server.url}", flush=True)
+    server.serve_forever()
@@ -0,0 +1,64 @@
+"""
+Fan-out helper — runs per-person pipelines on a bounded thread pool.
+
+Every step that talks to Slack or Claude once per team member spends most of
+its time waiting on the network, so we run those pipelines concurrently and
+hand results back to the caller (on the calling thread) as they finish.
+State is only ever mutated by the caller, never from the worker threads.
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import MAX_WORKERS
+
+_workers = MAX_WORKERS
+
+
+def set_workers(workers: int):
+    """Override the worker count for this process (1 = run serially)."""
+    global _workers
+    _workers = max(1, int(workers))
+
+
+def run(fn, items, workers: int | None = None, warm_up: int = 0):
+    """
+    Call fn(item) for every item with bounded concurrency.
+
+    Yields (item, result) pairs in completion order. If fn raises, the result
+    is {"ok": False, "error": "<message>"} so one bad pipeline doesn't take
+    down the rest of the step.
+
+    warm_up items are run on their own before the rest fan out — used to let
+    the first Claude request write the prompt cache the others then read.
+    """
+    items = list(items)
+    if not items:
+        return
+
+    for item in items[:warm_up]:
+        yield item, _call(fn, item)
+    items = items[warm_up:]
+    if not items:
+        return
+
+    workers = max(1, min(workers or _workers, len(items)))
+
+    if workers == 1:
+        for item in items:
+            yield item, _call(fn, item)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Each worker runs in a copy of the caller's context, so its tracing
+        # spans nest under the caller's
+        futures = {pool.submit(contextvars.copy_context().run, _call, fn, item): item for item in items}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def _call(fn, item):
+    try:
+        return fn(item)
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
@@ -0,0 +1,142 @@
+"""
+Generation cache — content-addressed on-disk cache for Claude outputs.
+
+Entries are keyed by a hash of everything that determines the output (model,
+system prompt, messages, max_tokens, ...) and stored as one JSON file each
+under data/gen_cache/. Re-running a step with unchanged inputs — a retry, a
+re-run after a crash, another --test — reuses the previous generation
+instead of paying for it again.
+
+A file's mtime is when the entry was last written or read. Expiry
+(GEN_CACHE_MAX_AGE_DAYS unused) and size-based eviction (least recently
+used first) both go by it.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import state
+from config import GEN_CACHE_MAX_AGE_DAYS, GEN_CACHE_MAX_BYTES
+
+CACHE_DIRNAME = "gen_cache"
+
+_enabled = True
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+_bytes = None  # total size on disk, scanned lazily on first write
+_lock = threading.Lock()
+
+
+def _cache_dir() -> str:
+    return os.path.join(state.STATE_DIR, CACHE_DIRNAME)
+
+
+def set_enabled(enabled: bool):
+    """Turn the cache on/off for this process (--no-cache bypasses it)."""
+    global _enabled
+    _enabled = enabled
+
+
+def make_key(params: dict) -> str:
+    """Stable hash of the request parameters."""
+    blob = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> str | None:
+    """Return the cached text for key, or None on a miss (or when bypassed)."""
+    if not _enabled:
+        return None
+
+    path = os.path.join(_cache_dir(), f"{key}.json")
+    try:
+        if time.time() - os.stat(path).st_mtime > GEN_CACHE_MAX_AGE_DAYS * 86400:
+            entry = None
+        else:
+            with open(path, "r") as f:
+                entry = json.load(f)
+    except (OSError, ValueError):
+        entry = None
+
+    with _lock:
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        _stats["hits"] += 1
+
+    # Bump mtime: the entry was just used
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    return entry["text"]
+
+
+def put(key: str, text: str):
+    """Store a generation and evict old entries if the cache is over budget."""
+    global _bytes
+    if not _enabled:
+        return
+
+    os.makedirs(_cache_dir(), exist_ok=True)
+    path = os.path.join(_cache_dir(), f"{key}.json")
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"created": time.time(), "text": text}, f)
+    os.replace(tmp_path, path)
+
+    with _lock:
+        _stats["writes"] += 1
+        if _bytes is None:
+            _evict()
+        else:
+            _bytes += os.path.getsize(path)
+            if _bytes > GEN_CACHE_MAX_BYTES:
+                _evict()
+
+
+def _evict():
+    """Drop expired entries, then the least recently used until under budget."""
+    global _bytes
+    cutoff = time.time() - GEN_CACHE_MAX_AGE_DAYS * 86400
+    entries = []
+    for entry in os.scandir(_cache_dir()):
+        if not entry.name.endswith(".json"):
+            continue
+        info = entry.stat()
+        if info.st_mtime < cutoff:
+            _remove(entry.path)
+        else:
+            entries.append((info.st_mtime, info.st_size, entry.path))
+
+    entries.sort()
+    _bytes = sum(size for _, size, _ in entries)
+    while entries and _bytes > GEN_CACHE_MAX_BYTES:
+        _, size, path = entries.pop(0)
+        _remove(path)
+        _bytes -= size
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+        _stats["evictions"] += 1
+    except FileNotFoundError:
+        pass
+
+
+def reset():
+    """Zero the counters and forget the scanned cache size (e.g. after switching data dirs)."""
+    global _bytes
+    with _lock:
+        _bytes = None
+        for name in _stats:
+            _stats[name] = 0
+
+
+def stats() -> dict:
+    """Hit/miss/write/eviction counters for this process."""
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,336 @@
+"""
+KPIs — a month-by-month history of the KPI numbers, so the draft gets exact MoM/QoQ changes.
+
+The numbers come from:
+
+  - the KPIs section of every past update in data/past_updates/ (lines like
+    "Monthly Interviews: 193 (+45%)"), parsed once per file and cached in
+    data/kpi_history.json alongside the history itself
+  - this month's replies from whoever covers KPIs ("Interviews: 210")
+  - data/kpis.csv, if there is one: a spreadsheet export with a "month"
+    column and one column per KPI (or "month,kpi,value" rows). It wins over
+    everything else for the months it covers.
+
+They're kept as columns: one list of values per KPI, aligned to a run of
+consecutive months. MoM and QoQ changes for every KPI and month come from
+one pass over those columns. The draft then gets the KPI block with its
+percentages already worked out, rather than asking the model to compute
+(or copy) them.
+
+A label in a reply is matched to an existing KPI when its words are a
+subset of the KPI's ("Profiles with a match" → "New Carefam Talent
+Profiles with a Match"), so the KPIs keep their usual wording and order.
+Only the KPIs of past updates, data/kpis.csv and config.KPI_NAMES are
+known. Any other number in a reply ("Ping me by May 30") is kept out of the
+history, and the block is left to the model with those numbers flagged.
+"""
+
+import csv
+import io
+import json
+import os
+import re
+import threading
+
+import config
+import past_updates
+import sections
+import state
+
+HISTORY_FILE = "kpi_history.json"
+HISTORY_VERSION = 1
+CSV_FILE = "kpis.csv"
+
+# How many months of history the prompt table shows
+TABLE_MONTHS = 4
+
+_LINE = re.compile(
+    r"^(?P<label>[A-Za-z][^:|=\d]{0,60}?)\s*(?:[:=|–—-]\s*|\s)"
+    r"(?P<value>[-+]?\$?\d[\d,]*(?:\.\d+)?)\s*(?P<unit>[kKmM](?![a-z]))?"
+    r"\s*(?:\([^)]*\))?\s*[.,;]?$"
+)
+_UNITS = {"k": 1_000, "m": 1_000_000}
+_STOPWORDS = {"a", "an", "the", "of", "on", "in", "with", "per", "and", "total", "new", "monthly", "this", "month"}
+
+_lock = threading.Lock()
+
+
+def cycle_month(current_state: dict) -> str:
+    """The month a cycle's update covers, as YYYY-MM."""
+    return current_state["cycle_started"][:7]
+
+
+def _words(label: str) -> set[str]:
+    words = re.findall(r"[a-z0-9]+", label.lower())
+    return {word[:-1] if len(word) > 3 and word.endswith("s") else word for word in words} - _STOPWORDS
+
+
+def _key(label: str) -> str:
+    return " ".join(sorted(_words(label)))
+
+
+def _number(value: str, unit: str | None) -> float:
+    number = float(value.replace(",", "").replace("$", ""))
+    return number * _UNITS.get((unit or "").lower(), 1)
+
+
+def parse(text: str) -> dict:
+    """{label: value} from "Label: number (+X%)" lines (bullets, bold and table pipes are fine)."""
+    found = {}
+    for line in text.splitlines():
+        line = re.sub(r"</?u>|\*\*|__|`", "", line).strip().strip("|").strip()
+        line = re.sub(r"^[-*•]\s+", "", line).replace("|", ":")
+        match = _LINE.match(line)
+        if match and _words(match.group("label")):
+            found[match.group("label").strip(" :-")] = _number(match.group("value"), match.group("unit"))
+    return found
+
+
+def parse_csv(text: str) -> dict:
+    """{YYYY-MM: {label: value}} from a wide (month + one column per KPI) or long (month,kpi,value) CSV."""
+    rows = list(csv.reader(io.StringIO(text)))
+    if not rows:
+        return {}
+    header = [cell.strip() for cell in rows[0]]
+    lower = [cell.lower() for cell in header]
+    months = {}
+
+    def month_of(cell: str) -> str | None:
+        return past_updates.parse_date(cell) if cell.strip() else None
+
+    if lower[:3] == ["month", "kpi", "value"]:
+        for row in rows[1:]:
+            if len(row) >= 3 and month_of(row[0]) and row[2].strip():
+                months.setdefault(month_of(row[0]), {})[row[1].strip()] = _number(row[2].strip(), None)
+        return months
+
+    if lower and lower[0] == "month":
+        for row in rows[1:]:
+            month = month_of(row[0]) if row else None
+            if not month:
+                continue
+            for label, cell in zip(header[1:], row[1:]):
+                if cell.strip():
+                    months.setdefault(month, {})[label] = _number(cell.strip(), None)
+    return months
+
+
+def _history_path() -> str:
+    return os.path.join(state.STATE_DIR, HISTORY_FILE)
+
+
+def _load_files() -> dict:
+    try:
+        with open(_history_path(), "r") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return saved["files"] if saved.get("version") == HISTORY_VERSION else {}
+
+
+def _past_months() -> dict:
+    """{YYYY-MM: {label: value}} from past updates, re-parsing only files that changed."""
+    known = _load_files()
+    files = {}
+    for filename, entry in past_updates.updates():
+        cached = known.get(filename)
+        if cached and cached["mtime"] == entry["mtime"] and cached["size"] == entry["size"]:
+            files[filename] = cached
+            continue
+        text = past_updates.section_text(filename, entry, sections.KPIS)
+        files[filename] = {
+            "mtime": entry["mtime"],
+            "size": entry["size"],
+            "date": entry["date"],
+            "kpis": parse(text) if text else {},
+        }
+
+    if files != known:
+        _save(files, _columns({entry["date"]: entry["kpis"] for entry in files.values()}))
+    # Later files for the same month override earlier ones, like past_updates' ordering
+    return {entry["date"]: entry["kpis"] for entry in files.values() if entry["kpis"]}
+
+
+def _save(files: dict, history: dict):
+    os.makedirs(state.STATE_DIR, exist_ok=True)
+    tmp_path = f"{_history_path()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": HISTORY_VERSION, "files": files, **history}, f)
+    os.replace(tmp_path, _history_path())
+
+
+def _month_range(first: str, last: str) -> list[str]:
+    year, month = int(first[:4]), int(first[5:7])
+    months = []
+    while f"{year}-{month:02d}" <= last:
+        months.append(f"{year}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _columns(by_month: dict) -> dict:
+    """
+    Columnar history: {"months": [...consecutive YYYY-MM], "labels": [...], "columns": {label: [value | None]}}.
+
+    Labels keep the wording of the latest month that used them and are
+    ordered as in the latest month, then by when they were last used.
+    """
+    by_month = {month: kpis for month, kpis in by_month.items() if kpis}
+    if not by_month:
+        return {"months": [], "labels": [], "columns": {}}
+    months = _month_range(min(by_month), max(by_month))
+
+    labels = {}  # key -> label, newest wording wins
+    order = []
+    for month in reversed(months):
+        for label in by_month.get(month, {}):
+            key = _match(label, labels) or _key(label)
+            if key not in labels:
+                labels[key] = label
+                order.append(key)
+
+    columns = {labels[key]: [None] * len(months) for key in order}
+    for i, month in enumerate(months):
+        for label, value in by_month.get(month, {}).items():
+            columns[labels[_match(label, labels) or _key(label)]][i] = value
+    return {"months": months, "labels": [labels[key] for key in order], "columns": columns}
+
+
+def _match(label: str, labels: dict) -> str | None:
+    """The key of the known KPI this label names, if any (its words are a subset of that KPI's)."""
+    key = _key(label)
+    if key in labels:
+        return key
+    words = _words(label)
+    candidates = [known for known in labels if words and words <= set(known.split())]
+    return min(candidates, key=len) if candidates else None
+
+
+def history(month: str, inputs: dict | None = None) -> dict:
+    """
+    The columnar KPI history up to and including `month` (YYYY-MM).
+
+    inputs are this month's replies from the people who cover KPIs
+    (name -> response text); data/kpis.csv overrides any month it has.
+    A reply's number only counts if its label matches a known KPI; the
+    rest are returned as "unmatched" ({label: value}).
+    """
+    with _lock:
+        by_month = _past_months()
+
+    csv_path = os.path.join(state.STATE_DIR, CSV_FILE)
+    if os.path.exists(csv_path):
+        with open(csv_path, "r", newline="") as f:
+            for csv_month, kpis in parse_csv(f.read()).items():
+                by_month[csv_month] = {**by_month.get(csv_month, {}), **kpis}
+
+    # The KPIs a reply can report: newest wording first, then config.KPI_NAMES
+    known = {}
+    for past in sorted(by_month, reverse=True):
+        for label in by_month[past]:
+            known.setdefault(_match(label, known) or _key(label), label)
+    for label in config.KPI_NAMES:
+        known.setdefault(_match(label, known) or _key(label), label)
+
+    # Replies use shorthand labels, so map them onto the known KPIs
+    replies = {}
+    unmatched = {}
+    for response in (inputs or {}).values():
+        for label, value in parse(response or "").items():
+            key = _match(label, known)
+            if key:
+                replies[known[key]] = value
+            else:
+                unmatched[label] = value
+    if replies:
+        by_month[month] = {**replies, **by_month.get(month, {})}
+
+    data = _columns({past: kpis for past, kpis in by_month.items() if past <= month})
+    data["unmatched"] = unmatched
+    return data
+
+
+def _pct(current: float | None, previous: float | None) -> float | None:
+    if current is None or not previous:
+        return None
+    return (current - previous) / abs(previous) * 100
+
+
+def changes(columns: dict) -> dict:
+    """{label: {"mom": [...], "qoq": [...]}} % changes for every KPI and month, in one pass."""
+    return {
+        label: {
+            "mom": [_pct(current, previous) for current, previous in zip(column, [None] + column[:-1])],
+            "qoq": [_pct(current, previous) for current, previous in zip(column, [None] * 3 + column[:-3])],
+        }
+        for label, column in columns.items()
+    }
+
+
+def _value(value: float) -> str:
+    return str(int(value)) if value == int(value) else f"{value:,.2f}".rstrip("0").rstrip(".")
+
+
+def _change(pct: float | None) -> str:
+    if pct is None:
+        return "-"
+    text = f"{pct:+.0f}%" if abs(pct) >= 10 else f"{pct:+.1f}%".replace(".0%", "%")
+    return "0%" if text in ("+0%", "-0%") else text
+
+
+def block(month: str, inputs: dict | None = None) -> str | None:
+    """
+    This month's Monthly KPIs block, "Name: number (+X%)" per line, ready to use as is.
+
+    None unless the month has a number for every KPI last month had, so a
+    missing KPI is left for the model to flag. Also None if a reply has a
+    number that matches no known KPI: it may be a new KPI, or no KPI at all,
+    which is for the model (with the table's flag) to judge.
+    """
+    data = history(month, inputs)
+    if data["unmatched"] or not data["months"] or data["months"][-1] != month:
+        return None
+    deltas = changes(data["columns"])
+    current = {label: column[-1] for label, column in data["columns"].items()}
+    previous = {label: column[-2] for label, column in data["columns"].items() if len(column) > 1}
+    if any(value is not None and current[label] is None for label, value in previous.items()):
+        return None
+    return "\n".join(
+        f"{label}: {_value(current[label])} ({_change(deltas[label]['mom'][-1])})"
+        for label in data["labels"] if current[label] is not None
+    )
+
+
+def table(month: str, inputs: dict | None = None) -> str | None:
+    """
+    A markdown table of the last TABLE_MONTHS of KPIs with this month's MoM and QoQ, for prompts.
+
+    Numbers in replies that match no known KPI are listed under the table,
+    flagged as such. None if there are no KPI numbers at all.
+    """
+    data = history(month, inputs)
+    flagged = "\n".join(f"- {label}: {_value(value)}" for label, value in data["unmatched"].items())
+    if not data["months"]:
+        return f"(No KPI history yet. Numbers in this month's replies:)\n{flagged}" if flagged else None
+    deltas = changes(data["columns"])
+    shown = data["months"][-TABLE_MONTHS:]
+    has_current = data["months"][-1] == month
+
+    lines = [
+        "| KPI | " + " | ".join(shown) + (" | MoM | QoQ |" if has_current else " |"),
+        "|---|" + "---|" * (len(shown) + (2 if has_current else 0)),
+    ]
+    for label in data["labels"]:
+        column = data["columns"][label][-len(shown):]
+        cells = [_value(value) if value is not None else "" for value in column]
+        if has_current:
+            cells += [_change(deltas[label]["mom"][-1]), _change(deltas[label]["qoq"][-1])]
+        lines.append(f"| {label} | " + " | ".join(cells) + " |")
+    if not has_current:
+        lines.append(f"\n(No KPI numbers for {month} yet.)")
+    if flagged:
+        lines.append(
+            "\n(These numbers in this month's replies don't match a known KPI. "
+            f"Only report one if it's clearly a new KPI, and flag it for review:)\n{flagged}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,134 @@
+"""
+Listener — captures team replies as they arrive instead of polling.
+
+Consumes Slack `message.im` events and records each reply with
+state.record_message. Two transports:
+
+  - Socket Mode, when SLACK_APP_TOKEN (xapp-...) is set — no public URL needed
+  - Events API over HTTP otherwise, on LISTEN_PORT, verified with
+    SLACK_SIGNING_SECRET (point the app's Request URL at it)
+
+Slack redelivers events it thinks failed, so every message is deduplicated
+by client_msg_id (falling back to ts) before it's recorded. Events are
+handled concurrently, and alongside cron steps in other processes:
+record_message merges each reply into the stored contact inside one write
+transaction, so none of them overwrite each other.
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import state
+import team
+from config import LISTEN_PORT
+
+
+def handle_event(event: dict) -> bool:
+    """
+    Record a message.im event if it's a team member replying to outreach.
+
+    Returns True if a new reply was recorded.
+    """
+    if event.get("type") != "message" or event.get("channel_type") != "im":
+        return False
+    # Edits, joins, bot messages etc. all carry a subtype (or bot_id)
+    if event.get("subtype") or event.get("bot_id"):
+        return False
+
+    person = team.by_slack_id(event.get("user"))
+    if not person:
+        return False
+
+    current_state = state.load_state()
+    info = current_state["contacts"].get(person["name"])
+    if not info or not info.get("message_ts"):
+        return False
+    if float(event["ts"]) <= float(info["message_ts"]):
+        return False
+
+    recorded = state.record_message(current_state, person["name"], event)
+
+    if recorded:
+        print(f"  ✓ {person['name']} replied")
+    return recorded
+
+
+def _handle_payload(payload: dict) -> dict | None:
+    """Handle an Events API payload; returns a response body if one is needed."""
+    if payload.get("type") == "url_verification":
+        return {"challenge": payload["challenge"]}
+    if payload.get("type") == "event_callback":
+        handle_event(payload["event"])
+    return None
+
+
+def serve_http(port: int = LISTEN_PORT, signing_secret: str | None = None):
+    """Run an Events API endpoint until interrupted."""
+    from slack_sdk.signature import SignatureVerifier
+
+    verifier = SignatureVerifier(signing_secret or os.environ["SLACK_SIGNING_SECRET"])
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not verifier.is_valid_request(body, dict(self.headers)):
+                self.send_response(401)
+                self.end_headers()
+                return
+
+            response = _handle_payload(json.loads(body))
+            data = json.dumps(response or {}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    print(f"👂 Listening for Slack events on http://0.0.0.0:{port}/ (Ctrl+C to stop)\n")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def serve_socket_mode(app_token: str | None = None):
+    """Run a Socket Mode connection until interrupted."""
+    from slack_sdk.socket_mode import SocketModeClient
+    from slack_sdk.socket_mode.response import SocketModeResponse
+
+    import clients
+
+    socket_client = SocketModeClient(
+        app_token=app_token or os.environ["SLACK_APP_TOKEN"],
+        web_client=clients.slack(),
+    )
+
+    def on_request(client, request):
+        client.send_socket_mode_response(SocketModeResponse(envelope_id=request.envelope_id))
+        if request.type == "events_api":
+            _handle_payload(request.payload)
+
+    socket_client.socket_mode_request_listeners.append(on_request)
+    socket_client.connect()
+    print("👂 Listening for Slack events over Socket Mode (Ctrl+C to stop)\n")
+    try:
+        threading.Event().wait()
+    finally:
+        socket_client.close()
+
+
+def serve():
+    """Listen with Socket Mode if an app token is configured, else over HTTP."""
+    try:
+        if os.environ.get("SLACK_APP_TOKEN"):
+            serve_socket_mode()
+        else:
+            serve_http()
+    except KeyboardInterrupt:
+        print("\n👂 Listener stopped.\n")
@@ -0,0 +1,323 @@
+"""
+Past updates — an index over data/past_updates/ for prompt context.
+
+The first time it's needed in a process, the directory is scanned and every
+new or changed file (by mtime and size) is parsed into:
+
+  - the update's month (from the file name, else its title line, else mtime)
+  - its sections (TLDR, KPIs, Supply side, ... — see sections.py) as
+    character spans of the file
+  - term counts per section, for lexical search
+
+The result is kept in a manifest (data/past_updates_index.json), so later
+runs only re-parse files that changed. Prompts then get just the sections
+that matter to each person, across the last few months, instead of the
+whole of last month's update.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+import config
+import sections
+import state
+
+INDEX_FILE = "past_updates_index.json"
+INDEX_VERSION = 1
+
+NO_UPDATE = "(No previous update available)"
+
+# The sections every outreach prompt gets, as one shared (cached) block
+SHARED_SECTIONS = {sections.TLDR, sections.ASKS}
+
+_MONTHS = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+_MONTH_RE = r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*"
+
+_STOPWORDS = set(
+    "a an and are as at be but by for from has have i in is it its of on or our so "
+    "that the their this to was we were what with you your".split()
+)
+
+_index = None  # {"dir": ..., "files": {filename: entry}}
+_lock = threading.Lock()
+
+
+def _index_path() -> str:
+    return os.path.join(state.STATE_DIR, INDEX_FILE)
+
+
+def _terms(text: str) -> Counter:
+    words = re.findall(r"[a-z0-9][a-z0-9&'-]*", text.lower())
+    # Crude plural folding, so "hospitals" matches "hospital"
+    return Counter(
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in words if word not in _STOPWORDS and len(word) > 1
+    )
+
+
+def parse_date(text: str) -> str | None:
+    """Find a YYYY-MM month in a file name or title ("2025-05", "May '25 Update", "january-2026")."""
+    text = text.lower()
+    match = re.search(r"(20\d\d)[-_. ]?(0[1-9]|1[0-2])(?!\d)", text)
+    if match:
+        return f"{match.group(1)}-{match.group(2)}"
+
+    match = re.search(_MONTH_RE + r"[\s_.,-]*(?:'|’)?(20\d\d|\d\d)(?!\d)", text)
+    if match:
+        month = next(i for i, name in enumerate(_MONTHS, 1) if name.startswith(match.group(1)))
+        year = match.group(2) if len(match.group(2)) == 4 else f"20{match.group(2)}"
+        return f"{year}-{month:02d}"
+    return None
+
+
+def _heading(line: str) -> str | None:
+    """
+    The canonical section a line starts, if it's a heading.
+
+    Recognises markdown headings ("## Asks"), bold or underlined lines
+    ("**Other Things Happening**"), bold inline labels ("**Supply side
+    (candidates).** We've been ...") and short "Label:" prefixes ("TLDR: ...").
+    """
+    stripped = line.strip()
+    if not stripped:
+        return None
+
+    if stripped.startswith("#"):
+        return sections.canonical(stripped.lstrip("#"))
+
+    # Notion exports wrap headers in underline tags
+    unwrapped = re.sub(r"</?u>", "", stripped)
+    match = re.match(r"^(?:[-*•]\s+)?(\*\*|__)(.{1,80}?)\1", unwrapped)
+    if match:
+        return sections.canonical(match.group(2))
+
+    match = re.match(r"^([^:.]{1,40})[:.](\s|$)", unwrapped)
+    if match and len(match.group(1).split()) <= 4:
+        return sections.canonical(match.group(1))
+
+    if len(stripped.split()) <= 6 and not stripped.startswith(("-", "*", "•")) and stripped[-1] not in ".!?":
+        return sections.canonical(stripped)
+    return None
+
+
+def is_closing(line: str) -> bool:
+    """Whether a line starts an update's closing ("As always, happy to chat ...") or sign-off."""
+    return line.strip().lower().startswith(("as always, happy to chat", "best,"))
+
+
+def section_spans(text: str) -> list[dict]:
+    """
+    Where each section of an update starts and ends: [{name, start, end}] character offsets.
+
+    The closing and sign-off are a final span named "closing".
+    """
+    spans = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        name = "closing" if is_closing(line) else _heading(line)
+        # A label repeated inside its own section (e.g. "Demand side" twice) isn't a new section
+        if name and not (spans and spans[-1]["name"] == name):
+            if spans:
+                spans[-1]["end"] = offset
+            spans.append({"name": name, "start": offset, "end": len(text)})
+        offset += len(line)
+    return spans
+
+
+def _parse(filename: str, text: str, mtime: float) -> dict:
+    """Index one update file."""
+    lines = text.splitlines(keepends=True)
+    title = next((line.strip().strip("#*_ ") for line in lines if line.strip()), filename)
+    date = parse_date(filename) or parse_date(title) or time.strftime("%Y-%m", time.localtime(mtime))
+
+    found = [span for span in section_spans(text) if span["name"] != "closing"]
+    return {
+        "date": date,
+        "title": title,
+        "sections": [
+            {**span, "terms": dict(_terms(text[span["start"]:span["end"]]))}
+            for span in found
+        ],
+    }
+
+
+def _load_manifest() -> dict:
+    try:
+        with open(_index_path(), "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != INDEX_VERSION or manifest.get("dir") != config.PAST_UPDATES_DIR:
+        return {}
+    return manifest["files"]
+
+
+def _save_manifest(files: dict):
+    os.makedirs(state.STATE_DIR, exist_ok=True)
+    tmp_path = f"{_index_path()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": INDEX_VERSION, "dir": config.PAST_UPDATES_DIR, "files": files}, f)
+    os.replace(tmp_path, _index_path())
+
+
+def refresh() -> dict:
+    """
+    Bring the index up to date with the past updates directory.
+
+    Only files whose mtime or size changed are read and parsed again.
+    Returns {filename: entry}.
+    """
+    global _index
+    updates_dir = config.PAST_UPDATES_DIR
+    with _lock:
+        if _index is not None and _index["dir"] == updates_dir:
+            known = _index["files"]
+        else:
+            known = _load_manifest()
+
+        files = {}
+        changed = False
+        if os.path.isdir(updates_dir):
+            for entry in os.scandir(updates_dir):
+                if not entry.is_file() or entry.name.startswith("."):
+                    continue
+                stat = entry.stat()
+                cached = known.get(entry.name)
+                if cached and cached["mtime"] == stat.st_mtime and cached["size"] == stat.st_size:
+                    files[entry.name] = cached
+                    continue
+                with open(entry.path, "r") as f:
+                    parsed = _parse(entry.name, f.read(), stat.st_mtime)
+                files[entry.name] = {"mtime": stat.st_mtime, "size": stat.st_size, **parsed}
+                changed = True
+
+        if changed or files.keys() != known.keys():
+            _save_manifest(files)
+        _index = {"dir": updates_dir, "files": files}
+        return files
+
+
+def _files() -> dict:
+    """The index, refreshed the first time it's used in this process."""
+    with _lock:
+        if _index is not None and _index["dir"] == config.PAST_UPDATES_DIR:
+            return _index["files"]
+    return refresh()
+
+
+def reset():
+    """Forget the in-memory index (e.g. after pointing at another company's data)."""
+    global _index
+    with _lock:
+        _index = None
+
+
+def _recent(months: int) -> list[tuple[str, dict]]:
+    """The newest `months` updates as (filename, entry), newest first."""
+    files = _files()
+    # The file name breaks ties between two files for the same month
+    return sorted(files.items(), key=lambda item: (item[1]["date"], item[0]), reverse=True)[:months]
+
+
+def _read(filename: str) -> str:
+    with open(os.path.join(config.PAST_UPDATES_DIR, filename), "r") as f:
+        return f.read()
+
+
+def updates() -> list[tuple[str, dict]]:
+    """Every indexed update as (filename, entry), oldest first."""
+    return sorted(_files().items(), key=lambda item: (item[1]["date"], item[0]))
+
+
+def section_text(filename: str, entry: dict, section: str) -> str | None:
+    """The text of one section of an indexed update (None if it doesn't have it)."""
+    spans = [span for span in entry["sections"] if span["name"] == section]
+    if not spans:
+        return None
+    text = _read(filename)
+    return "\n\n".join(text[span["start"]:span["end"]].strip() for span in spans)
+
+
+def latest() -> str:
+    """The full text of the most recent update."""
+    recent = _recent(1)
+    if not recent:
+        return NO_UPDATE
+    return _read(recent[0][0])
+
+
+def search(query: str, months: int | None = None, limit: int = 5) -> list[dict]:
+    """
+    Rank past update sections by term overlap with query.
+
+    Returns up to `limit` of {file, date, section, score}, best first.
+    """
+    terms = _terms(query)
+    recent = _recent(months or len(_files()))
+    hits = []
+    for filename, entry in recent:
+        for span in entry["sections"]:
+            score = sum(min(count, span["terms"].get(term, 0)) for term, count in terms.items())
+            if score:
+                hits.append({"file": filename, "date": entry["date"], "section": span["name"], "score": score})
+    return sorted(hits, key=lambda hit: (hit["score"], hit["date"]), reverse=True)[:limit]
+
+
+def excerpts(wanted: set[str], months: int | None = None) -> str | None:
+    """
+    The `wanted` sections from each of the last `months` updates, oldest first.
+
+    Returns None if no recent update has any of them.
+    """
+    parts = []
+    for filename, entry in reversed(_recent(months or config.PAST_UPDATES_MONTHS)):
+        spans = [span for span in entry["sections"] if span["name"] in wanted]
+        if not spans:
+            continue
+        text = _read(filename)
+        body = "\n\n".join(text[span["start"]:span["end"]].strip() for span in spans)
+        parts.append(f"## {entry['title']} ({entry['date']})\n\n{body}")
+    return "\n\n---\n\n".join(parts) if parts else None
+
+
+def shared_context(months: int | None = None) -> str | None:
+    """The SHARED_SECTIONS (TLDR and Asks) of the last `months` updates, for every outreach prompt."""
+    return excerpts(SHARED_SECTIONS, months)
+
+
+def context_for(person: dict, months: int | None = None, shared: bool = False) -> str:
+    """
+    Past-update context for one team member's prompt.
+
+    Their own sections (plus the TLDR, for the big picture) from each of the
+    last `months` updates, oldest first. If their sections can't be mapped,
+    the sections that best match their sections and questions are used
+    instead; if nothing matches, the latest update in full.
+
+    With shared=True the SHARED_SECTIONS are left out, since the prompt
+    already has them from shared_context().
+    """
+    months = months or config.PAST_UPDATES_MONTHS
+    if not _recent(months):
+        return NO_UPDATE
+
+    wanted = set(sections.for_person(person))
+    if not wanted:
+        query = " ".join(person["sections"] + person.get("asks", []))
+        wanted = {hit["section"] for hit in search(query, months)}
+    if not wanted:
+        return latest()
+
+    if shared:
+        wanted -= SHARED_SECTIONS
+        if not wanted:
+            return "(Nothing beyond the TLDR and asks above)"
+        return excerpts(wanted, months) or "(Their sections weren't in recent updates)"
+    return excerpts(wanted | {sections.TLDR}, months) or latest()
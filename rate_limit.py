@@ -0,0 +1,163 @@
+"""
+Slack rate limiting — client-side token buckets sized per Web API tier.
+
+Every Web API call goes through WebClient.api_call, so RateLimitedWebClient
+takes a token from the bucket for that method before sending. Calls that
+would exceed the method's tier wait their turn instead of getting a 429.
+If Slack still answers `ratelimited`, the method's bucket is paused for
+Retry-After seconds and the call is requeued, up to
+SLACK_MAX_RATELIMIT_RETRIES times.
+
+Tiers (https://api.slack.com/apis/rate-limits), in requests per minute:
+    Tier 1: 1+   Tier 2: 20+   Tier 3: 50+   Tier 4: 100+
+chat.postMessage is "special": about 1 per second per channel.
+"""
+
+import threading
+import time
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+import tracing
+from config import SLACK_MAX_RATELIMIT_RETRIES
+
+TIER_PER_MINUTE = {1: 1, 2: 20, 3: 50, 4: 100}
+
+METHOD_TIERS = {
+    "conversations.open": 3,
+    "conversations.history": 3,
+    "conversations.replies": 3,
+    "users.info": 4,
+    "users.list": 2,
+    "users.lookupByEmail": 3,
+    "files.getUploadURLExternal": 4,
+    "files.completeUploadExternal": 4,
+    "files.info": 4,
+}
+DEFAULT_TIER = 3
+
+# Per-channel limit for chat.postMessage
+POST_MESSAGE_PER_MINUTE = 60
+
+# Let a fresh bucket absorb this many seconds' worth of calls at once
+BURST_SECONDS = 10
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+_stats = {"queued": 0, "throttled": 0, "retried": 0, "wait_seconds": 0.0}
+_stats_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `per_minute` tokens per minute, up to `burst` saved up."""
+
+    def __init__(self, per_minute: float, burst: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Hold every caller of this bucket for `seconds` (Slack's Retry-After)."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+def _bucket(api_method: str, channel: str | None) -> TokenBucket:
+    if api_method == "chat.postMessage":
+        key, per_minute = f"{api_method}:{channel}", POST_MESSAGE_PER_MINUTE
+    else:
+        key, per_minute = api_method, TIER_PER_MINUTE[METHOD_TIERS.get(api_method, DEFAULT_TIER)]
+
+    with _buckets_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(per_minute, per_minute / 60.0 * BURST_SECONDS)
+        return _buckets[key]
+
+
+def _count(name: str, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _retry_after(error: SlackApiError) -> float | None:
+    """Seconds to back off if this error is a rate limit, else None."""
+    response = error.response
+    if response.status_code != 429 and response.get("error") != "ratelimited":
+        return None
+    headers = {k.lower(): v for k, v in (response.headers or {}).items()}
+    value = headers.get("retry-after")
+    if isinstance(value, list):
+        value = value[0]
+    return float(value) if value else 1.0
+
+
+class RateLimitedWebClient(WebClient):
+    """WebClient that paces calls per method tier and requeues throttled ones."""
+
+    def api_call(self, api_method: str, **kwargs):
+        body = kwargs.get("json") or kwargs.get("data") or kwargs.get("params") or {}
+        channel = body.get("channel") if isinstance(body, dict) else None
+        bucket = _bucket(api_method, channel)
+        method = f"slack {api_method}"
+
+        with tracing.span(method, kind="slack", method=api_method) as span:
+            for attempt in range(SLACK_MAX_RATELIMIT_RETRIES + 1):
+                waited = bucket.acquire()
+                if waited:
+                    _count("queued")
+                    _count("wait_seconds", waited)
+                    span["wait_seconds"] = round(span.get("wait_seconds", 0) + waited, 3)
+                try:
+                    with tracing.timed(method):
+                        return super().api_call(api_method, **kwargs)
+                except SlackApiError as e:
+                    retry_after = _retry_after(e)
+                    if retry_after is None:
+                        raise
+                    # Every 429 counts, including the one that exhausts the retries
+                    _count("throttled")
+                    if attempt == SLACK_MAX_RATELIMIT_RETRIES:
+                        raise
+                    bucket.pause(retry_after)
+                    _count("retried")
+                    tracing.record_retry(method)
+
+
+def reset():
+    """Drop every bucket and counter (e.g. when switching to another workspace's token)."""
+    with _buckets_lock:
+        _buckets.clear()
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0.0 if name == "wait_seconds" else 0
+
+
+def stats() -> dict:
+    """
+    Counters for this process and seconds spent waiting.
+
+    queued counts calls that waited for a token, throttled every 429 Slack
+    sent back, and retried the calls requeued after one.
+    """
+    with _stats_lock:
+        return dict(_stats, wait_seconds=round(_stats["wait_seconds"], 2))
@@ -0,0 +1,220 @@
+"""
+Resilience for Claude calls — retries, deadlines, hedging and a circuit breaker.
+
+  - Retryable failures (connection errors, timeouts, 429, 5xx, 529 overloaded)
+    are retried with full-jitter exponential backoff, honouring Retry-After,
+    until CLAUDE_RETRIES attempts or the per-call CLAUDE_CALL_DEADLINE runs out.
+  - With CLAUDE_HEDGE on, a request still running after that model's p95
+    latency gets a duplicate; whichever finishes first wins. Costs extra
+    tokens on slow calls, so it's off by default.
+  - Each model has a circuit breaker. After CLAUDE_BREAKER_THRESHOLD
+    retryable failures in a row it opens for CLAUDE_BREAKER_COOLDOWN
+    seconds: calls go to CLAUDE_FALLBACK_MODEL if one is set, or fail fast
+    with CircuitOpenError. After the cooldown, one trial call is let through.
+
+The SDK's own retries are disabled (CLAUDE_MAX_RETRIES = 0) so this layer
+owns the retry policy.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import tracing
+from config import (
+    CLAUDE_TIMEOUT,
+    CLAUDE_RETRIES,
+    CLAUDE_CALL_DEADLINE,
+    CLAUDE_HEDGE,
+    CLAUDE_BREAKER_THRESHOLD,
+    CLAUDE_BREAKER_COOLDOWN,
+    CLAUDE_FALLBACK_MODEL,
+)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+BACKOFF_BASE = 1.0   # seconds
+BACKOFF_CAP = 30.0   # seconds
+
+# Hedging needs a latency baseline before it kicks in
+HEDGE_MIN_SAMPLES = 20
+
+_stats = {"retries": 0, "hedges": 0, "fallbacks": 0, "circuit_opens": 0}
+_lock = threading.Lock()
+_breakers = {}
+_latencies = {}
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="claude-hedge")
+
+
+class CircuitOpenError(Exception):
+    """The model's circuit breaker is open and there's no fallback to use."""
+
+
+class _Breaker:
+    def __init__(self, model: str):
+        self.model = model
+        self.failures = 0
+        self.opened_at = None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at >= CLAUDE_BREAKER_COOLDOWN:
+            # Half-open: let this caller try, and hold everyone else for
+            # another cooldown unless it succeeds
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+
+def _breaker(model: str) -> _Breaker:
+    if model not in _breakers:
+        _breakers[model] = _Breaker(model)
+    return _breakers[model]
+
+
+def _count(name: str):
+    with _lock:
+        _stats[name] += 1
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed Claude call is worth retrying."""
+    # Imported here, not at the top: the SDK takes most of a second to import,
+    # and steps that never call Claude shouldn't pay for it (see clients.py)
+    import anthropic
+
+    if isinstance(error, anthropic.APIConnectionError):  # includes APITimeoutError
+        return True
+    return isinstance(error, anthropic.APIStatusError) and error.status_code in RETRYABLE_STATUS
+
+
+def backoff_delay(attempt: int, error: Exception | None = None) -> float:
+    """Full-jitter exponential backoff, or the server's Retry-After if it sent one."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def pick_model(primary: str) -> str:
+    """The model to call right now, given the breakers' state."""
+    with _lock:
+        if _breaker(primary).allow():
+            return primary
+        if CLAUDE_FALLBACK_MODEL and _breaker(CLAUDE_FALLBACK_MODEL).allow():
+            _stats["fallbacks"] += 1
+            return CLAUDE_FALLBACK_MODEL
+    raise CircuitOpenError(f"circuit open for {primary} and no fallback model available")
+
+
+def record_success(model: str, seconds: float | None = None):
+    """Close the model's breaker and (optionally) record a latency sample."""
+    with _lock:
+        breaker = _breaker(model)
+        breaker.failures = 0
+        breaker.opened_at = None
+        if seconds is not None:
+            _latencies.setdefault(model, deque(maxlen=200)).append(seconds)
+
+
+def record_failure(model: str, error: Exception):
+    """Count a failure against the model's breaker (non-retryable errors don't count)."""
+    if not is_retryable(error):
+        return
+    with _lock:
+        breaker = _breaker(model)
+        breaker.failures += 1
+        if breaker.failures >= CLAUDE_BREAKER_THRESHOLD and breaker.opened_at is None:
+            breaker.opened_at = time.monotonic()
+            _stats["circuit_opens"] += 1
+            print(f"  [claude] circuit open for {model} after {breaker.failures} failures")
+
+
+def _p95(model: str) -> float | None:
+    with _lock:
+        samples = sorted(_latencies.get(model, ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    return samples[int(0.95 * (len(samples) - 1))]
+
+
+def _timed_create(client, params: dict, timeout: float):
+    started = time.monotonic()
+    with tracing.timed("claude messages.create"):
+        message = client.messages.create(**params, timeout=timeout)
+    record_success(params["model"], time.monotonic() - started)
+    return message
+
+
+def _create_hedged(client, params: dict, timeout: float):
+    """One messages.create, plus a duplicate if it runs past the model's p95."""
+    threshold = _p95(params["model"]) if CLAUDE_HEDGE else None
+    if threshold is None or threshold >= timeout:
+        return _timed_create(client, params, timeout)
+
+    pending = {_hedge_pool.submit(_timed_create, client, params, timeout)}
+    done, pending = wait(pending, timeout=threshold)
+    if not done:
+        _count("hedges")
+        pending.add(_hedge_pool.submit(_timed_create, client, params, timeout - threshold))
+
+    error = None
+    while done or pending:
+        for future in done:
+            try:
+                # The loser keeps running in the background; its result is dropped
+                return future.result()
+            except Exception as e:
+                error = e
+        done, pending = wait(pending, return_when=FIRST_COMPLETED) if pending else (set(), set())
+    raise error
+
+
+def create(client, label: str, **params):
+    """
+    messages.create with retries, a deadline, hedging and the circuit breaker.
+
+    Returns (message, model) — model is CLAUDE_FALLBACK_MODEL if the primary's
+    circuit was open.
+    """
+    deadline = time.monotonic() + CLAUDE_CALL_DEADLINE
+    attempt = 0
+    while True:
+        model = pick_model(params["model"])
+        request = dict(params, model=model)
+        timeout = min(CLAUDE_TIMEOUT, deadline - time.monotonic())
+        try:
+            return _create_hedged(client, request, timeout), model
+        except Exception as e:
+            record_failure(model, e)
+            if not is_retryable(e) or attempt >= CLAUDE_RETRIES:
+                raise
+            delay = backoff_delay(attempt, e)
+            if time.monotonic() + delay >= deadline:
+                raise
+            _count("retries")
+            tracing.record_retry("claude messages.create")
+            print(f"  [claude] {label}: {type(e).__name__}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+
+def reset():
+    """Forget breakers, latency samples and counters (e.g. when switching companies)."""
+    with _lock:
+        _breakers.clear()
+        _latencies.clear()
+        for name in _stats:
+            _stats[name] = 0
+
+
+def stats() -> dict:
+    """Retry/hedge/fallback/circuit-open counters for this process."""
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,261 @@
+"""
+Revisions — applies the reviewer's feedback on the delivered draft, one section at a time.
+
+Once the draft is delivered, Matan (config.DRAFT_RECIPIENT) replies to it,
+in its thread or in the DM, with the changes he wants ("TLDR: mention the
+Texas expansion", "Facilities should be 161"). `--step revise` (run
+hourly by --serve after delivery) reads the replies since the last round
+and then:
+
+  1. maps each change to the section(s) it touches. A line that starts
+     with a section name ("KPIs: ...") is mapped directly. The rest take one
+     short call to the extraction model, which also drops chatter.
+  2. rewrites only those sections, concurrently, with the rest of the
+     draft as fixed context, and splices them back in
+  3. posts a diff of what changed in the draft's thread (in the DM if it
+     was delivered as a file whose share Slack never listed)
+
+Every round is kept in state["revisions"] with the full draft it produced,
+starting from the delivered draft as version 0. state["draft"] is always
+the latest version.
+"""
+
+import difflib
+import os
+import re
+from datetime import datetime
+
+import claude_client
+import config
+import fanout
+import past_updates
+import sections
+import slack_client
+import state
+
+DIFF_FENCE = "```"
+
+
+def _feedback_lines(messages: list[dict]) -> list[str]:
+    """The non-empty lines of the reviewer's messages, with bullets and numbering stripped."""
+    lines = []
+    for message in messages:
+        for line in message.get("text", "").splitlines():
+            line = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s+", "", line).strip()
+            if line:
+                lines.append(line)
+    return lines
+
+
+def _named(line: str, available: list[str]) -> str | None:
+    """The section a line starts by naming ("TLDR: ...", "*KPIs* - ..."), if the draft has it."""
+    match = re.match(r"^[*_]*([^:*_]{1,40}?)[*_]*\s*[:–—-]\s+\S", line)
+    if not match:
+        return None
+    name = sections.canonical(match.group(1))
+    return name if name in available else None
+
+
+def _draft_heading(line: str) -> str | None:
+    """
+    The section a line of the draft starts, or None for body text.
+
+    Only the headings the draft is written with count (sections.HEADINGS as
+    "**Asks**", "## Asks" or "Asks:", and the marketplace's bold "Label."
+    bullets), so a body line like "Our team grew" never splits a section.
+    The TLDR may also start inline ("TLDR: ...").
+    """
+    stripped = line.strip()
+    for section, label in sections.MARKETPLACE_LABELS.items():
+        if re.match(rf"^(?:[-*•]\s*)?\*\*{re.escape(label)}\.?\*\*", stripped, re.IGNORECASE):
+            return section
+    if re.match(r"^(?:#{1,6}\s*)?(?:\*\*tl;?dr:?\*\*|tl;?dr:)", stripped, re.IGNORECASE):
+        return sections.TLDR
+    for section, heading in sections.HEADINGS.items():
+        if re.match(rf"^(?:#{{1,6}}\s*)?(?:\*\*)?{re.escape(heading)}:?(?:\*\*)?:?$", stripped, re.IGNORECASE):
+            return section
+    return None
+
+
+def draft_spans(draft: str) -> list[dict]:
+    """
+    Where each section of the draft starts and ends: [{name, start, end}] character offsets.
+
+    The title, greeting and welcome line before the first heading are a span
+    named None, and the closing and sign-off one named "closing". A heading
+    seen again later doesn't start a second span for its section.
+    """
+    spans = [{"name": None, "start": 0, "end": len(draft)}]
+    seen = set()
+    offset = 0
+    for line in draft.splitlines(keepends=True):
+        name = "closing" if past_updates.is_closing(line) else _draft_heading(line)
+        if name and name not in seen:
+            seen.add(name)
+            spans[-1]["end"] = offset
+            spans.append({"name": name, "start": offset, "end": len(draft)})
+        offset += len(line)
+    return [span for span in spans if span["end"] > span["start"]]
+
+
+def _sections(draft: str) -> dict:
+    """{section: span} for the draft's sections that can be revised, in draft order."""
+    found = {}
+    for span in draft_spans(draft):
+        part = draft[span["start"]:span["end"]].strip()
+        # The marketplace heading alone (its Supply/Demand/Ops bullets are their own spans) has nothing to rewrite
+        if span["name"] == sections.MARKETPLACE and "\n" not in part:
+            continue
+        if span["name"] in sections.ORDER:
+            found[span["name"]] = span
+    return found
+
+
+def map_changes(lines: list[str], draft: str, available: list[str]) -> dict:
+    """{section: [instructions]} for the feedback lines, in the draft's section order."""
+    changes = {}
+    unmapped = []
+    for line in lines:
+        name = _named(line, available)
+        if name:
+            changes.setdefault(name, []).append(line)
+        else:
+            unmapped.append(line)
+
+    if unmapped:
+        try:
+            mapped = claude_client.map_feedback(unmapped, draft, available)
+        except ValueError as e:
+            print(f"  ✗ Couldn't map the feedback to sections: {e}")
+            mapped = []
+        for change in mapped:
+            changes.setdefault(change["section"], []).append(change["instruction"])
+    return {name: changes[name] for name in available if name in changes}
+
+
+def apply(draft: str, changes: dict, voice_profile: str) -> str | None:
+    """The draft with every section in changes rewritten, or None if a rewrite failed."""
+    spans = _sections(draft)
+
+    def rewrite(section):
+        span = spans[section]
+        part = draft[span["start"]:span["end"]].strip()
+        return claude_client.revise_section(section, part, changes[section], draft, voice_profile)
+
+    rewritten = {}
+    for section, result in fanout.run(rewrite, list(changes)):
+        if isinstance(result, dict):
+            print(f"  ✗ Revising {section} failed: {result['error']}")
+            return None
+        rewritten[section] = result
+        print(f"  ✓ {section} revised")
+
+    # Back to front, so earlier offsets stay valid
+    revised = draft
+    for section in sorted(rewritten, key=lambda name: spans[name]["start"], reverse=True):
+        span = spans[section]
+        old = revised[span["start"]:span["end"]]
+        trailing = old[len(old.rstrip()):]
+        revised = revised[:span["start"]] + rewritten[section] + trailing + revised[span["end"]:]
+    return revised
+
+
+def diff(old: str, new: str, limit: int | None = None) -> str:
+    """The changed lines (paragraphs) between two drafts, "-" old and "+" new, cut off at limit chars."""
+    lines = [
+        line for line in difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm="", n=0)
+        if not line.startswith(("---", "+++", "@@"))
+    ]
+    text = "\n".join(lines)
+    limit = limit or config.DELIVERY_CHUNK_CHARS
+    if len(text) > limit:
+        text = text[:limit].rsplit("\n", 1)[0] + "\n… (diff cut short)"
+    return text
+
+
+def revise(current_state: dict, voice_profile: str) -> dict | None:
+    """
+    Run one review round: read new feedback, revise the sections it's about and post the diff.
+
+    Returns the stored revision, or None if there was nothing to revise (or
+    a rewrite failed, in which case the same feedback is retried next run).
+    """
+    delivered = current_state.get("draft_message") or {}
+    if not current_state.get("draft") or not (delivered.get("ts") or delivered.get("sent_at")):
+        print("  ✗ No delivered draft to revise (run --step deliver first).")
+        return None
+
+    if not delivered.get("ts") and delivered.get("file"):
+        # File mode: Slack may only have listed the file's share after delivery
+        ts = slack_client.file_share_ts(delivered["file"], delivered["channel"])
+        if ts:
+            delivered = {**delivered, "ts": ts}
+            state.update(current_state, draft_message=delivered)
+
+    ts = delivered.get("ts")
+    cursor = current_state.get("revision_cursor") or {
+        "last_seen_ts": ts or delivered["sent_at"],
+        "threads": [ts] if ts else [],
+    }
+    if ts and ts not in cursor["threads"]:
+        cursor = {**cursor, "threads": cursor["threads"] + [ts]}
+    result = slack_client.sync_dm_responses(
+        config.DRAFT_RECIPIENT,
+        cursor["last_seen_ts"],
+        channel_id=delivered["channel"],
+        threads=cursor["threads"],
+    )
+    next_cursor = {"last_seen_ts": result["latest_ts"], "threads": result["threads"]}
+
+    lines = _feedback_lines(result["messages"])
+    if not lines:
+        print("  No new feedback on the draft.")
+        state.update(current_state, revision_cursor=next_cursor)
+        return None
+
+    draft = current_state["draft"]
+    available = list(_sections(draft))
+    print(f"  {len(lines)} line(s) of feedback from {config.DRAFT_RECIPIENT_NAME}")
+    changes = map_changes(lines, draft, available)
+    if not changes:
+        print("  No changes asked for.")
+        state.update(current_state, revision_cursor=next_cursor)
+        return None
+
+    print(f"  Revising {', '.join(changes)}...\n")
+    revised = apply(draft, changes, voice_profile)
+    if revised is None:
+        return None
+
+    revisions = current_state.get("revisions") or []
+    if not revisions:
+        # Version 0 is the draft as delivered
+        state.record_revision(
+            current_state,
+            {"version": 0, "created": None, "feedback": [], "changes": {}, "draft": draft, "ts": ts},
+        )
+    version = len(current_state["revisions"])
+
+    changed = diff(draft, revised, config.DELIVERY_CHUNK_CHARS - 200)
+    message = f"✏️ *Revision {version}* — updated {', '.join(changes)}\n{DIFF_FENCE}\n{changed or '(no visible change)'}\n{DIFF_FENCE}"
+    if ts:
+        posted = slack_client.post_in_thread(delivered["channel"], ts, message)
+    else:
+        # No share message to thread under; post in the DM itself
+        posted = slack_client.send_dm(config.DRAFT_RECIPIENT, message)
+
+    entry = {
+        "version": version,
+        "created": datetime.now().isoformat(),
+        "feedback": lines,
+        "changes": changes,
+        "draft": revised,
+        "ts": posted.get("ts"),
+    }
+    with state.transaction():
+        state.record_revision(current_state, entry)
+        state.update(current_state, revision_cursor=next_cursor)
+
+    with open(os.path.join(state.STATE_DIR, "latest_draft.md"), "w") as f:
+        f.write(revised)
+    return entry
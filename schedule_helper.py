@@ -1,38 +1,49 @@
 """
-Schedule helper — determines which step to run based on days before end of month.
-
-Schedule:
-  5 days before end of month → outreach
-  4 days before              → check
-  3 days before              → nudge
-  2 days before              → escalate
-  1 day before               → draft
-  Last day of month          → deliver
+Schedule helper — determines which step to run on a given day, from config.SCHEDULE.
+
+config.SCHEDULE is the single source of truth: the GitHub Actions workflow
+(`python schedule_helper.py`) and `python agent.py --serve` both ask this
+module which step is due.
+
+Schedule (config.SCHEDULE, days of the month):
+  25th → outreach
+  27th → nudge
+  28th → escalate
+  29th → draft
+  30th → deliver
+
+In a month too short for the last scheduled day (February), the whole
+schedule moves earlier by the difference, so steps keep their spacing and
+deliver lands on the last day. Days between outreach and deliver without a
+step of their own are "check" days; the rest of the month is "skip".
 """
 
 import calendar
-from datetime import datetime
+from datetime import datetime, timezone
 
+import config
 
-def get_step_for_today():
-    today = datetime.utcnow()
-    year = today.year
-    month = today.month
-    day = today.day
 
+def days_for(year: int, month: int) -> dict:
+    """{step: day of month} for the given month."""
     last_day = calendar.monthrange(year, month)[1]
-    days_before_end = last_day - day
-
-    step_map = {
-        5: "outreach",
-        4: "check",
-        3: "nudge",
-        2: "escalate",
-        1: "draft",
-        0: "deliver",
-    }
-
-    return step_map.get(days_before_end, "skip")
+    shift = max(0, max(config.SCHEDULE.values()) - last_day)
+    return {step: day - shift for step, day in config.SCHEDULE.items()}
+
+
+def get_step_for_date(date) -> str:
+    """The step to run on date: a scheduled step, "check" or "skip"."""
+    days = days_for(date.year, date.month)
+    for step, day in days.items():
+        if day == date.day:
+            return step
+    if min(days.values()) < date.day < max(days.values()):
+        return "check"
+    return "skip"
+
+
+def get_step_for_today():
+    return get_step_for_date(datetime.now(timezone.utc))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+"""
+Update sections — the canonical sections of an investor update.
+
+Team members' `sections` in config.py are free text ("Demand side (new deals,
+pipeline)", "Hires", ...), and past updates label their sections in a few
+different ways ("Product & Design", "**Supply side (candidates).**"). Both
+are mapped onto the names below so they can be matched against each other.
+"""
+
+import re
+from functools import lru_cache
+
+TLDR = "TLDR"
+KPIS = "KPIs"
+MARKETPLACE = "Marketplace"
+SUPPLY = "Supply side"
+DEMAND = "Demand side"
+OPS = "Ops efficiency"
+PRODUCT = "R&D, Product, Design"
+OTHER = "Other Things Happening"
+ASKS = "Asks"
+
+# In the order they appear in an update (see voice_profile.md)
+ORDER = [TLDR, KPIS, MARKETPLACE, SUPPLY, DEMAND, OPS, PRODUCT, OTHER, ASKS]
+
+# Written one at a time in sections draft mode (see drafting.py); the TLDR,
+# title and sign-off are written around them afterwards
+DRAFTED = [KPIS, SUPPLY, DEMAND, OPS, PRODUCT, OTHER, ASKS]
+
+# How each section is headed in a draft. Supply/Demand/Ops sit under the
+# Marketplace header as bold "Label." bullets.
+HEADINGS = {
+    TLDR: "TLDR",
+    KPIS: "Monthly KPIs",
+    MARKETPLACE: "Marketplace (Placements & Facilities)",
+    PRODUCT: "R&D, Product, Design",
+    OTHER: "Other Things Happening",
+    ASKS: "Asks",
+}
+MARKETPLACE_LABELS = {
+    SUPPLY: "Supply side (candidates)",
+    DEMAND: "Demand side (facilities)",
+    OPS: "Operational efficiency",
+}
+
+# First match wins, so the more specific patterns come first
+_PATTERNS = [
+    (TLDR, r"\btl;?dr\b"),
+    (KPIS, r"\bkpis?\b|\bmetrics\b"),
+    (SUPPLY, r"\bsupply\b"),
+    (DEMAND, r"\bdemand\b"),
+    (OPS, r"\bops\b|\boperational\b|\boperations\b"),
+    (PRODUCT, r"\br&d\b|\bproduct\b|\bdesign\b|\bengineering\b"),
+    (ASKS, r"\basks?\b"),
+    (OTHER, r"\bother things\b|\bhires?\b|\bhiring\b|\bteam\b|\bstrategic\b|\bpartnerships?\b|\bconferences?\b"),
+    (MARKETPLACE, r"\bmarketplace\b"),
+]
+
+
+@lru_cache(maxsize=1024)
+def canonical(label: str) -> str | None:
+    """Map a section label or heading to its canonical name (None if it isn't one)."""
+    label = label.lower()
+    for name, pattern in _PATTERNS:
+        if re.search(pattern, label):
+            return name
+    return None
+
+
+def for_person(person: dict) -> list[str]:
+    """The canonical sections a team member contributes to, in update order."""
+    names = {canonical(label) for label in person["sections"]} - {None}
+    return [name for name in ORDER if name in names]
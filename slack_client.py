@@ -2,26 +2,65 @@
 Slack client — handles sending DMs and reading responses.
 """
 
-import os
-from slack_sdk import WebClient
+import time
+
 from slack_sdk.errors import SlackApiError
 
+import clients
+import state
+from config import FILE_SHARE_POLLS, FILE_SHARE_POLL_SECONDS
+
 
 def get_client():
-    """Initialize Slack client."""
-    return WebClient(token=os.environ["SLACK_BOT_TOKEN"])
+    """Get the shared Slack client."""
+    return clients.slack()
+
+
+def open_dm(client, slack_id: str) -> str:
+    """
+    Get the DM channel ID for a user.
+
+    Uses the persistent slack_id -> channel cache and only calls
+    conversations.open on a cache miss.
+    """
+    channel_id = state.get_dm_channel(slack_id)
+    if channel_id:
+        return channel_id
+
+    response = client.conversations_open(users=[slack_id])
+    channel_id = response["channel"]["id"]
+    state.save_dm_channel(slack_id, channel_id)
+    return channel_id
+
+
+def _in_dm(client, slack_id: str, call, channel_id: str | None = None):
+    """
+    Run call(channel_id) against the user's DM channel.
+
+    If Slack reports channel_not_found for a cached/known channel, the cache
+    entry is dropped, the DM is reopened and the call is retried once.
+    Returns (channel_id, result).
+    """
+    channel_id = channel_id or open_dm(client, slack_id)
+    try:
+        return channel_id, call(channel_id)
+    except SlackApiError as e:
+        if e.response["error"] != "channel_not_found":
+            raise
+        state.forget_dm_channel(slack_id)
+        channel_id = open_dm(client, slack_id)
+        return channel_id, call(channel_id)
 
 
 def send_dm(slack_id: str, message: str) -> dict:
     """Send a direct message to a user by their Slack user ID."""
     client = get_client()
     try:
-        # Open a DM channel with the user
-        response = client.conversations_open(users=[slack_id])
-        channel_id = response["channel"]["id"]
-
-        # Send the message
-        result = client.chat_postMessage(channel=channel_id, text=message)
+        channel_id, result = _in_dm(
+            client,
+            slack_id,
+            lambda channel: client.chat_postMessage(channel=channel, text=message),
+        )
         print(f"✓ Message sent to {slack_id} in channel {channel_id}")
         return {"ok": True, "channel": channel_id, "ts": result["ts"]}
 
@@ -30,43 +69,213 @@ def send_dm(slack_id: str, message: str) -> dict:
         return {"ok": False, "error": e.response["error"]}
 
 
-def get_dm_responses(slack_id: str, since_ts: str) -> list[dict]:
+def send_thread(slack_id: str, message: str, replies: list[str]) -> dict:
     """
-    Read messages from a DM conversation with a user since a given timestamp.
-    Returns messages FROM the user (not from the bot).
+    DM a user one message, then post replies in its thread (in order).
+
+    Returns {"ok", "channel", "ts"} for the parent message. If a reply
+    fails, "error" says which; the parts before it stay posted.
+    """
+    result = send_dm(slack_id, message)
+    if not result["ok"]:
+        return result
+
+    client = get_client()
+    for i, reply in enumerate(replies, 1):
+        try:
+            client.chat_postMessage(channel=result["channel"], thread_ts=result["ts"], text=reply)
+        except SlackApiError as e:
+            print(f"✗ Failed to post part {i + 1} in the thread: {e.response['error']}")
+            return {**result, "ok": False, "error": f"part {i + 1}: {e.response['error']}"}
+    if replies:
+        print(f"✓ {len(replies)} more part(s) posted in the thread")
+    return result
+
+
+def post_in_thread(channel_id: str, thread_ts: str, message: str) -> dict:
+    """Reply in an existing thread. Returns {"ok", "ts"} or {"ok": False, "error"}."""
+    client = get_client()
+    try:
+        result = client.chat_postMessage(channel=channel_id, thread_ts=thread_ts, text=message)
+        return {"ok": True, "ts": result["ts"]}
+    except SlackApiError as e:
+        print(f"✗ Failed to post in thread {thread_ts}: {e.response['error']}")
+        return {"ok": False, "error": e.response["error"]}
+
+
+def _share_ts(file: dict, channel_id: str) -> str | None:
+    """The ts of a file's share message in channel_id, if the file object lists it."""
+    shares = file.get("shares") or {}
+    for visibility in ("private", "public"):
+        for share in (shares.get(visibility) or {}).get(channel_id) or []:
+            if share.get("ts"):
+                return share["ts"]
+    return None
+
+
+def file_share_ts(file_id: str, channel_id: str, attempts: int = 1) -> str | None:
+    """
+    The ts of a file's share message in channel_id, from files.info.
+
+    Slack fills in a file's shares once it has processed the upload, so
+    this asks up to `attempts` times, FILE_SHARE_POLL_SECONDS apart. None if
+    the share still isn't listed.
+    """
+    client = get_client()
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(FILE_SHARE_POLL_SECONDS)
+        try:
+            ts = _share_ts(client.files_info(file=file_id)["file"], channel_id)
+        except SlackApiError as e:
+            print(f"✗ Failed to look up file {file_id}: {e.response['error']}")
+            return None
+        if ts:
+            return ts
+    return None
+
+
+def upload_file(slack_id: str, content: str, filename: str, title: str, comment: str) -> dict:
+    """
+    Share a text file in a user's DM (files_upload_v2), with a comment.
+
+    Returns {"ok", "channel", "ts", "file"}, where ts is the share's message
+    ts. The upload call itself rarely has it, so files.info is polled for
+    it; ts is None if Slack still hadn't processed the file.
     """
     client = get_client()
     try:
-        # Open the DM channel
-        response = client.conversations_open(users=[slack_id])
-        channel_id = response["channel"]["id"]
-
-        # Fetch message history since the outreach was sent
-        result = client.conversations_history(
-            channel=channel_id,
-            oldest=since_ts,
-            limit=50,
+        channel_id, result = _in_dm(
+            client,
+            slack_id,
+            lambda channel: client.files_upload_v2(
+                channel=channel,
+                content=content,
+                filename=filename,
+                title=title,
+                initial_comment=comment,
+            ),
         )
+    except SlackApiError as e:
+        print(f"✗ Failed to upload {filename} to {slack_id}: {e.response['error']}")
+        return {"ok": False, "error": e.response["error"]}
+
+    file = result["file"]
+    # The share's ts only shows up once Slack has processed the file
+    ts = _share_ts(file, channel_id) or file_share_ts(file["id"], channel_id, attempts=FILE_SHARE_POLLS)
+    print(f"✓ Uploaded {filename} to {slack_id} in channel {channel_id}")
+    return {"ok": True, "channel": channel_id, "ts": ts, "file": file["id"]}
+
 
-        # Filter to only messages from the user (not the bot)
-        user_messages = [
-            msg for msg in result.get("messages", [])
-            if msg.get("user") == slack_id and msg.get("type") == "message"
-        ]
+def _paginate(method, key: str, **kwargs) -> list[dict]:
+    """Call a cursor-paginated Web API method until next_cursor runs out."""
+    items = []
+    cursor = None
+    while True:
+        result = method(**kwargs, cursor=cursor) if cursor else method(**kwargs)
+        items.extend(result.get(key, []))
+        cursor = (result.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            return items
+
+
+def sync_dm_responses(
+    slack_id: str,
+    since_ts: str,
+    channel_id: str | None = None,
+    threads: list[str] = (),
+) -> dict:
+    """
+    Fetch everything a user has said in their DM since since_ts.
+
+    Follows pagination on conversations.history and pulls threaded replies
+    with conversations.replies — both for the threads passed in (e.g. the
+    outreach message) and for any new thread found in the history.
+
+    Returns:
+        {
+            "messages": messages FROM the user, oldest first,
+            "threads": ts of every thread parent with replies,
+            "latest_ts": newest ts seen (use as since_ts next time),
+            "channel": the DM channel read (a new one if channel_id was gone),
+        }
+    """
+    client = get_client()
+    try:
+        channel_id, history = _in_dm(
+            client,
+            slack_id,
+            lambda channel: _paginate(
+                client.conversations_history,
+                "messages",
+                channel=channel,
+                oldest=since_ts,
+                limit=200,
+            ),
+            channel_id=channel_id,
+        )
 
-        return user_messages
+        thread_ts = set(threads) | {msg["ts"] for msg in history if msg.get("reply_count")}
+        replies = []
+        for parent_ts in sorted(thread_ts):
+            replies.extend(
+                msg for msg in _paginate(
+                    client.conversations_replies,
+                    "messages",
+                    channel=channel_id,
+                    ts=parent_ts,
+                    oldest=since_ts,
+                    limit=200,
+                )
+                # The parent comes back with every page set; it's in history if new
+                if msg["ts"] != parent_ts and float(msg["ts"]) > float(since_ts)
+            )
 
     except SlackApiError as e:
         print(f"✗ Failed to read messages from {slack_id}: {e.response['error']}")
-        return []
+        return {"messages": [], "threads": list(threads), "latest_ts": since_ts, "channel": channel_id}
 
+    seen = history + replies
+    # Filter to only messages from the user (not the bot)
+    user_messages = sorted(
+        (msg for msg in seen if msg.get("user") == slack_id and msg.get("type") == "message"),
+        key=lambda msg: float(msg["ts"]),
+    )
+    latest_ts = max((msg["ts"] for msg in seen), key=float, default=since_ts)
+    return {"messages": user_messages, "threads": sorted(thread_ts), "latest_ts": latest_ts, "channel": channel_id}
 
-def get_user_name(slack_id: str) -> str:
-    """Get a user's display name from their Slack ID."""
+
+def get_dm_responses(slack_id: str, since_ts: str, channel_id: str | None = None) -> list[dict]:
+    """
+    Read messages from a DM conversation with a user since a given timestamp.
+    Returns messages FROM the user (not from the bot), oldest first.
+
+    Pass the channel recorded at outreach time as channel_id to skip the
+    DM lookup entirely.
+    """
+    return sync_dm_responses(slack_id, since_ts, channel_id, threads=[since_ts])["messages"]
+
+
+def list_users() -> dict:
+    """
+    Every member of the workspace, from one paginated users.list.
+
+    Returns {"ok": True, "users": [...]} or {"ok": False, "error"}.
+    """
+    client = get_client()
+    try:
+        return {"ok": True, "users": _paginate(client.users_list, "members", limit=200)}
+    except SlackApiError as e:
+        print(f"✗ Failed to list Slack users: {e.response['error']}")
+        return {"ok": False, "error": e.response["error"]}
+
+
+def lookup_user_by_email(email: str) -> dict | None:
+    """The Slack user with this email (users.lookupByEmail), or None if there isn't one."""
     client = get_client()
     try:
-        result = client.users_info(user=slack_id)
-        profile = result["user"]["profile"]
-        return profile.get("real_name", profile.get("display_name", "Unknown"))
-    except SlackApiError:
-        return "Unknown"
+        return client.users_lookupByEmail(email=email)["user"]
+    except SlackApiError as e:
+        if e.response["error"] != "users_not_found":
+            print(f"✗ Failed to look up {email}: {e.response['error']}")
+        return None
@@ -0,0 +1,106 @@
+"""
+Startup profiling — how long a cold `python agent.py --step X` spends importing.
+
+Most scheduled runs are short checks, so import time is a big share of
+their runtime. The Anthropic SDK (with pydantic, most of a second) is only
+imported when a Claude client is built or a Claude error is inspected (see
+clients.py, resilience.py), so `nudge`, `escalate`, `deliver` and a `check`
+with no new replies to pre-draft never load it.
+
+profile() starts fresh interpreters with `python -X importtime`, importing
+agent plus what the step loads on first use, and totals the import time by
+top-level package. `python agent.py --profile-startup` prints the result
+and fails when a step is over its STARTUP_BUDGET_MS, which CI runs on every
+push (.github/workflows/startup-budget.yml). tests/test_startup.py checks
+the same budgets under pytest, and that steps which never call Claude
+don't import its SDK.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import config
+
+# What each step imports on first use, on top of `import agent`. check also
+# loads anthropic when new replies trigger pre-drafting, and revise when
+# there's feedback to apply.
+STEP_MODULES = {
+    "outreach": ["anthropic"],
+    "check": [],
+    "nudge": [],
+    "escalate": [],
+    "draft": ["anthropic"],
+    "deliver": [],
+    "revise": [],
+}
+
+# Cold starts per step; the fastest is reported, to keep noise out of the budget check
+RUNS = 3
+
+
+def _importtime(modules: list[str]) -> tuple[Counter, float]:
+    """One cold interpreter: ({top-level package: import ms}, wall ms including interpreter start)."""
+    code = "; ".join(f"import {module}" for module in ["agent", *modules])
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    wall = (time.perf_counter() - started) * 1000
+    if result.returncode:
+        raise RuntimeError(f"importing {code!r} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    # Lines look like "import time:  self [us] | cumulative | name", name indented by depth
+    packages = Counter()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us) / 1000
+    return packages, wall
+
+
+def profile(step: str) -> dict:
+    """Import-time breakdown for a step's cold start (best of RUNS)."""
+    best = None
+    for _ in range(RUNS):
+        packages, wall = _importtime(STEP_MODULES[step])
+        total = sum(packages.values())
+        if best is None or total < best["import_ms"]:
+            best = {"step": step, "import_ms": total, "wall_ms": wall, "packages": packages}
+    best["budget_ms"] = config.STARTUP_BUDGET_MS.get(step)
+    best["ok"] = best["budget_ms"] is None or best["import_ms"] <= best["budget_ms"]
+    return best
+
+
+def report(steps: list[str], top: int = 12) -> bool:
+    """Profile steps, print the results and return False if any is over budget."""
+    print(f"\n⏱️  Startup import time (fastest of {RUNS} cold starts)...\n")
+    results = [profile(step) for step in steps]
+    for result in results:
+        budget = f"budget {result['budget_ms']:,} ms" if result["budget_ms"] else "no budget"
+        print(
+            f"  {'✓' if result['ok'] else '✗'} {result['step']:<9} {result['import_ms']:7,.0f} ms imports "
+            f"({result['wall_ms']:,.0f} ms with interpreter start, {budget})"
+        )
+
+    slowest = max(results, key=lambda result: result["import_ms"])
+    print(f"\n  Breakdown for {slowest['step']}:")
+    packages = slowest["packages"].most_common()
+    for name, ms in packages[:top]:
+        print(f"    {ms:7,.1f} ms  {name}")
+    rest = sum(ms for _, ms in packages[top:])
+    if rest:
+        print(f"    {rest:7,.1f} ms  ({len(packages) - top} other packages)")
+
+    over = [result["step"] for result in results if not result["ok"]]
+    if over:
+        print(f"\n⏱️  Over budget: {', '.join(over)} (STARTUP_BUDGET_MS in config.py)\n")
+    else:
+        print("\n⏱️  All within budget.\n")
+    return not over
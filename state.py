@@ -1,14 +1,41 @@
 """
 State management — tracks who's been contacted, who's responded, and collected inputs.
-Persists to a JSON file so state survives restarts.
+Persists to disk (SQLite by default, see state_backends.py) so state survives restarts.
+
+Mutators only write what they changed: one contact row, or a few top-level
+fields. Wrap bursts of writes in `with state.transaction():` to commit them
+together.
+
+Contact mutators re-read the stored row inside the write transaction and
+apply their change to that, so a reply recorded by another process (the
+listener, while a check step runs) is kept rather than overwritten by a
+stale in-memory copy.
 """
 
 import json
 import os
+import threading
 from datetime import datetime
 
-STATE_DIR = os.path.join(os.path.dirname(__file__), "data")
+from config import DATA_DIR, STATE_BACKEND
+from state_backends import JsonBackend, SqliteBackend
+
+STATE_DIR = DATA_DIR
 STATE_FILE = os.path.join(STATE_DIR, "monthly_state.json")
+STATE_DB = os.path.join(STATE_DIR, "monthly_state.db")
+
+_backend = None
+_backend_lock = threading.Lock()
+
+# slack_id -> DM channel ID. Kept in a sidecar file (not the monthly state)
+# because DM channels outlive a cycle and start_new_cycle() wipes state.
+DM_CHANNELS_FILE = "dm_channels.json"
+
+_dm_channels = None
+_dm_channels_lock = threading.Lock()
+
+# Called as hook(state, name) whenever a contact's response text changes
+_input_hooks = []
 
 
 def _ensure_dir():
@@ -16,20 +43,68 @@ def _ensure_dir():
     os.makedirs(STATE_DIR, exist_ok=True)
 
 
+def configure(data_dir: str):
+    """
+    Point state (and everything stored next to it) at another data directory.
+
+    Closes the current backend and forgets the in-memory DM channel cache, so
+    nothing leaks from one company's namespace into the next.
+    """
+    global STATE_DIR, STATE_FILE, STATE_DB, _backend, _dm_channels
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        _backend = None
+    with _dm_channels_lock:
+        _dm_channels = None
+
+    STATE_DIR = data_dir
+    STATE_FILE = os.path.join(data_dir, "monthly_state.json")
+    STATE_DB = os.path.join(data_dir, "monthly_state.db")
+
+
+def close():
+    """Close the state backend (it's reopened on next use)."""
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        _backend = None
+
+
+def get_backend():
+    """The configured state backend (created on first use)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _ensure_dir()
+            if STATE_BACKEND == "json":
+                _backend = JsonBackend(STATE_FILE)
+            else:
+                # An existing monthly_state.json is imported on first run
+                _backend = SqliteBackend(STATE_DB, migrate_from=STATE_FILE)
+        return _backend
+
+
+def transaction():
+    """Group several state writes into a single commit."""
+    return get_backend().transaction()
+
+
 def load_state() -> dict:
     """Load current month's state from disk."""
-    _ensure_dir()
-    if os.path.exists(STATE_FILE):
-        with open(STATE_FILE, "r") as f:
-            return json.load(f)
-    return _new_state()
+    return get_backend().load() or _new_state()
 
 
 def save_state(state: dict):
-    """Save state to disk."""
-    _ensure_dir()
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f, indent=2)
+    """Save the whole state to disk (prefer the targeted mutators below)."""
+    get_backend().save(state)
+
+
+def update(state: dict, **fields):
+    """Set top-level fields (draft, draft_sent, ...) and persist just those."""
+    state.update(fields)
+    get_backend().put_fields(state, *fields)
 
 
 def _new_state() -> dict:
@@ -40,8 +115,14 @@ def _new_state() -> dict:
         "year": now.strftime("%Y"),
         "cycle_started": now.isoformat(),
         "contacts": {},  # name -> {messaged, message_ts, channel, responded, response_text}
+        "outreach_batch": None,  # {id, targets, status} while a --batch outreach is in flight
         "draft": None,
+        "draft_checkpoint": None,  # {key, text} partial draft from an interrupted stream
+        "draft_sections": {},  # section -> {key, text | error} in sections draft mode
         "draft_sent": False,
+        "draft_message": None,  # {channel, ts, file, sent_at} of the delivered draft (ts None until Slack lists a file's share)
+        "revisions": [],  # {version, created, feedback, changes, draft, ts} per review round (see revision.py)
+        "revision_cursor": None,  # {last_seen_ts, threads} of the reviewer's replies read so far
         "step": "not_started",  # not_started, outreach, nudge, escalate, draft, deliver, done
     }
 
@@ -53,40 +134,173 @@ def start_new_cycle() -> dict:
     return state
 
 
+def _merge_contact(state: dict, name: str, change, create: bool = False) -> bool:
+    """
+    Apply change(contact) to the stored contact and write it back, in one transaction.
+
+    change() edits the contact in place and returns False if there was
+    nothing to do. The merged contact replaces the one in `state`. Returns
+    whether anything was written.
+    """
+    backend = get_backend()
+    with backend.transaction():
+        contact = backend.get_contact(name) or state["contacts"].get(name)
+        if contact is None:
+            if not create:
+                return False
+            contact = {}
+        changed = change(contact) is not False
+        state["contacts"][name] = contact
+        if changed:
+            backend.put_contact(state, name)
+    return changed
+
+
 def record_outreach(state: dict, name: str, channel: str, message_ts: str):
     """Record that we sent an outreach message to someone."""
-    state["contacts"][name] = {
-        "messaged": True,
-        "message_ts": message_ts,
-        "channel": channel,
-        "responded": False,
-        "response_text": None,
-        "nudged": False,
-        "escalated": False,
-    }
-    save_state(state)
+    def change(contact):
+        contact.update(messaged=True, message_ts=message_ts, channel=channel, nudged=False, escalated=False)
+        contact.setdefault("responded", False)
+        contact.setdefault("response_text", None)
+
+    _merge_contact(state, name, change, create=True)
+
+
+def record_outreach_batch(state: dict, batch_id: str, names: list[str]):
+    """Record a submitted outreach batch so a restarted process can resume it."""
+    update(state, outreach_batch={"id": batch_id, "targets": names, "status": "submitted"})
+
+
+def finish_outreach_batch(state: dict):
+    """Mark the outreach batch as fully dispatched to Slack."""
+    if state.get("outreach_batch"):
+        state["outreach_batch"]["status"] = "dispatched"
+        get_backend().put_fields(state, "outreach_batch")
+
+
+def on_input(hook):
+    """Register hook(state, name) to run whenever someone's response text changes (e.g. pre-drafting)."""
+    if hook not in _input_hooks:
+        _input_hooks.append(hook)
+
+
+def _input_changed(state: dict, name: str):
+    for hook in _input_hooks:
+        hook(state, name)
 
 
 def record_response(state: dict, name: str, response_text: str):
     """Record a team member's response."""
+    def change(contact):
+        if contact.get("responded") and contact.get("response_text") == response_text:
+            return False
+        contact["responded"] = True
+        contact["response_text"] = response_text
+
+    if name in state["contacts"] and _merge_contact(state, name, change):
+        _input_changed(state, name)
+
+
+def message_id(message: dict) -> str:
+    """Dedup key for a Slack message: client_msg_id when present, else ts."""
+    return message.get("client_msg_id") or message["ts"]
+
+
+def record_message(state: dict, name: str, message: dict) -> bool:
+    """
+    Append a single Slack message to a team member's response.
+
+    Returns False (and changes nothing) if the message was already recorded.
+    """
+    key = message_id(message)
+
+    def change(contact):
+        seen = contact.setdefault("seen_messages", [])
+        if key in seen:
+            return False
+        seen.append(key)
+        contact["responded"] = True
+        contact["response_text"] = "\n".join(
+            text for text in (contact.get("response_text"), message.get("text", "")) if text
+        )
+
+    if not state["contacts"].get(name) or not _merge_contact(state, name, change):
+        return False
+    _input_changed(state, name)
+    return True
+
+
+def advance_sync_cursor(state: dict, name: str, latest_ts: str, threads: list[str], channel: str | None = None):
+    """
+    Remember how far we've read a contact's DM, so the next check only fetches newer messages.
+
+    A channel (the DM had to be reopened) replaces the contact's stored one.
+    """
+    def change(contact):
+        if (
+            contact.get("last_seen_ts") == latest_ts
+            and contact.get("threads") == threads
+            and channel in (None, contact.get("channel"))
+        ):
+            return False
+        contact["last_seen_ts"] = latest_ts
+        contact["threads"] = threads
+        if channel:
+            contact["channel"] = channel
+
     if name in state["contacts"]:
-        state["contacts"][name]["responded"] = True
-        state["contacts"][name]["response_text"] = response_text
-        save_state(state)
+        _merge_contact(state, name, change)
 
 
 def record_nudge(state: dict, name: str):
     """Record that we sent a nudge to someone."""
     if name in state["contacts"]:
-        state["contacts"][name]["nudged"] = True
-        save_state(state)
+        _merge_contact(state, name, lambda contact: contact.update(nudged=True))
 
 
 def record_escalation(state: dict, name: str):
     """Record that we escalated a non-response."""
     if name in state["contacts"]:
-        state["contacts"][name]["escalated"] = True
-        save_state(state)
+        _merge_contact(state, name, lambda contact: contact.update(escalated=True))
+
+
+def save_draft_checkpoint(state: dict, checkpoint: dict | None):
+    """Store (or clear, with None) the partial draft from an interrupted stream."""
+    update(state, draft_checkpoint=checkpoint)
+
+
+def save_draft_section(state: dict, section: str, entry: dict):
+    """
+    Store one section's draft (or its error) from sections draft mode.
+
+    Merged into the stored sections in one transaction, so sections another
+    process pre-drafted meanwhile (--listen) are kept; `state` gets the merged set.
+    """
+    with transaction():
+        sections = load_state().get("draft_sections") or {}
+        sections[section] = entry
+        state["draft_sections"] = sections
+        get_backend().put_fields(state, "draft_sections")
+
+
+def store_draft_section(section: str, entry: dict):
+    """
+    Store one section's draft from a background thread (pre-drafting).
+
+    Re-reads the stored state instead of touching anyone's in-memory copy,
+    and only writes draft_sections.
+    """
+    with transaction():
+        current = load_state()
+        current.setdefault("draft_sections", {})[section] = entry
+        get_backend().put_fields(current, "draft_sections")
+
+
+def record_revision(state: dict, entry: dict):
+    """Store a review round: its draft becomes the current draft."""
+    revisions = state.get("revisions") or []
+    revisions.append(entry)
+    update(state, revisions=revisions, draft=entry["draft"])
 
 
 def get_non_responders(state: dict) -> list[str]:
@@ -107,5 +321,50 @@ def get_all_inputs(state: dict) -> dict:
 
 def set_step(state: dict, step: str):
     """Update the current step in the cycle."""
-    state["step"] = step
-    save_state(state)
+    update(state, step=step)
+
+
+def _dm_channels_path() -> str:
+    return os.path.join(STATE_DIR, DM_CHANNELS_FILE)
+
+
+def _load_dm_channels() -> dict:
+    """Load the DM channel cache from disk (once per process)."""
+    global _dm_channels
+    if _dm_channels is None:
+        _dm_channels = {}
+        if os.path.exists(_dm_channels_path()):
+            with open(_dm_channels_path(), "r") as f:
+                _dm_channels = json.load(f)
+    return _dm_channels
+
+
+def _save_dm_channels():
+    _ensure_dir()
+    # Written whole and swapped in: the listener, daemon and cron runs all read this file
+    tmp_path = f"{_dm_channels_path()}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(_dm_channels, f, indent=2)
+    os.replace(tmp_path, _dm_channels_path())
+
+
+def get_dm_channel(slack_id: str) -> str | None:
+    """Look up the cached DM channel ID for a Slack user, if we have one."""
+    with _dm_channels_lock:
+        return _load_dm_channels().get(slack_id)
+
+
+def save_dm_channel(slack_id: str, channel_id: str):
+    """Cache the DM channel ID for a Slack user."""
+    with _dm_channels_lock:
+        channels = _load_dm_channels()
+        if channels.get(slack_id) != channel_id:
+            channels[slack_id] = channel_id
+            _save_dm_channels()
+
+
+def forget_dm_channel(slack_id: str):
+    """Drop a cached DM channel ID (e.g. after Slack says channel_not_found)."""
+    with _dm_channels_lock:
+        if _load_dm_channels().pop(slack_id, None) is not None:
+            _save_dm_channels()
@@ -0,0 +1,173 @@
+"""
+State backends — where state.py persists the monthly state.
+
+Both backends take the in-memory state dict on every write and are told
+which part of it changed, so each can write as little as it's able to:
+
+  - JsonBackend rewrites the whole monthly_state.json (atomically, via a
+    temp file + rename). Kept for compatibility and easy inspection.
+  - SqliteBackend (default) keeps one row per contact and one per top-level
+    field in monthly_state.db (WAL mode), and only upserts the rows that
+    changed. Concurrent processes (a cron step, the --listen listener)
+    can safely write at the same time: state.py re-reads a contact's row
+    with get_contact() inside the write transaction and merges its change
+    into that, rather than writing back a copy loaded earlier.
+
+Writes inside `with backend.transaction():` are grouped into one commit
+(one file rewrite for JSON).
+"""
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class JsonBackend:
+    """Whole-file JSON state (the original format)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._pending = None
+
+    def load(self) -> dict | None:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def save(self, state: dict):
+        with self._lock:
+            if self._depth:
+                self._pending = state
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def get_contact(self, name: str) -> dict | None:
+        with self._lock:
+            state = self._pending or self.load()
+            contact = (state or {}).get("contacts", {}).get(name)
+            return copy.deepcopy(contact)
+
+    def put_contact(self, state: dict, name: str):
+        self.save(state)
+
+    def put_fields(self, state: dict, *keys: str):
+        self.save(state)
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if not self._depth and self._pending is not None:
+                    state, self._pending = self._pending, None
+                    self.save(state)
+
+    def close(self):
+        pass
+
+
+class SqliteBackend:
+    """Row-per-contact state in SQLite (WAL mode)."""
+
+    def __init__(self, path: str, migrate_from: str | None = None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        # One connection per process, shared across threads under _lock
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS fields (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS contacts (name TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        if migrate_from:
+            self._migrate(migrate_from)
+
+    def _migrate(self, json_path: str):
+        """Import an existing monthly_state.json into an empty database."""
+        if not os.path.exists(json_path):
+            return
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM fields LIMIT 1").fetchone():
+                return
+            with open(json_path, "r") as f:
+                self.save(json.load(f))
+        # Keep the old file around, but out of the way so it's not imported twice
+        os.replace(json_path, f"{json_path}.migrated")
+        print(f"  Migrated {os.path.basename(json_path)} into {os.path.basename(self.path)}")
+
+    def load(self) -> dict | None:
+        with self._lock:
+            fields = self._conn.execute("SELECT key, value FROM fields").fetchall()
+            if not fields:
+                return None
+            state = {key: json.loads(value) for key, value in fields}
+            state["contacts"] = {
+                name: json.loads(data)
+                for name, data in self._conn.execute("SELECT name, data FROM contacts ORDER BY rowid")
+            }
+        return state
+
+    def save(self, state: dict):
+        """Replace the whole stored state (new cycle, migrations)."""
+        with self.transaction():
+            self._conn.execute("DELETE FROM fields")
+            self._conn.execute("DELETE FROM contacts")
+            self.put_fields(state, *(key for key in state if key != "contacts"))
+            for name in state["contacts"]:
+                self.put_contact(state, name)
+
+    def get_contact(self, name: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM contacts WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_contact(self, state: dict, name: str):
+        with self.transaction():
+            self._conn.execute(
+                "INSERT INTO contacts (name, data) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data",
+                (name, json.dumps(state["contacts"][name])),
+            )
+
+    def put_fields(self, state: dict, *keys: str):
+        with self.transaction():
+            self._conn.executemany(
+                "INSERT INTO fields (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                [(key, json.dumps(state[key])) for key in keys],
+            )
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._depth == 0:
+                # IMMEDIATE takes the write lock up front, so concurrent
+                # writers wait (busy timeout) instead of failing mid-way
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,164 @@
+"""
+Team directory — finds people in config.TEAM by name, Slack ID or email.
+
+Lookups are dict hits on an index that's built once per team (and rebuilt
+when tenants.py swaps in another company's team), instead of a scan of
+config.TEAM for every contact.
+
+Slack profiles come from a local snapshot of the workspace
+(data/team_directory.json). sync() refreshes it with one paginated
+users.list, at most every TEAM_DIRECTORY_TTL_HOURS. A team member listed
+by "email" rather than "slack_id" gets their Slack ID from the snapshot.
+An email users.list didn't return (a guest from another workspace, say)
+falls back to users.lookupByEmail, one call each. A team where everyone
+has a slack_id never needs a sync.
+"""
+
+import json
+import os
+import threading
+import time
+
+import config
+import slack_client
+import state
+
+SNAPSHOT_FILE = "team_directory.json"
+
+_index = None     # {"key", "members", "name", "slack_id", "email"}
+_snapshot = None  # {"path", "synced_at", "users": {slack_id: profile}, "emails": {email: slack_id}}
+_lock = threading.RLock()
+
+
+def _snapshot_path() -> str:
+    return os.path.join(state.STATE_DIR, SNAPSHOT_FILE)
+
+
+def _email(value: str | None) -> str | None:
+    return value.strip().lower() if value else None
+
+
+def _profile(user: dict) -> dict:
+    """The parts of a Slack user object the directory keeps."""
+    profile = user.get("profile") or {}
+    return {
+        "real_name": profile.get("real_name") or user.get("real_name") or "",
+        "display_name": profile.get("display_name") or "",
+        "email": _email(profile.get("email")),
+        "deleted": bool(user.get("deleted")),
+        "is_bot": bool(user.get("is_bot")),
+    }
+
+
+def _load_snapshot() -> dict:
+    """The snapshot for the current data directory (read from disk once)."""
+    global _snapshot
+    path = _snapshot_path()
+    if _snapshot is None or _snapshot["path"] != path:
+        users = {}
+        synced_at = 0
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                saved = json.load(f)
+            users, synced_at = saved["users"], saved["synced_at"]
+        _snapshot = {
+            "path": path,
+            "synced_at": synced_at,
+            "users": users,
+            "emails": {user["email"]: slack_id for slack_id, user in users.items() if user["email"]},
+        }
+    return _snapshot
+
+
+def _save_snapshot(users: dict):
+    global _snapshot
+    path = _snapshot_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    synced_at = time.time()
+    with open(path, "w") as f:
+        json.dump({"synced_at": synced_at, "users": users}, f)
+    _snapshot = None
+
+
+def sync(force: bool = False) -> bool:
+    """
+    Refresh the workspace snapshot if it's older than TEAM_DIRECTORY_TTL_HOURS.
+
+    Returns False if Slack couldn't be reached; lookups keep using the
+    previous snapshot.
+    """
+    with _lock:
+        snapshot = _load_snapshot()
+        if not force and time.time() - snapshot["synced_at"] < config.TEAM_DIRECTORY_TTL_HOURS * 3600:
+            return True
+
+        result = slack_client.list_users()
+        if not result["ok"]:
+            return False
+        users = {user["id"]: _profile(user) for user in result["users"]}
+
+        # Anyone users.list didn't return is looked up by email, one call each
+        listed = {user["email"] for user in users.values() if user["email"]}
+        for person in config.TEAM:
+            email = _email(person.get("email"))
+            if email and email not in listed:
+                user = slack_client.lookup_user_by_email(email)
+                if user:
+                    users[user["id"]] = _profile(user)
+
+        _save_snapshot(users)
+        print(f"  👥 Synced {len(users)} Slack user(s) into the team directory")
+        return True
+
+
+def _build() -> dict:
+    """Index config.TEAM, filling in each email-only person's slack_id from the snapshot."""
+    if any(not person.get("slack_id") for person in config.TEAM):
+        sync()
+    emails = _load_snapshot()["emails"]
+
+    members = []
+    for person in config.TEAM:
+        slack_id = person.get("slack_id") or emails.get(_email(person.get("email")))
+        if not slack_id:
+            print(f"  ✗ No Slack user found for {person['name']} ({person.get('email') or 'no slack_id or email'})")
+            continue
+        members.append({**person, "slack_id": slack_id})
+
+    return {
+        "members": members,
+        "name": {person["name"]: person for person in members},
+        "slack_id": {person["slack_id"]: person for person in members},
+        "email": {_email(person["email"]): person for person in members if person.get("email")},
+    }
+
+
+def _key() -> tuple:
+    # config.TEAM is swapped wholesale per company (tenants.py), never edited in place
+    return (id(config.TEAM), len(config.TEAM), _load_snapshot()["path"], _load_snapshot()["synced_at"])
+
+
+def _get() -> dict:
+    global _index
+    with _lock:
+        if _index is None or _index["key"] != _key():
+            index = _build()
+            _index = {"key": _key(), **index}
+        return _index
+
+
+def members() -> list[dict]:
+    """config.TEAM, in order, with every slack_id filled in (anyone unresolvable is left out)."""
+    return _get()["members"]
+
+
+def by_name(name: str) -> dict | None:
+    return _get()["name"].get(name)
+
+
+def by_slack_id(slack_id: str) -> dict | None:
+    return _get()["slack_id"].get(slack_id)
+
+
+def by_email(email: str) -> dict | None:
+    return _get()["email"].get(_email(email))
@@ -0,0 +1,162 @@
+"""
+Multi-company mode — run one step for many companies from one invocation.
+
+Each company is a JSON file:
+
+    {
+        "name": "Carefam",
+        "description": "a healthcare hiring marketplace",
+        "team": [ ...same shape as config.TEAM... ],
+        "draft_recipient": "U05EJJMUP44",
+        "draft_recipient_name": "Matan",
+        "voice_profile": "carefam/voice_profile.md",
+        "past_updates_dir": "carefam/past_updates",
+        "slack_token_env": "CAREFAM_SLACK_BOT_TOKEN"
+    }
+
+Paths are relative to the JSON file. State, caches and logs for a company
+live in data/tenants/<slug>/ (override with "data_dir"), where <slug> is the
+file name without .json.
+
+Companies run in a process pool. Each run applies its company to the
+config/state modules in that worker process and resets the shared clients,
+so nothing leaks between companies. Each company's step output goes to
+<data_dir>/logs/<step>.log, and the parent prints an aggregate summary.
+"""
+
+import contextlib
+import glob
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import config
+
+TENANTS_DATA_DIR = os.path.join(config.DATA_DIR, "tenants")
+
+
+def load_tenants(path: str) -> list[dict]:
+    """Load company configs from a JSON file or a directory of them."""
+    files = sorted(glob.glob(os.path.join(path, "*.json"))) if os.path.isdir(path) else [path]
+
+    tenants = []
+    for file in files:
+        with open(file, "r") as f:
+            tenant = json.load(f)
+
+        base = os.path.dirname(os.path.abspath(file))
+        slug = os.path.splitext(os.path.basename(file))[0]
+        tenant["slug"] = slug
+        tenant["data_dir"] = os.path.join(base, tenant["data_dir"]) if "data_dir" in tenant else os.path.join(TENANTS_DATA_DIR, slug)
+        for key in ("voice_profile", "past_updates_dir"):
+            if key in tenant:
+                tenant[key] = os.path.join(base, tenant[key])
+        tenants.append(tenant)
+    return tenants
+
+
+def apply(tenant: dict):
+    """Make this process act as the given company."""
+    import clients
+    import gen_cache
+    import past_updates
+    import rate_limit
+    import resilience
+    import state
+
+    config.COMPANY_NAME = tenant["name"]
+    config.COMPANY_DESCRIPTION = tenant.get("description", config.COMPANY_DESCRIPTION)
+    config.TEAM = tenant["team"]
+    config.DRAFT_RECIPIENT = tenant["draft_recipient"]
+    config.DRAFT_RECIPIENT_NAME = tenant.get("draft_recipient_name") or next(
+        # Team members may be listed by email only (see team.py)
+        (p["name"] for p in tenant["team"] if p.get("slack_id") == tenant["draft_recipient"]),
+        "there",
+    )
+    config.DATA_DIR = tenant["data_dir"]
+    config.PAST_UPDATES_DIR = tenant.get("past_updates_dir", os.path.join(tenant["data_dir"], "past_updates"))
+    config.VOICE_PROFILE_PATH = tenant.get("voice_profile", os.path.join(tenant["data_dir"], "voice_profile.md"))
+
+    if tenant.get("slack_token_env"):
+        os.environ["SLACK_BOT_TOKEN"] = os.environ[tenant["slack_token_env"]]
+    if tenant.get("anthropic_key_env"):
+        os.environ["ANTHROPIC_API_KEY"] = os.environ[tenant["anthropic_key_env"]]
+
+    os.makedirs(tenant["data_dir"], exist_ok=True)
+    state.configure(tenant["data_dir"])
+    clients.close_all()
+    gen_cache.reset()
+    past_updates.reset()
+    rate_limit.reset()
+    resilience.reset()
+
+
+def run_tenant(tenant: dict, step: str, options: dict, workers: int | None = None, cache: bool = True) -> dict:
+    """Run one step for one company (in a worker process)."""
+    import agent
+    import fanout
+    import gen_cache
+
+    started = time.time()
+    summary = {"company": tenant["name"], "slug": tenant["slug"], "step": step, "ok": True, "error": None}
+
+    apply(tenant)
+    if workers:
+        fanout.set_workers(workers)
+    gen_cache.set_enabled(cache)
+    log_dir = os.path.join(tenant["data_dir"], "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    summary["log"] = os.path.join(log_dir, f"{step}.log")
+
+    with open(summary["log"], "a") as log, contextlib.redirect_stdout(log):
+        print(f"\n===== {time.strftime('%Y-%m-%d %H:%M:%S')} {step} =====")
+        try:
+            agent.run_step(step, **options)
+            agent.print_step_stats()
+        except Exception as e:
+            traceback.print_exc(file=log)
+            summary["ok"] = False
+            summary["error"] = f"{type(e).__name__}: {e}"
+
+    summary["seconds"] = round(time.time() - started, 2)
+    return summary
+
+
+def run_all(
+    tenants: list[dict],
+    step: str,
+    processes: int | None = None,
+    workers: int | None = None,
+    cache: bool = True,
+    **options,
+) -> list[dict]:
+    """
+    Run a step across all companies in a process pool and print a summary.
+
+    options are passed to agent.run_step (batch, poll_interval, draft_mode, deliver_mode, progress).
+    """
+    print(f"\n🏢 Running '{step}' for {len(tenants)} compan{'y' if len(tenants) == 1 else 'ies'}...\n")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {pool.submit(run_tenant, tenant, step, options, workers, cache): tenant for tenant in tenants}
+        for future in as_completed(futures):
+            tenant = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died
+                result = {"company": tenant["name"], "slug": tenant["slug"], "step": step,
+                          "ok": False, "error": f"{type(e).__name__}: {e}", "seconds": None}
+            results.append(result)
+
+            if result["ok"]:
+                print(f"  ✓ {result['company']} ({result['seconds']}s)")
+            else:
+                print(f"  ✗ {result['company']}: {result['error']}")
+
+    failed = [r for r in results if not r["ok"]]
+    print(f"\n🏢 {len(results) - len(failed)} succeeded, {len(failed)} failed. Logs: <data_dir>/logs/{step}.log\n")
+    return results
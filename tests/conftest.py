@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import state  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Point state (and everything stored next to it) at a temporary data directory."""
+    previous = state.STATE_DIR
+    state.configure(str(tmp_path))
+    yield tmp_path
+    state.configure(previous)
@@ -0,0 +1,16 @@
+import pytest
+
+import claude_client
+import gen_cache
+import resilience
+
+
+def test_stream_surfaces_errors_from_picking_a_model(data_dir, monkeypatch):
+    def pick_model(primary):
+        raise KeyError(primary)
+
+    monkeypatch.setattr(resilience, "pick_model", pick_model)
+    gen_cache.reset()
+
+    with pytest.raises(KeyError):
+        claude_client._stream("test", model="claude-test", max_tokens=10, messages=[{"role": "user", "content": "Hi"}])
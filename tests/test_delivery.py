@@ -0,0 +1,78 @@
+import delivery
+
+DRAFT = """# October '26 Update
+
+Dear Investors,
+
+**TLDR**
+Best month yet: two new hospital systems and record placements.
+
+**Monthly KPIs**
+Interviews: 210 (+9%)
+Placements: 48 (+12%)
+
+**Marketplace (Placements & Facilities)**
+- **Supply side (candidates).** We doubled down on referrals this month.
+- **Demand side (facilities).** Signed two systems in Texas.
+
+**Asks**
+Intros to CNOs at large Texas systems.
+
+Best,
+Matan"""
+
+
+def _words(text: str) -> list[str]:
+    return text.replace("**", "").split()
+
+
+def test_short_draft_is_one_part():
+    assert delivery.split(DRAFT, 4000) == [DRAFT]
+
+
+def test_parts_fit_and_keep_every_word():
+    parts = delivery.split(DRAFT, 120)
+
+    assert len(parts) > 1
+    assert all(len(part) <= 120 for part in parts)
+    assert _words(" ".join(parts)) == _words(DRAFT)
+
+
+def test_heading_stays_with_its_paragraph():
+    parts = delivery.split(DRAFT, 120)
+
+    for heading in ("**TLDR**", "**Monthly KPIs**", "**Asks**"):
+        part = next(part for part in parts if heading in part)
+        assert not part.rstrip().endswith(heading)
+
+
+def test_section_starts_a_new_part_once_the_current_one_is_half_full():
+    parts = delivery.split(DRAFT, 200)
+
+    assert any(part.startswith("**Marketplace") for part in parts)
+
+
+def test_oversized_paragraph_breaks_on_sentences_not_words():
+    paragraph = " ".join(f"Sentence number {i} is here." for i in range(40))
+    parts = delivery.split(paragraph, 200)
+
+    assert all(len(part) <= 200 for part in parts)
+    assert all(part.endswith(".") for part in parts)
+    assert " ".join(parts) == paragraph
+
+
+def test_split_bold_span_is_closed_and_reopened():
+    text = "**" + " ".join(f"word{i}" for i in range(100)) + "**"
+    parts = delivery.split(text, 120)
+
+    assert len(parts) > 1
+    assert all(part.count("**") % 2 == 0 for part in parts)
+    assert all(part.startswith("**") and part.endswith("**") for part in parts)
+
+
+def test_unbreakable_run_is_sliced():
+    url = "https://example.com/" + "a" * 500
+    parts = delivery.split(url, 100)
+
+    assert "".join(parts) == url
+    assert all(len(part) <= 100 for part in parts)
@@ -0,0 +1,33 @@
+import claude_client
+import config
+import extraction
+import state
+
+RECORD = {"items": [{"section": "Other Things Happening", "bullets": ["Hired 2"], "numbers": [], "entities": []}]}
+
+
+def test_a_burst_of_messages_is_extracted_once(data_dir, monkeypatch):
+    monkeypatch.setattr(config, "EXTRACTION_DEBOUNCE", 0.2)
+    extracted = []
+    monkeypatch.setattr(claude_client, "extract_response", lambda person, text: extracted.append(text) or RECORD)
+    current_state = state.start_new_cycle()
+    state.record_outreach(current_state, "Ana", "D1", "100.0")
+
+    for i, text in enumerate(["Shipped SSO", "Hired 2", "Signed Mercy"]):
+        state.record_message(current_state, "Ana", {"ts": f"10{i + 1}.0", "text": text})
+        extraction._on_input(current_state, "Ana")
+
+    assert extraction.wait() == 1
+    assert extracted == ["Shipped SSO\nHired 2\nSigned Mercy"]
+
+
+def test_only_earlier_cycles_are_evicted(data_dir, monkeypatch):
+    monkeypatch.setattr(extraction, "CACHE_MAX_ENTRIES", 2)
+    with extraction._lock:
+        extraction._store("old", RECORD, "2026-09-01T09:00:00")
+        for key in ("a", "b", "c"):
+            extraction._store(key, RECORD, "2026-10-01T09:00:00")
+        kept = dict(extraction._records())
+
+    assert list(kept) == ["a", "b", "c"]
+    assert kept["a"]["cycle"] == "2026-10-01T09:00:00"
@@ -0,0 +1,67 @@
+import os
+import time
+
+import pytest
+
+import gen_cache
+
+
+@pytest.fixture
+def cache(data_dir, monkeypatch):
+    monkeypatch.setattr(gen_cache, "GEN_CACHE_MAX_AGE_DAYS", 1)
+    gen_cache.reset()
+    yield os.path.join(data_dir, gen_cache.CACHE_DIRNAME)
+    gen_cache.reset()
+
+
+def _age(path: str, days: float):
+    """Move an entry's mtime (its last use) back by days, as if that much time had passed."""
+    then = os.stat(path).st_mtime - days * 86400
+    os.utime(path, (then, then))
+
+
+def test_entry_expires_after_going_unused(cache):
+    gen_cache.put("a", "text")
+    _age(os.path.join(cache, "a.json"), 2)
+
+    assert gen_cache.get("a") is None
+
+
+def test_entry_in_use_does_not_expire(cache):
+    path = os.path.join(cache, "a.json")
+    gen_cache.put("a", "text")
+    _age(path, 0.75)
+    assert gen_cache.get("a") == "text"
+    _age(path, 0.75)
+
+    # Written a day and a half ago, past the 1-day limit, but read since
+    assert gen_cache.get("a") == "text"
+    assert os.path.exists(path)
+
+
+def test_eviction_agrees_with_expiry(cache, monkeypatch):
+    gen_cache.put("old", "text")
+    gen_cache.put("used", "text")
+    _age(os.path.join(cache, "old.json"), 2)
+    _age(os.path.join(cache, "used.json"), 2)
+    os.utime(os.path.join(cache, "used.json"))
+
+    gen_cache.reset()
+    gen_cache.put("new", "text")
+
+    assert sorted(os.listdir(cache)) == ["new.json", "used.json"]
+    assert gen_cache.get("used") == "text"
+
+
+def test_least_recently_used_is_evicted_first(cache, monkeypatch):
+    for i, key in enumerate(["a", "b", "c"]):
+        gen_cache.put(key, "x" * 100)
+        _age(os.path.join(cache, f"{key}.json"), 0.1 * (3 - i))
+    gen_cache.get("a")
+
+    # Room for three entries (their sizes differ by a byte or two with the timestamp)
+    size = os.path.getsize(os.path.join(cache, "a.json"))
+    monkeypatch.setattr(gen_cache, "GEN_CACHE_MAX_BYTES", size * 3 + size // 2)
+    gen_cache.put("d", "x" * 100)
+
+    assert sorted(os.listdir(cache)) == ["a.json", "c.json", "d.json"]
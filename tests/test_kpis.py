@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+import config
+import kpis
+import past_updates
+
+UPDATE = """# {title} Update
+
+Dear Investors,
+
+**TLDR**
+Another good month.
+
+**Monthly KPIs**
+Monthly Interviews: {interviews} (+10%)
+New Facilities: {facilities} (+5%)
+
+**Asks**
+Intros, please.
+
+Best,
+Matan
+"""
+
+
+@pytest.fixture
+def updates(data_dir, monkeypatch):
+    """Past updates for July to September 2026, in data_dir/past_updates."""
+    updates_dir = os.path.join(data_dir, "past_updates")
+    os.makedirs(updates_dir)
+    for month, title, interviews, facilities in [
+        ("2026-07", "July '26", 100, 40),
+        ("2026-08", "August '26", 120, 42),
+        ("2026-09", "September '26", 150, 45),
+    ]:
+        with open(os.path.join(updates_dir, f"{month}.md"), "w") as f:
+            f.write(UPDATE.format(title=title, interviews=interviews, facilities=facilities))
+    monkeypatch.setattr(config, "PAST_UPDATES_DIR", updates_dir)
+    monkeypatch.setattr(config, "KPI_NAMES", [])
+    past_updates.reset()
+    yield data_dir
+    past_updates.reset()
+
+
+def test_parse_reads_kpi_lines_in_any_markup():
+    text = "- **Interviews:** 210 (+9%)\n| Facilities | 48 |\nRevenue = $1.2k\nCandidates started work 31"
+
+    assert kpis.parse(text) == {"Interviews": 210, "Facilities": 48, "Revenue": 1200, "Candidates started work": 31}
+
+
+def test_parse_skips_lines_without_a_trailing_number():
+    assert kpis.parse("We hired 3 people this month.\nTotal: n/a") == {}
+
+
+def test_parse_csv_wide_and_long():
+    wide = "month,Interviews,Facilities\n2026-09,150,45\nOct 2026,165,\n"
+    long = "month,kpi,value\n2026-09,Interviews,150\n2026-10,Interviews,165\n"
+
+    assert kpis.parse_csv(wide) == {"2026-09": {"Interviews": 150, "Facilities": 45}, "2026-10": {"Interviews": 165}}
+    assert kpis.parse_csv(long) == {"2026-09": {"Interviews": 150}, "2026-10": {"Interviews": 165}}
+
+
+def test_changes_mom_and_qoq():
+    deltas = kpis.changes({"Interviews": [100, 120, None, 150, 165]})["Interviews"]
+
+    assert deltas["mom"] == [None, pytest.approx(20), None, None, pytest.approx(10)]
+    assert deltas["qoq"] == [None, None, None, pytest.approx(50), pytest.approx(37.5)]
+
+
+def test_reply_shorthand_maps_onto_known_kpis(updates):
+    data = kpis.history("2026-10", {"Ana": "Interviews: 165\nFacilities: 48"})
+
+    assert data["months"] == ["2026-07", "2026-08", "2026-09", "2026-10"]
+    assert data["columns"]["Monthly Interviews"][-1] == 165
+    assert data["columns"]["New Facilities"][-1] == 48
+    assert data["unmatched"] == {}
+
+
+def test_block_is_ready_to_use_when_every_kpi_is_in(updates):
+    block = kpis.block("2026-10", {"Ana": "Interviews: 165\nFacilities: 48"})
+
+    assert block == "Monthly Interviews: 165 (+10%)\nNew Facilities: 48 (+6.7%)"
+
+
+def test_numbers_that_are_not_kpis_stay_out_of_the_history(updates):
+    reply = "Interviews: 165\nFacilities: 48\nPing me by May 30\nWe expect the pipeline to grow roughly 9"
+    data = kpis.history("2026-10", {"Ana": reply})
+
+    assert set(data["columns"]) == {"Monthly Interviews", "New Facilities"}
+    assert set(data["unmatched"]) == {"Ping me by May", "We expect the pipeline to grow roughly"}
+
+    # Left to the model, with the stray numbers flagged
+    assert kpis.block("2026-10", {"Ana": reply}) is None
+    table = kpis.table("2026-10", {"Ana": reply})
+    assert "- Ping me by May: 30" in table
+    assert "don't match a known KPI" in table
+
+
+def test_config_kpi_names_admit_a_new_kpi(updates, monkeypatch):
+    monkeypatch.setattr(config, "KPI_NAMES", ["Recruiters Hired"])
+    data = kpis.history("2026-10", {"Ana": "Interviews: 165\nFacilities: 48\nRecruiters: 3"})
+
+    assert data["columns"]["Recruiters Hired"][-1] == 3
+    assert data["unmatched"] == {}
+
+
+def test_csv_overrides_replies(updates):
+    with open(os.path.join(updates, kpis.CSV_FILE), "w") as f:
+        f.write("month,Monthly Interviews\n2026-10,170\n")
+    data = kpis.history("2026-10", {"Ana": "Interviews: 165"})
+
+    assert data["columns"]["Monthly Interviews"][-1] == 170
@@ -0,0 +1,78 @@
+import pytest
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+import rate_limit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limit.time, "sleep", clock.sleep)
+    rate_limit.reset()
+    yield clock
+    rate_limit.reset()
+
+
+def test_bucket_spends_its_burst_then_paces(clock):
+    bucket = rate_limit.TokenBucket(per_minute=60, burst=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert bucket.acquire() == pytest.approx(1.0)
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = rate_limit.TokenBucket(per_minute=60, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+
+    clock.now += 60
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(1.0)
+
+
+def test_pause_holds_callers_for_retry_after(clock):
+    bucket = rate_limit.TokenBucket(per_minute=600, burst=10)
+    bucket.pause(5)
+
+    assert bucket.acquire() == pytest.approx(5.0)
+
+
+class _RateLimited:
+    status_code = 429
+    headers = {"Retry-After": "2"}
+
+    def get(self, key, default=None):
+        return {"ok": False, "error": "ratelimited"}.get(key, default)
+
+
+def test_every_429_counts_as_throttled(clock, monkeypatch):
+    calls = []
+
+    def api_call(self, api_method, **kwargs):
+        calls.append(api_method)
+        raise SlackApiError("ratelimited", _RateLimited())
+
+    monkeypatch.setattr(WebClient, "api_call", api_call)
+    monkeypatch.setattr(rate_limit, "SLACK_MAX_RATELIMIT_RETRIES", 2)
+
+    with pytest.raises(SlackApiError):
+        rate_limit.RateLimitedWebClient(token="xoxb-test").api_call("conversations.history")
+
+    assert len(calls) == 3
+    stats = rate_limit.stats()
+    assert stats["throttled"] == 3
+    assert stats["retried"] == 2
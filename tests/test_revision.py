@@ -0,0 +1,119 @@
+import pytest
+
+import claude_client
+import drafting
+import revision
+import sections
+import slack_client
+import state
+
+BODY = drafting.assemble({
+    sections.KPIS: "Interviews: 210 (+9%)\nPlacements: 48 (+12%)",
+    sections.SUPPLY: "We doubled down on referrals this month.",
+    sections.DEMAND: "Signed two systems in Texas.",
+    sections.PRODUCT: "Shipped the candidate app.\n\nOur team grew\n\nTwo engineers joined in October.",
+    sections.OTHER: "We spoke at ANA in Dallas.",
+    sections.ASKS: "Intros to CNOs at large Texas systems.",
+})
+
+DRAFT = f"""# October '26 Update
+
+Dear Investors,
+
+Welcome to our October update (3 min read).
+
+**TLDR**
+Best month yet: two new hospital systems and record placements.
+
+{BODY}
+
+As always, happy to chat further regarding any of the above.
+
+Best,
+Matan"""
+
+
+def _part(draft: str, name: str) -> str:
+    span = next(span for span in revision.draft_spans(draft) if span["name"] == name)
+    return draft[span["start"]:span["end"]].strip()
+
+
+def test_spans_follow_the_draft_headings_only():
+    names = [span["name"] for span in revision.draft_spans(DRAFT)]
+
+    assert names == [
+        None, sections.TLDR, sections.KPIS, sections.MARKETPLACE, sections.SUPPLY, sections.DEMAND,
+        sections.PRODUCT, sections.OTHER, sections.ASKS, "closing",
+    ]
+    # "Our team grew" reads like an "Other Things Happening" heading to past_updates, but it's body text here
+    assert _part(DRAFT, sections.PRODUCT).endswith("Two engineers joined in October.")
+
+
+def test_map_changes_names_sections_directly_and_asks_for_the_rest(monkeypatch):
+    asked = []
+
+    def map_feedback(lines, draft, available):
+        asked.extend(lines)
+        return [{"section": sections.KPIS, "instruction": "Facilities should be 161"}]
+
+    monkeypatch.setattr(claude_client, "map_feedback", map_feedback)
+    available = [sections.TLDR, sections.KPIS, sections.ASKS]
+    changes = revision.map_changes(
+        ["Asks: add an ask for nurse leaders", "TLDR: mention the Texas expansion", "Facilities should be 161"],
+        DRAFT,
+        available,
+    )
+
+    assert asked == ["Facilities should be 161"]
+    assert changes == {
+        sections.TLDR: ["TLDR: mention the Texas expansion"],
+        sections.KPIS: ["Facilities should be 161"],
+        sections.ASKS: ["Asks: add an ask for nurse leaders"],
+    }
+
+
+def test_apply_splices_a_multi_paragraph_section(monkeypatch):
+    rewritten = "**R&D, Product, Design**\nShipped the candidate app.\n\nThree engineers joined in October."
+    seen = {}
+
+    def revise_section(section, part, instructions, draft, voice_profile):
+        seen[section] = part
+        return rewritten
+
+    monkeypatch.setattr(claude_client, "revise_section", revise_section)
+    revised = revision.apply(DRAFT, {sections.PRODUCT: ["Three engineers, not two"]}, "voice")
+
+    assert seen[sections.PRODUCT] == _part(DRAFT, sections.PRODUCT)
+    assert "Our team grew" not in revised
+    assert _part(revised, sections.PRODUCT) == rewritten
+    # Everything around it is untouched
+    for name in (sections.TLDR, sections.KPIS, sections.DEMAND, sections.OTHER, sections.ASKS, "closing"):
+        assert _part(revised, name) == _part(DRAFT, name)
+
+
+def test_revise_without_a_share_ts_posts_in_the_dm(data_dir, monkeypatch):
+    current_state = state.start_new_cycle()
+    state.update(
+        current_state,
+        draft=DRAFT,
+        draft_message={"channel": "D1", "ts": None, "file": "F1", "sent_at": "100.000000"},
+    )
+    synced = {}
+    sent = []
+
+    def sync_dm_responses(slack_id, since_ts, channel_id=None, threads=()):
+        synced.update(since_ts=since_ts, threads=list(threads))
+        return {"messages": [{"text": "Asks: add an ask for nurse leaders"}], "latest_ts": "105.0", "threads": []}
+
+    monkeypatch.setattr(slack_client, "file_share_ts", lambda file_id, channel_id: None)
+    monkeypatch.setattr(slack_client, "sync_dm_responses", sync_dm_responses)
+    monkeypatch.setattr(slack_client, "send_dm", lambda slack_id, message: sent.append(message) or {"ok": True, "ts": "106.0"})
+    monkeypatch.setattr(slack_client, "post_in_thread", lambda *args: pytest.fail("no thread to post in"))
+    monkeypatch.setattr(claude_client, "revise_section", lambda section, part, *args: part + "\nAnd nurse leaders.")
+
+    entry = revision.revise(current_state, "voice")
+
+    assert synced == {"since_ts": "100.000000", "threads": []}
+    assert entry["changes"] == {sections.ASKS: ["Asks: add an ask for nurse leaders"]}
+    assert len(sent) == 1 and "+And nurse leaders." in sent[0]
+    assert state.load_state()["revision_cursor"] == {"last_seen_ts": "105.0", "threads": []}
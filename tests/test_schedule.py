@@ -0,0 +1,46 @@
+import os
+import re
+from datetime import date
+
+import pytest
+
+import agent
+import config
+import schedule_helper
+import startup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def schedule(monkeypatch):
+    monkeypatch.setattr(config, "SCHEDULE", {"outreach": 25, "nudge": 27, "escalate": 28, "draft": 29, "deliver": 30})
+    return config.SCHEDULE
+
+
+def test_days_unchanged_in_a_long_month(schedule):
+    assert schedule_helper.days_for(2026, 10) == schedule
+
+
+@pytest.mark.parametrize("year, month, shift", [(2026, 2, 2), (2028, 2, 1), (2026, 4, 0)])
+def test_short_month_moves_the_whole_schedule_earlier(schedule, year, month, shift):
+    assert schedule_helper.days_for(year, month) == {step: day - shift for step, day in schedule.items()}
+
+
+@pytest.mark.parametrize("day, step", [(24, "skip"), (25, "outreach"), (26, "check"), (29, "draft"), (30, "deliver"), (31, "skip")])
+def test_step_for_each_day(schedule, day, step):
+    assert schedule_helper.get_step_for_date(date(2026, 10, day)) == step
+
+
+def test_february_deliver_lands_on_the_last_day(schedule):
+    assert schedule_helper.get_step_for_date(date(2026, 2, 28)) == "deliver"
+    assert schedule_helper.get_step_for_date(date(2026, 2, 23)) == "outreach"
+
+
+def test_every_step_can_be_run_from_actions():
+    with open(os.path.join(ROOT, ".github", "workflows", "monthly-update.yml")) as f:
+        workflow = f.read()
+    options = re.search(r"options:\n((?:\s+- \w+\n)+)", workflow).group(1)
+
+    assert re.findall(r"- (\w+)", options) == agent.STEPS
+    assert list(startup.STEP_MODULES) == agent.STEPS
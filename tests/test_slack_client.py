@@ -0,0 +1,44 @@
+import os
+
+from slack_sdk.errors import SlackApiError
+
+import slack_client
+import state
+
+
+class _Client:
+    """Just enough of the Slack WebClient for reading a DM whose old channel is gone."""
+
+    def conversations_open(self, users):
+        return {"channel": {"id": "D2"}}
+
+    def conversations_history(self, channel, **kwargs):
+        if channel != "D2":
+            raise SlackApiError("channel_not_found", {"ok": False, "error": "channel_not_found"})
+        return {"messages": [{"type": "message", "user": "U1", "ts": "101.0", "text": "Shipped SSO"}]}
+
+    def conversations_replies(self, channel, ts, **kwargs):
+        return {"messages": []}
+
+
+def test_a_reopened_dm_replaces_the_contacts_channel(data_dir, monkeypatch):
+    monkeypatch.setattr(slack_client, "get_client", _Client)
+    current_state = state.start_new_cycle()
+    state.record_outreach(current_state, "Ana", "D1", "100.0")
+    state.save_dm_channel("U1", "D1")
+
+    result = slack_client.sync_dm_responses("U1", "100.0", channel_id="D1", threads=["100.0"])
+    state.advance_sync_cursor(current_state, "Ana", result["latest_ts"], result["threads"], result["channel"])
+
+    assert [message["text"] for message in result["messages"]] == ["Shipped SSO"]
+    assert state.load_state()["contacts"]["Ana"]["channel"] == "D2"
+    assert state.get_dm_channel("U1") == "D2"
+
+
+def test_dm_channels_are_written_whole(data_dir):
+    state.save_dm_channel("U1", "D1")
+    state.save_dm_channel("U2", "D2")
+
+    assert os.listdir(data_dir) == [state.DM_CHANNELS_FILE]
+    state.configure(str(data_dir))
+    assert state.get_dm_channel("U2") == "D2"
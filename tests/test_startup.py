@@ -0,0 +1,23 @@
+import pytest
+
+import config
+import startup
+
+
+@pytest.mark.parametrize("step", sorted(startup.STEP_MODULES))
+def test_cold_start_within_budget(step):
+    result = startup.profile(step)
+
+    assert result["ok"], f"{step} imports took {result['import_ms']:.0f} ms (budget {result['budget_ms']} ms)"
+
+
+@pytest.mark.parametrize("step", sorted(step for step, modules in startup.STEP_MODULES.items() if not modules))
+def test_steps_without_claude_never_import_the_sdk(step):
+    packages, _ = startup._importtime(startup.STEP_MODULES[step])
+
+    assert "anthropic" not in packages
+    assert "pydantic" not in packages
+
+
+def test_every_step_has_a_budget():
+    assert set(startup.STEP_MODULES) == set(config.STARTUP_BUDGET_MS)
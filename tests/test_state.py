@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+import state
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def backend(request, data_dir, monkeypatch):
+    monkeypatch.setattr(state, "STATE_BACKEND", request.param)
+    state.close()
+    fresh = state.start_new_cycle()
+    state.record_outreach(fresh, "Ana", "D1", "100.0")
+    yield request.param
+    state.close()
+
+
+def test_reply_recorded_elsewhere_survives_a_stale_write(backend):
+    check_step = state.load_state()
+
+    listener = state.load_state()
+    assert state.record_message(listener, "Ana", {"ts": "101.0", "client_msg_id": "m-listen", "text": "Shipped SSO"})
+
+    # The check step still holds the copy it loaded before the listener's write
+    assert state.record_message(check_step, "Ana", {"ts": "102.0", "client_msg_id": "m-check", "text": "Hired 2"})
+
+    contact = state.load_state()["contacts"]["Ana"]
+    assert contact["seen_messages"] == ["m-listen", "m-check"]
+    assert contact["response_text"] == "Shipped SSO\nHired 2"
+    assert check_step["contacts"]["Ana"] == contact
+
+
+def test_duplicate_message_from_a_stale_copy_is_ignored(backend):
+    stale = state.load_state()
+    state.record_message(state.load_state(), "Ana", {"ts": "101.0", "text": "Shipped SSO"})
+
+    assert not state.record_message(stale, "Ana", {"ts": "101.0", "text": "Shipped SSO"})
+    assert state.load_state()["contacts"]["Ana"]["response_text"] == "Shipped SSO"
+
+
+def test_flags_keep_a_concurrent_reply(backend):
+    stale = state.load_state()
+    state.record_message(state.load_state(), "Ana", {"ts": "101.0", "text": "Shipped SSO"})
+
+    state.record_nudge(stale, "Ana")
+    state.advance_sync_cursor(stale, "Ana", "101.0", [])
+
+    contact = state.load_state()["contacts"]["Ana"]
+    assert contact["nudged"] and contact["responded"]
+    assert contact["response_text"] == "Shipped SSO"
+    assert contact["last_seen_ts"] == "101.0"
+
+
+def test_concurrent_writers_each_holding_a_stale_copy(backend):
+    copies = [state.load_state() for _ in range(20)]
+    threads = [
+        threading.Thread(
+            target=state.record_message,
+            args=(copy, "Ana", {"ts": f"{101 + i}.0", "client_msg_id": f"m-{i}", "text": f"line {i}"}),
+        )
+        for i, copy in enumerate(copies)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    contact = state.load_state()["contacts"]["Ana"]
+    assert sorted(contact["seen_messages"]) == sorted(f"m-{i}" for i in range(20))
+    assert len(contact["response_text"].splitlines()) == 20
+
+
+def test_input_hook_fires_only_for_new_text(backend, monkeypatch):
+    calls = []
+    monkeypatch.setattr(state, "_input_hooks", [lambda current, name: calls.append(name)])
+    current = state.load_state()
+
+    state.record_response(current, "Ana", "Shipped SSO")
+    state.record_response(current, "Ana", "Shipped SSO")
+
+    assert calls == ["Ana"]
+
+
+def test_saving_a_section_keeps_one_stored_meanwhile(backend):
+    draft_step = state.load_state()
+    state.store_draft_section("Asks", {"key": "k1", "text": "Intros, please."})
+
+    state.save_draft_section(draft_step, "KPIs", {"key": "k2", "text": "Interviews: 210"})
+
+    stored = state.load_state()["draft_sections"]
+    assert set(stored) == {"Asks", "KPIs"}
+    assert draft_step["draft_sections"] == stored
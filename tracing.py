@@ -0,0 +1,402 @@
+"""
+Tracing — timed spans, latency histograms and token/cost accounting per step.
+
+Each agent.run_step is one trace. The step is the root span. Every Slack Web
+API call (rate_limit.RateLimitedWebClient) and every Claude call
+(claude_client, resilience) is a child span. For the same calls, each step
+records:
+
+  - a latency histogram per API method ("slack chat.postMessage",
+    "claude messages.create", ...), one sample per HTTP attempt
+  - Claude token usage per model (input, output, cache read/write), priced
+    with config.CLAUDE_PRICES
+  - retries per method (Claude backoff retries, requeued Slack rate limits)
+
+When the step ends, its spans and one metrics record are appended to
+data/traces/<cycle>.jsonl, one file per monthly cycle next to the state.
+export() writes a cycle out as JSON lines or as OTLP/JSON, the
+OpenTelemetry trace format that collectors and viewers such as Jaeger can
+import.
+
+Spans follow the calling thread, including into fanout workers. Work on
+other background threads (pre-drafts, hedged requests) is attached to the
+running step.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+import config
+
+TRACES_DIRNAME = "traces"
+SERVICE_NAME = "investor-update-agent"
+
+# The innermost open span on this thread / in this context
+_current = contextvars.ContextVar("span", default=None)
+
+_run = None      # the step being traced: {"trace_id", "root", "spans", "metrics"}
+_last = None     # summary() of the last finished step
+_lock = threading.Lock()
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+def _new_metrics() -> dict:
+    return {"latency": {}, "usage": {}, "retries": {}, "errors": {}}
+
+
+def _traces_dir() -> str:
+    import state
+
+    return os.path.join(state.STATE_DIR, TRACES_DIRNAME)
+
+
+def _price(model: str) -> dict | None:
+    """The price entry for a model: the longest CLAUDE_PRICES key it starts with."""
+    matches = [prefix for prefix in config.CLAUDE_PRICES if model.startswith(prefix)]
+    return config.CLAUDE_PRICES[max(matches, key=len)] if matches else None
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str = "internal", **attrs):
+    """
+    Time a block as a span of the current step.
+
+    Yields the span's attribute dict, so the block can add to it. Anything
+    raised marks the span as an error and is re-raised. Outside a traced
+    step (or with config.TRACING off) nothing is recorded.
+    """
+    run = _run
+    if run is None:
+        yield attrs
+        return
+
+    parent = _current.get()
+    if parent is None or parent["trace_id"] != run["trace_id"]:
+        parent = run["root"]
+    record = {
+        "type": "span",
+        "trace_id": run["trace_id"],
+        "span_id": _new_id(8),
+        "parent_id": parent["span_id"],
+        "name": name,
+        "kind": kind,
+        "start_ns": time.time_ns(),
+        "attrs": attrs,
+        "status": "ok",
+    }
+    token = _current.set(record)
+    started = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        duration = time.perf_counter() - started
+        record["duration_ms"] = round(duration * 1000, 3)
+        record["end_ns"] = record["start_ns"] + int(duration * 1e9)
+        with _lock:
+            run["spans"].append(record)
+
+
+def _attrs() -> dict | None:
+    """The attribute dict of the innermost open span, if any."""
+    record = _current.get()
+    return record["attrs"] if record else None
+
+
+def observe(method: str, seconds: float, ok: bool = True):
+    """Add one latency sample to an API method's histogram ("slack users.info", ...)."""
+    run = _run
+    if run is None:
+        return
+    bounds = config.TRACE_LATENCY_BUCKETS_MS
+    ms = seconds * 1000
+    with _lock:
+        histogram = run["metrics"]["latency"].setdefault(
+            method, {"count": 0, "sum_ms": 0.0, "min_ms": ms, "max_ms": ms, "buckets": [0] * (len(bounds) + 1)}
+        )
+        histogram["count"] += 1
+        histogram["sum_ms"] += ms
+        histogram["min_ms"] = min(histogram["min_ms"], ms)
+        histogram["max_ms"] = max(histogram["max_ms"], ms)
+        # buckets[i] counts samples <= bounds[i]; the last one is everything above
+        histogram["buckets"][bisect_left(bounds, ms)] += 1
+        if not ok:
+            run["metrics"]["errors"][method] = run["metrics"]["errors"].get(method, 0) + 1
+
+
+@contextlib.contextmanager
+def timed(method: str):
+    """Time one API attempt into observe(method), counting it as an error if it raises."""
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        observe(method, time.perf_counter() - started, ok)
+
+
+def record_retry(method: str):
+    """Count a retried call, on the method and on the current span."""
+    run = _run
+    if run is None:
+        return
+    with _lock:
+        run["metrics"]["retries"][method] = run["metrics"]["retries"].get(method, 0) + 1
+    attrs = _attrs()
+    if attrs is not None:
+        attrs["retries"] = attrs.get("retries", 0) + 1
+
+
+def record_usage(model: str, usage, batch: bool = False):
+    """
+    Add a Claude response's token usage (and its cost) to the step's totals.
+
+    The tokens are also added to the current span. Message Batches results
+    are priced at the batch discount.
+    """
+    run = _run
+    if run is None:
+        return
+    tokens = {
+        "input_tokens": usage.input_tokens or 0,
+        "output_tokens": usage.output_tokens or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+    }
+    price = _price(model)
+    cost = None
+    if price:
+        cost = (
+            tokens["input_tokens"] * price["input"]
+            + tokens["output_tokens"] * price["output"]
+            + tokens["cache_read_input_tokens"] * price["cache_read"]
+            + tokens["cache_creation_input_tokens"] * price["cache_write"]
+        ) / 1_000_000
+        if batch:
+            cost *= config.CLAUDE_BATCH_DISCOUNT
+
+    with _lock:
+        totals = run["metrics"]["usage"].setdefault(
+            model, {"calls": 0, **{name: 0 for name in tokens}, "cost_usd": 0.0 if price else None}
+        )
+        totals["calls"] += 1
+        for name, count in tokens.items():
+            totals[name] += count
+        if cost is not None:
+            totals["cost_usd"] += cost
+
+    attrs = _attrs()
+    if attrs is not None:
+        # A span can carry several responses (a batch's results)
+        attrs["model"] = model
+        for name, count in tokens.items():
+            attrs[name] = attrs.get(name, 0) + count
+        if cost is not None:
+            attrs["cost_usd"] = round(attrs.get("cost_usd", 0) + cost, 6)
+
+
+@contextlib.contextmanager
+def step(name: str):
+    """
+    Trace one step: open its root span, then persist the trace when it ends.
+
+    Nested inside another traced step it's just a child span.
+    """
+    global _run, _last
+    if _run is not None or not config.TRACING:
+        with span(f"step {name}", kind="step"):
+            yield
+        return
+
+    trace_id = _new_id(16)
+    started_ns = time.time_ns()
+    started = time.perf_counter()
+    record = {
+        "type": "span", "trace_id": trace_id, "span_id": _new_id(8), "parent_id": None,
+        "name": f"step {name}", "kind": "step", "start_ns": started_ns, "attrs": {"step": name}, "status": "ok",
+    }
+    run = {"trace_id": trace_id, "root": record, "spans": [], "metrics": _new_metrics()}
+    _run = run
+    token = _current.set(record)
+    try:
+        yield
+    except BaseException as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        duration = time.perf_counter() - started
+        record["duration_ms"] = round(duration * 1000, 3)
+        record["end_ns"] = started_ns + int(duration * 1e9)
+        with _lock:
+            _run = None
+            spans = [record] + run["spans"]
+        _last = _summarize(name, duration, run["metrics"])
+        _last["file"] = _persist(name, run["trace_id"], spans, run["metrics"], started_ns)
+
+
+def _cycle_id() -> str:
+    """The monthly cycle this step belongs to, from its start time in state."""
+    import state
+
+    started = state.load_state()["cycle_started"]
+    return started[:19].replace(":", "")
+
+
+def _persist(name: str, trace_id: str, spans: list, metrics: dict, started_ns: int) -> str | None:
+    """Append the step's spans and metrics to its cycle's trace file."""
+    try:
+        path = os.path.join(_traces_dir(), f"{_cycle_id()}.jsonl")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        summary = {
+            "type": "metrics",
+            "trace_id": trace_id,
+            "step": name,
+            "start_ns": started_ns,
+            "latency_bounds_ms": config.TRACE_LATENCY_BUCKETS_MS,
+            **metrics,
+        }
+        with open(path, "a") as f:
+            for record in spans + [summary]:
+                f.write(json.dumps(record, default=str) + "\n")
+        return path
+    except Exception as e:
+        # Tracing must never fail a step
+        print(f"  ✗ Couldn't save trace: {type(e).__name__}: {e}")
+        return None
+
+
+def percentile(histogram: dict, q: float, bounds: list | None = None) -> float:
+    """Approximate percentile (ms) of a latency histogram: the upper bound of its bucket."""
+    bounds = bounds or config.TRACE_LATENCY_BUCKETS_MS
+    target = q * histogram["count"]
+    seen = 0
+    for i, count in enumerate(histogram["buckets"]):
+        seen += count
+        if count and seen >= target:
+            return min(bounds[i], histogram["max_ms"]) if i < len(bounds) else histogram["max_ms"]
+    return histogram["max_ms"]
+
+
+def _summarize(name: str, seconds: float, metrics: dict) -> dict:
+    calls = {"slack": 0, "claude": 0}
+    for method, histogram in metrics["latency"].items():
+        kind = method.split(" ", 1)[0]
+        if kind in calls:
+            calls[kind] += histogram["count"]
+    usage = metrics["usage"].values()
+    return {
+        "step": name,
+        "seconds": round(seconds, 2),
+        "slack_calls": calls["slack"],
+        "claude_calls": calls["claude"],
+        "input_tokens": sum(u["input_tokens"] + u["cache_read_input_tokens"] + u["cache_creation_input_tokens"] for u in usage),
+        "output_tokens": sum(u["output_tokens"] for u in usage),
+        "cost_usd": round(sum(u["cost_usd"] or 0 for u in usage), 4),
+        "retries": sum(metrics["retries"].values()),
+        "slowest": sorted(
+            ((method, percentile(h, 0.95)) for method, h in metrics["latency"].items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:3],
+    }
+
+
+def summary() -> dict | None:
+    """Totals for the last traced step (None if no step has been traced)."""
+    return _last
+
+
+def cycles() -> list[str]:
+    """Cycle IDs with a trace file, oldest first."""
+    try:
+        names = os.listdir(_traces_dir())
+    except OSError:
+        return []
+    return sorted(name[:-len(".jsonl")] for name in names if name.endswith(".jsonl"))
+
+
+def load(cycle: str | None = None) -> list[dict]:
+    """Every record persisted for a cycle (default: the newest one)."""
+    cycle = cycle or (cycles() or [None])[-1]
+    if cycle is None:
+        return []
+    with open(os.path.join(_traces_dir(), f"{cycle}.jsonl"), "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(records: list[dict]) -> dict:
+    """Spans as an OTLP/JSON ExportTraceServiceRequest."""
+    spans = []
+    for record in records:
+        if record["type"] != "span":
+            continue
+        attrs = {"component": record["kind"], **record["attrs"]}
+        otlp = {
+            "traceId": record["trace_id"],
+            "spanId": record["span_id"],
+            "name": record["name"],
+            # SPAN_KIND_CLIENT for API calls, SPAN_KIND_INTERNAL otherwise
+            "kind": 3 if record["kind"] in ("slack", "claude") else 1,
+            "startTimeUnixNano": str(record["start_ns"]),
+            "endTimeUnixNano": str(record["end_ns"]),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attrs.items() if value is not None],
+            # STATUS_CODE_OK / STATUS_CODE_ERROR
+            "status": {"code": 2, "message": record["error"]} if record["status"] == "error" else {"code": 1},
+        }
+        if record["parent_id"]:
+            otlp["parentSpanId"] = record["parent_id"]
+        spans.append(otlp)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                {"key": "company.name", "value": {"stringValue": config.COMPANY_NAME}},
+            ]},
+            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}],
+        }]
+    }
+
+
+def export(path: str, fmt: str = "jsonl", cycle: str | None = None) -> int:
+    """
+    Write a cycle's trace (default: the newest) to path.
+
+    fmt is "jsonl" (spans and metrics records as stored) or "otlp" (spans
+    only, OTLP/JSON). Returns how many records were in the cycle.
+    """
+    records = load(cycle)
+    if not records:
+        return 0
+    with open(path, "w") as f:
+        if fmt == "otlp":
+            json.dump(to_otlp(records), f)
+        else:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+    return len(records)